@@ -1,11 +1,18 @@
 import asyncio
+import os
 
 from chatlas import ChatBedrockAnthropic
 
 from openapi_mcp.client import MCPClient
+from openapi_mcp.log import configure_logging
+from openapi_mcp.tracing import configure_tracing, tracer
 
 
 async def main():
+    configure_logging(os.environ.get("LOG_LEVEL", "INFO"))
+    # Trace the chat, its tool calls and (with the server's TRACE_FILE) the upstream requests
+    configure_tracing(os.environ.get("TRACE_FILE"))
+
     llm = ChatBedrockAnthropic(
         model="anthropic.claude-3-5-sonnet-20240620-v1:0",
         aws_region="us-east-1",
@@ -19,7 +26,10 @@ async def main():
         await asyncio.sleep(1000)
     else:
         # await mcp_client.chat_async("What is the current Connect host version?")
-        await mcp_client.chat_async("Get the current user's id.")
+        # One span for the whole chat: chatlas runs the model turns and their tool calls internally
+        # without hooks, so the `mcp.call_tool` spans of every turn are children of this span
+        with tracer.start_span("chat"):
+            await mcp_client.chat_async("Get the current user's id.")
         # await mcp_client.chat_async("Now get me the first 3 content items owned by that user id.")
 
         # Works! Just commenting for now
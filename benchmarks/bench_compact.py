@@ -0,0 +1,66 @@
+"""
+Benchmark compacting the tools of a synthetic spec to a token budget.
+
+Measures:
+
+- the time to compact every tool (the first `compact_all()`, as when the tools are first listed),
+  and the time of a second `compact_all()` answered from the compactor's cache;
+- the estimated tokens of the tools before and after, in total and for the largest tool;
+- how many tools needed each step, and how many are still over the budget.
+
+By default models are nested (`--nesting 2`) and reference two others, so request bodies inline
+many (repeated) models, as in large real-world specs.
+
+Usage: `python -m benchmarks.bench_compact [--operations N] [--budget TOKENS] [--max-depth N]`
+"""
+
+import argparse
+import gc
+import time
+from collections import Counter
+
+from benchmarks.synthetic_spec import add_spec_arguments, spec_from_arguments
+from openapi_mcp.compact import ToolCompactor
+from openapi_mcp.index import OperationIndex
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    add_spec_arguments(parser)
+    parser.set_defaults(operations=500, nesting=2)
+    parser.add_argument("--budget", type=int, default=2000, help="Token budget per tool.")
+    parser.add_argument("--max-depth", type=int, default=3)
+    args = parser.parse_args()
+
+    tools = OperationIndex(spec_from_arguments(args)).tools()
+
+    gc.collect()
+    compactor = ToolCompactor(args.budget, max_depth=args.max_depth)
+    start = time.perf_counter()
+    compactor.compact_all(tools)
+    compact_time = time.perf_counter() - start
+    start = time.perf_counter()
+    compactor.compact_all(tools)
+    cached_time = time.perf_counter() - start
+
+    stats = compactor.stats()
+    sizes = compactor.sizes()
+    largest = max(sizes, key=lambda size: size.before)
+    last_steps = Counter(size.steps[-1] for size in sizes if size.steps)
+    print(
+        f"Spec: {len(tools):,} tools; compacted {stats['compacted']:,} in "
+        f"{compact_time * 1000:.0f} ms (cached: {cached_time * 1000:.2f} ms)"
+    )
+    print(
+        f"tokens: {stats['tokens_before']:,} -> {stats['tokens_after']:,} "
+        f"({stats['tokens_after'] / stats['tokens_before']:.2%}); largest tool "
+        f"{largest.name} {largest.before:,} -> {largest.after:,}"
+    )
+    print(
+        f"last step needed: {', '.join(f'{step} {n:,}' for step, n in last_steps.most_common())}; "
+        f"{stats['over_budget']:,} tools over the budget of {args.budget:,}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Benchmark the peak memory (RSS) of expanding and cleaning a large spec.
+
+Compares, each in a fresh process:
+
+- `copying`: the pipeline as it was before copy-on-write expansion: `deepcopy` of the document,
+  reference expansion, then a `clean_whitespace` that rebuilds every object, so expanded
+  references shared by many use sites are copied once per use site.
+- `two_pass`: `clean_whitespace(expand_all_references(document))` with the copy-on-write stages.
+- `single_pass`: `expand_swagger(document)`, expanding and cleaning in one copy-on-write pass.
+
+Peak RSS is measured from `/proc/self/status` (Linux); elsewhere the process' maximum RSS is
+reported, which includes building the document.
+
+Usage: `python -m benchmarks.bench_expand_memory [--spec FILE | --operations N ...]`
+"""
+
+import argparse
+import gc
+import multiprocessing
+import re
+import resource
+import sys
+import time
+from copy import deepcopy
+from pathlib import Path
+
+from benchmarks.synthetic_spec import add_spec_arguments, spec_from_arguments
+from openapi_mcp.spec import load_spec
+from openapi_mcp.swagger import clean_whitespace, expand_all_references, expand_swagger
+
+
+def copying_clean_whitespace(obj):
+    # `clean_whitespace` before copy-on-write: every list and dict is rebuilt
+    if isinstance(obj, str):
+        return re.sub(r"\s+", " ", obj).strip()
+    elif isinstance(obj, list):
+        return [copying_clean_whitespace(item) for item in obj]
+    elif isinstance(obj, dict):
+        return {key: copying_clean_whitespace(value) for key, value in obj.items()}
+    else:
+        return obj
+
+
+VARIANTS = {
+    "copying": lambda document: copying_clean_whitespace(
+        expand_all_references(deepcopy(document))
+    ),
+    "two_pass": lambda document: clean_whitespace(expand_all_references(document)),
+    "single_pass": expand_swagger,
+}
+
+
+def read_status(field: str) -> int | None:
+    """A memory field of `/proc/self/status` (e.g. `VmRSS`), in bytes."""
+    try:
+        with open("/proc/self/status", encoding="utf-8") as file:
+            for line in file:
+                if line.startswith(f"{field}:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def reset_peak_rss() -> bool:
+    """Reset the peak RSS (`VmHWM`) of this process to its current RSS (Linux only)."""
+    try:
+        with open("/proc/self/clear_refs", "w", encoding="utf-8") as file:
+            file.write("5")
+    except OSError:
+        return False
+    return True
+
+
+def max_rss() -> int:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+def measure(results, variant: str, args: argparse.Namespace):
+    """Run one variant and report its time and memory (child process entry point)."""
+    document = load_spec(args.spec) if args.spec else spec_from_arguments(args)
+    gc.collect()
+    baseline = read_status("VmRSS")
+    exact = baseline is not None and reset_peak_rss()
+
+    start = time.perf_counter()
+    result = VARIANTS[variant](document)
+    seconds = time.perf_counter() - start
+
+    peak = read_status("VmHWM") if exact else max_rss()
+    del result
+    results.put(
+        {
+            "variant": variant,
+            "seconds": seconds,
+            "baseline": baseline,
+            "peak": peak,
+            "exact": exact,
+        }
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--spec", type=Path, help="Expand this spec instead of a synthetic one.")
+    add_spec_arguments(parser)
+    parser.add_argument(
+        "--variants",
+        default=",".join(VARIANTS),
+        help="Comma separated variants to run (`copying` can take minutes on dense specs).",
+    )
+    args = parser.parse_args()
+
+    if args.spec:
+        print(f"Spec: {args.spec}")
+    else:
+        print(
+            f"Spec: synthetic OpenAPI v{args.openapi_version}, {args.operations} operations, "
+            f"{args.definitions} definitions, {args.shared_refs} shared refs per definition"
+        )
+    print(f"{'variant':<14}{'time (ms)':>12}{'peak RSS (MB)':>16}{'added (MB)':>13}")
+    context = multiprocessing.get_context("spawn")
+    for variant in args.variants.split(","):
+        results = context.Queue()
+        process = context.Process(target=measure, args=(results, variant.strip(), args))
+        process.start()
+        result = results.get()
+        process.join()
+        added = (
+            f"{(result['peak'] - result['baseline']) / 1e6:>13.1f}"
+            if result["exact"]
+            else f"{'n/a':>13}"
+        )
+        print(
+            f"{result['variant']:<14}{result['seconds'] * 1000:>12.1f}"
+            f"{result['peak'] / 1e6:>16.1f}{added}"
+        )
+
+
+if __name__ == "__main__":
+    main()
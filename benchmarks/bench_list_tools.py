@@ -0,0 +1,98 @@
+"""
+Benchmark answering a `tools/list` request on a spec with thousands of operations.
+
+Measures the work done per request, from building the tools to the JSON sent to the client:
+
+- `rebuild`: `map_operations_to_tools` for every operation, then the session's dump of the result.
+- `per-tool cache`: the tools cached by the `OperationIndex`, the list and the `batch_call` tool
+  rebuilt and the result dumped for every request.
+- `precomputed`: the `ToolList` built once (as `connect_api` does) and its dump reused.
+
+The first request of `precomputed` builds the list; its time is reported separately.
+
+By default each model references one other model (`--shared-refs 1`), as denser `$ref` graphs
+make the inlined input schemas very large.
+
+Usage: `python -m benchmarks.bench_list_tools [--operations N ...]`
+"""
+
+import argparse
+import json
+import time
+
+import mcp.types as types
+
+from benchmarks.synthetic_spec import add_spec_arguments, spec_from_arguments
+from openapi_mcp.batch import make_batch_tool
+from openapi_mcp.index import OperationIndex
+from openapi_mcp.map import map_operations_to_tools
+from openapi_mcp.tool_list import ToolListCache
+
+
+def send(result: types.ServerResult) -> str:
+    """Dump and serialize a result as the MCP session and SSE transport do."""
+    message = types.JSONRPCMessage(
+        types.JSONRPCResponse(
+            jsonrpc="2.0",
+            id=1,
+            result=result.model_dump(by_alias=True, mode="json", exclude_none=True),
+        )
+    )
+    return message.model_dump_json(by_alias=True, exclude_none=True)
+
+
+def best_of(fn, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    add_spec_arguments(parser)
+    # Every `$ref` is inlined in the tools: denser graphs make input schemas of many megabytes
+    parser.set_defaults(shared_refs=1)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    operations = OperationIndex(spec_from_arguments(args))
+    # Materialize every operation and tool up front so that only `tools/list` is measured
+    operations.tools()
+
+    def build_tools() -> list[types.Tool]:
+        return [*operations.tools(), make_batch_tool(operations)]
+
+    def rebuild():
+        tools = [*map_operations_to_tools(operations), make_batch_tool(operations)]
+        return send(types.ServerResult(types.ListToolsResult(tools=tools)))
+
+    def per_tool_cache():
+        return send(types.ServerResult(types.ListToolsResult(tools=build_tools())))
+
+    cache = ToolListCache()
+
+    def precomputed():
+        return send(cache.get(operations, build_tools).result)
+
+    start = time.perf_counter()
+    first = precomputed()
+    build_time = time.perf_counter() - start
+    assert json.loads(first)["result"]["tools"] == json.loads(per_tool_cache())["result"]["tools"]
+
+    print(f"Spec: {len(operations):,} operations; tools/list response {len(first) / 1e6:.1f} MB")
+    print(f"{'handler':<18}{'ms/request':>12}{'requests/s':>12}")
+    for name, fn in [
+        ("rebuild", rebuild),
+        ("per-tool cache", per_tool_cache),
+        ("precomputed", precomputed),
+    ]:
+        seconds = best_of(fn, args.repeat)
+        print(f"{name:<18}{seconds * 1000:>12.1f}{1 / seconds:>12.1f}")
+    print(f"precomputed: first request (building the list) {build_time * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Benchmark turning tool arguments into an `httpx.Request` for the Connect operations.
+
+Compares the original per-call mapping (`map_arguments_to_api_params` + `map_*_params`) with a
+precompiled `RequestPlan`. No network traffic is generated.
+
+Usage: `python -m benchmarks.bench_request_plan`
+"""
+
+import timeit
+
+import httpx
+
+from benchmarks.connect_operations import CONNECT_ARGUMENTS, CONNECT_OPERATIONS
+from openapi_mcp.map import (
+    map_arguments_to_api_params,
+    map_body_params,
+    map_path_params,
+    map_query_params,
+)
+from openapi_mcp.plan import get_request_plan
+
+NUMBER = 5_000
+
+
+def build_request_mapped(client: httpx.AsyncClient, operation, arguments):
+    api_params = map_arguments_to_api_params(
+        arguments, operation["definition"].get("parameters", [])
+    )
+    return client.build_request(
+        method=operation["method"],
+        url=map_path_params(operation["route"], api_params["path"]),
+        params=map_query_params(api_params["query"]),
+        json=map_body_params(api_params["body"]),
+    )
+
+
+def build_request_planned(client: httpx.AsyncClient, operation, arguments):
+    return get_request_plan(operation).build_request(client, arguments)
+
+
+def main():
+    client = httpx.AsyncClient(base_url="http://localhost:3939/__api__")
+    print(f"{'operation':<16}{'mapped (calls/s)':>20}{'planned (calls/s)':>20}{'speedup':>10}")
+    for name, operation in CONNECT_OPERATIONS.items():
+        arguments = CONNECT_ARGUMENTS[name]
+        mapped = build_request_mapped(client, operation, arguments)
+        planned = build_request_planned(client, operation, arguments)
+        assert mapped.url == planned.url, (mapped.url, planned.url)
+
+        mapped_time = min(
+            timeit.repeat(
+                lambda: build_request_mapped(client, operation, arguments),  # noqa: B023
+                number=NUMBER,
+                repeat=5,
+            )
+        )
+        planned_time = min(
+            timeit.repeat(
+                lambda: build_request_planned(client, operation, arguments),  # noqa: B023
+                number=NUMBER,
+                repeat=5,
+            )
+        )
+        print(
+            f"{name:<16}{NUMBER / mapped_time:>20,.0f}{NUMBER / planned_time:>20,.0f}"
+            f"{mapped_time / planned_time:>9.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Benchmark the size of the tool results for the Connect operations with response shaping.
+
+Builds representative Connect responses (including fields that are not part of the documented
+response schema) and reports the size of the tool result returned verbatim and shaped: filtered
+by the response schema, then projected with `fields` and sliced with `limit`. Sizes are also given
+in estimated tokens (~4 bytes per token). No network traffic is generated.
+
+Usage: `python -m benchmarks.bench_response_shaping`
+"""
+
+import json
+import random
+import timeit
+
+from benchmarks.connect_operations import CONNECT_OPERATIONS
+from openapi_mcp.shaping import ResponseShape
+
+N_CONTENTS = 500
+NUMBER = 20
+
+BYTES_PER_TOKEN = 4
+
+
+def make_user(rng: random.Random) -> dict:
+    guid = f"{rng.getrandbits(128):032x}"
+    return {
+        "email": f"user{rng.randrange(10_000)}@example.com",
+        "username": f"user{rng.randrange(10_000)}",
+        "first_name": "Test",
+        "last_name": "User",
+        "user_role": rng.choice(["viewer", "publisher", "administrator"]),
+        "created_time": "2024-01-17T10:21:12Z",
+        "updated_time": "2024-11-02T08:01:54Z",
+        "active_time": "2025-01-09T16:42:03Z",
+        "confirmed": True,
+        "locked": False,
+        "guid": guid,
+        # Not part of the documented schema
+        "external_id": None,
+        "email_verified": True,
+        "privileges": ["add_users", "publish_content", "view_logs"],
+    }
+
+
+def make_content(rng: random.Random, owner_guid: str) -> dict:
+    guid = f"{rng.getrandbits(128):032x}"
+    name = f"content-{rng.randrange(100_000)}"
+    return {
+        "guid": guid,
+        "name": name,
+        "title": f"Quarterly report {rng.randrange(100)}",
+        "description": "A dashboard summarizing the quarterly figures for each region. " * 3,
+        "access_type": rng.choice(["acl", "logged_in", "all"]),
+        "created_time": "2024-03-05T12:00:00Z",
+        "last_deployed_time": "2025-01-02T09:30:00Z",
+        "app_mode": rng.choice(["shiny", "rmd-static", "python-fastapi", "jupyter-static"]),
+        "content_category": "",
+        "owner_guid": owner_guid,
+        "content_url": f"https://connect.example.com/content/{guid}/",
+        "dashboard_url": f"https://connect.example.com/connect/#/apps/{guid}",
+        "app_role": "owner",
+        "id": str(rng.randrange(100_000)),
+        # Not part of the documented schema
+        "bundle_id": str(rng.randrange(100_000)),
+        "vanity_url": None,
+        "connection_timeout": None,
+        "read_timeout": None,
+        "init_timeout": None,
+        "idle_timeout": None,
+        "max_processes": None,
+        "min_processes": None,
+        "max_conns_per_process": None,
+        "load_factor": None,
+        "memory_request": None,
+        "memory_limit": None,
+        "cpu_request": None,
+        "cpu_limit": None,
+        "parameterized": False,
+        "cluster_name": "Local",
+        "image_name": None,
+        "r_version": None,
+        "py_version": "3.12.4",
+        "quarto_version": None,
+        "run_as": None,
+        "run_as_current_user": False,
+        "tags": [{"id": "1", "name": "finance"}, {"id": "2", "name": "reports"}],
+    }
+
+
+# Tool calls to measure: (label, operation, response, shaping arguments)
+def make_cases(seed: int = 0) -> list[tuple[str, str, object, dict]]:
+    rng = random.Random(seed)
+    user = make_user(rng)
+    contents = [make_content(rng, user["guid"]) for _ in range(N_CONTENTS)]
+    return [
+        ("getCurrentUser", "getCurrentUser", user, {}),
+        ("  fields=guid,username", "getCurrentUser", user, {"fields": "guid,username"}),
+        ("updateUser", "updateUser", user, {}),
+        (f"getContents ({N_CONTENTS})", "getContents", contents, {}),
+        ("  fields=guid,name,title", "getContents", contents, {"fields": "guid,name,title"}),
+        ("  + limit=20", "getContents", contents, {"fields": "guid,name,title", "limit": 20}),
+    ]
+
+
+def main():
+    print(
+        f"{'call':<26}{'verbatim (B)':>14}{'shaped (B)':>12}{'tokens':>16}{'reduction':>11}"
+        f"{'shape (ms)':>12}"
+    )
+    for label, name, response, arguments in make_cases():
+        operation = CONNECT_OPERATIONS[name]
+        text = json.dumps(response, separators=(",", ":"))
+        shape = ResponseShape.from_arguments(operation, arguments)
+        shaped = shape.apply(text)
+
+        verbatim_size = len(text.encode("utf-8"))
+        shaped_size = len(shaped.encode("utf-8"))
+        tokens = f"{verbatim_size // BYTES_PER_TOKEN:,}->{shaped_size // BYTES_PER_TOKEN:,}"
+        elapsed = min(timeit.repeat(lambda: shape.apply(text), number=NUMBER, repeat=5))  # noqa: B023
+        print(
+            f"{label:<26}{verbatim_size:>14,}{shaped_size:>12,}{tokens:>16}"
+            f"{1 - shaped_size / verbatim_size:>10.1%}{elapsed / NUMBER * 1000:>12.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,350 @@
+"""
+Load test the MCP SSE server (`openapi_mcp.connect_api`).
+
+The server runs in a child process together with an in-process stand-in for the Connect API that
+serves the operations in `benchmarks.connect_operations`. Many concurrent MCP SSE sessions then
+connect, list the tools and call them. The benchmark reports throughput, p50/p99 latencies and
+the server's memory per open session, and can write the results as JSON for regression tracking.
+
+The server reads its usual environment variables (e.g. `RESPONSE_CACHE_SIZE`,
+`REQUEST_COALESCING`), so configurations can be compared run against run.
+
+Usage: `python -m benchmarks.bench_server [--sessions 1,10,50] [--calls 20] [--output FILE]`
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from importlib.metadata import version
+from pathlib import Path
+
+import uvicorn
+from mcp import ClientSession
+from mcp.client.sse import sse_client
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+from benchmarks.bench_response_shaping import make_content, make_user
+from benchmarks.connect_operations import CONNECT_ARGUMENTS, CONNECT_OPERATIONS
+from benchmarks.synthetic_spec import write_spec
+
+HOST = "127.0.0.1"
+N_CONTENTS = 100
+
+# The tool calls each session makes, in turn
+CALLS = [
+    ("getCurrentUser", CONNECT_ARGUMENTS["getCurrentUser"]),
+    (
+        "getContents",
+        {**CONNECT_ARGUMENTS["getContents"], "fields": "guid,name,title", "limit": 20},
+    ),
+    ("updateUser", CONNECT_ARGUMENTS["updateUser"]),
+]
+
+
+def make_swagger() -> dict:
+    """A Swagger document with the Connect operations the server exposes."""
+    paths: dict[str, dict] = {}
+    for operation in CONNECT_OPERATIONS.values():
+        paths.setdefault(operation["route"], {})[operation["method"]] = operation["definition"]
+    return {
+        "swagger": "2.0",
+        "info": {"title": "Connect API (benchmark)", "version": "1.0.0"},
+        "basePath": "/__api__",
+        "paths": paths,
+    }
+
+
+def make_upstream(latency: float) -> Starlette:
+    """
+    A stand-in for the Connect API.
+
+    Arguments
+    ---------
+    latency
+        Seconds each response is delayed by, to simulate the network and the Connect server.
+    """
+    rng = random.Random(0)
+    user = make_user(rng)
+    contents = json.dumps([make_content(rng, user["guid"]) for _ in range(N_CONTENTS)]).encode()
+
+    async def get_current_user(_request: Request) -> Response:
+        await asyncio.sleep(latency)
+        return JSONResponse(user)
+
+    async def update_user(request: Request) -> Response:
+        body = await request.json()
+        await asyncio.sleep(latency)
+        return JSONResponse({**user, **body, "guid": request.path_params["guid"]})
+
+    async def get_contents(_request: Request) -> Response:
+        await asyncio.sleep(latency)
+        return Response(contents, media_type="application/json")
+
+    return Starlette(
+        routes=[
+            Route("/__api__/v1/user", get_current_user),
+            Route("/__api__/v1/users/{guid}", update_user, methods=["PATCH"]),
+            Route("/__api__/v1/content", get_contents),
+        ]
+    )
+
+
+async def start_server(app, log_level: str) -> tuple[uvicorn.Server, asyncio.Task, int]:
+    server = uvicorn.Server(uvicorn.Config(app, host=HOST, port=0, log_level=log_level.lower()))
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        if task.done():
+            # Surface the startup error
+            await task
+        await asyncio.sleep(0.01)
+    port = server.servers[0].sockets[0].getsockname()[1]
+    return server, task, port
+
+
+def serve(ready, swagger_file: str, latency: float, log_level: str):
+    """Run the stand-in upstream and the MCP server (child process entry point)."""
+
+    async def main():
+        _, upstream_task, upstream_port = await start_server(make_upstream(latency), log_level)
+        # `connect_api` is configured from the environment when it is imported
+        os.environ["CONNECT_SERVER"] = f"http://{HOST}:{upstream_port}/"
+        os.environ["SWAGGER_FILE"] = swagger_file
+        os.environ["SWAGGER_CACHE"] = "false"
+        os.environ["LOG_LEVEL"] = log_level
+        from openapi_mcp import connect_api
+
+        _, server_task, port = await start_server(connect_api.app, log_level)
+        ready.put(port)
+        await asyncio.gather(upstream_task, server_task)
+
+    asyncio.run(main())
+
+
+def rss_bytes(pid: int) -> int | None:
+    """The resident set size of a process, if it can be read (Linux only)."""
+    try:
+        with open(f"/proc/{pid}/status", encoding="utf-8") as file:
+            for line in file:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def percentile(values: list[float], q: float) -> float:
+    """The `q`-th percentile (nearest rank) of some values."""
+    ordered = sorted(values)
+    rank = max(1, round(q / 100 * len(ordered) + 0.5))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def summarize(latencies: list[float]) -> dict[str, float] | None:
+    if not latencies:
+        return None
+    return {
+        "count": len(latencies),
+        "mean_ms": sum(latencies) / len(latencies) * 1000,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "max_ms": max(latencies) * 1000,
+    }
+
+
+class LoadRun:
+    """
+    One load level: `n_sessions` concurrent sessions making `n_calls` tool calls each.
+
+    All sessions connect first; the server's memory is measured while they are all open, then the
+    sessions are released at once to list the tools and call them.
+    """
+
+    def __init__(self, url: str, n_sessions: int, n_calls: int):
+        self.url = url
+        self.n_sessions = n_sessions
+        self.n_calls = n_calls
+        self.latencies: dict[str, list[float]] = {"initialize": [], "list_tools": []}
+        self.errors = 0
+        self._opened = 0
+        self._all_opened = asyncio.Event()
+        self._go = asyncio.Event()
+
+    def _mark_opened(self):
+        self._opened += 1
+        if self._opened == self.n_sessions:
+            self._all_opened.set()
+
+    def _record(self, key: str, start: float):
+        self.latencies.setdefault(key, []).append(time.perf_counter() - start)
+
+    async def session(self, index: int):
+        opened = False
+        try:
+            start = time.perf_counter()
+            async with (
+                sse_client(self.url, timeout=30) as streams,
+                ClientSession(*streams) as session,
+            ):
+                await session.initialize()
+                self._record("initialize", start)
+                opened = True
+                self._mark_opened()
+                await self._go.wait()
+
+                start = time.perf_counter()
+                await session.list_tools()
+                self._record("list_tools", start)
+
+                for i in range(self.n_calls):
+                    name, arguments = CALLS[(index + i) % len(CALLS)]
+                    start = time.perf_counter()
+                    result = await session.call_tool(name, arguments)
+                    self._record("call_tool", start)
+                    self._record(f"call_tool:{name}", start)
+                    if result.isError:
+                        self.errors += 1
+        except Exception:
+            self.errors += 1
+        finally:
+            if not opened:
+                self._mark_opened()
+
+    async def run(self, server_pid: int) -> dict:
+        baseline_rss = rss_bytes(server_pid)
+        tasks = [asyncio.create_task(self.session(i)) for i in range(self.n_sessions)]
+        await self._all_opened.wait()
+        open_rss = rss_bytes(server_pid)
+
+        start = time.perf_counter()
+        self._go.set()
+        await asyncio.gather(*tasks)
+        duration = time.perf_counter() - start
+
+        n_tool_calls = len(self.latencies.get("call_tool", []))
+        n_requests = n_tool_calls + len(self.latencies["list_tools"])
+        memory_per_session = (
+            (open_rss - baseline_rss) / self.n_sessions
+            if open_rss is not None and baseline_rss is not None
+            else None
+        )
+        return {
+            "sessions": self.n_sessions,
+            "calls_per_session": self.n_calls,
+            "errors": self.errors,
+            "duration_s": duration,
+            "requests_per_s": n_requests / duration,
+            "tool_calls_per_s": n_tool_calls / duration,
+            "latency": {key: summarize(values) for key, values in self.latencies.items()},
+            "server_rss_mb": open_rss / 1e6 if open_rss is not None else None,
+            "memory_per_session_kb": (
+                memory_per_session / 1e3 if memory_per_session is not None else None
+            ),
+        }
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_results(results: list[dict]):
+    print(
+        f"{'sessions':>9}{'calls/s':>10}{'list p50':>10}{'list p99':>10}{'call p50':>10}"
+        f"{'call p99':>10}{'errors':>8}{'RSS (MB)':>10}{'KB/session':>12}"
+    )
+    for result in results:
+        list_tools = result["latency"]["list_tools"] or {}
+        call_tool = result["latency"].get("call_tool") or {}
+        rss = result["server_rss_mb"]
+        per_session = result["memory_per_session_kb"]
+        print(
+            f"{result['sessions']:>9}{result['tool_calls_per_s']:>10,.0f}"
+            f"{list_tools.get('p50_ms', 0):>10.1f}{list_tools.get('p99_ms', 0):>10.1f}"
+            f"{call_tool.get('p50_ms', 0):>10.1f}{call_tool.get('p99_ms', 0):>10.1f}"
+            f"{result['errors']:>8}"
+            f"{rss if rss is not None else float('nan'):>10.1f}"
+            f"{per_session if per_session is not None else float('nan'):>12.1f}"
+        )
+    print("(latencies in ms)")
+
+
+async def run_load(url: str, server_pid: int, levels: list[int], n_calls: int) -> list[dict]:
+    # Warm up: imports, lazily expanded operations and the upstream connection pool
+    await LoadRun(url, 1, len(CALLS)).run(server_pid)
+    return [await LoadRun(url, n, n_calls).run(server_pid) for n in levels]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sessions",
+        default="1,10,50,100",
+        help="Comma separated numbers of concurrent sessions, one load level each.",
+    )
+    parser.add_argument("--calls", type=int, default=20, help="Tool calls per session.")
+    parser.add_argument(
+        "--upstream-latency",
+        type=float,
+        default=0.005,
+        help="Seconds the stand-in upstream delays each response by.",
+    )
+    parser.add_argument("--log-level", default="WARNING", help="The server's LOG_LEVEL.")
+    parser.add_argument("--output", type=Path, help="Write the results to this JSON file.")
+    args = parser.parse_args()
+    levels = [int(n) for n in args.sessions.split(",") if n.strip()]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        swagger_file = write_spec(make_swagger(), Path(tmp_dir) / "swagger.json")
+        # A fresh interpreter, so the server's memory is not inflated by the load generator
+        context = multiprocessing.get_context("spawn")
+        ready = context.Queue()
+        process = context.Process(
+            target=serve,
+            args=(ready, str(swagger_file), args.upstream_latency, args.log_level),
+            daemon=True,
+        )
+        process.start()
+        try:
+            port = ready.get(timeout=60)
+            assert process.pid is not None
+            results = asyncio.run(
+                run_load(f"http://{HOST}:{port}/sse", process.pid, levels, args.calls)
+            )
+        finally:
+            process.kill()
+            process.join()
+
+    print_results(results)
+    if args.output is not None:
+        report = {
+            "benchmark": "bench_server",
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "revision": git_revision(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "mcp": version("mcp"),
+            "upstream_latency_s": args.upstream_latency,
+            "results": results,
+        }
+        args.output.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Benchmark parsing a large synthetic spec as YAML and JSON.
+
+Compares PyYAML's pure Python `yaml.safe_load` and the standard library `json` module with
+`openapi_mcp.spec.load_spec` (libyaml / orjson when available).
+
+Usage: `python -m benchmarks.bench_spec_loading [--operations N]`
+"""
+
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+
+import yaml
+
+from benchmarks.synthetic_spec import make_swagger_v2, write_spec
+from openapi_mcp import spec
+
+
+def best_of(fn, repeat: int = 3) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--operations", type=int, default=2000)
+    args = parser.parse_args()
+
+    document = make_swagger_v2(args.operations)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        yaml_path = write_spec(document, Path(tmp_dir) / "spec.yaml")
+        json_path = write_spec(document, Path(tmp_dir) / "spec.json")
+
+        def load_yaml_pure():
+            with open(yaml_path, encoding="utf-8") as file:
+                return yaml.safe_load(file)
+
+        def load_json_stdlib():
+            with open(json_path, encoding="utf-8") as file:
+                return json.load(file)
+
+        assert spec.load_spec(yaml_path) == spec.load_spec(json_path) == load_yaml_pure()
+
+        print(f"Spec: {args.operations} operations")
+        print(
+            f"  YAML {yaml_path.stat().st_size / 1e6:.1f} MB, JSON {json_path.stat().st_size / 1e6:.1f} MB"
+        )
+        print(f"  libyaml available: {spec.YamlSafeLoader is not yaml.SafeLoader}")
+        print(f"  orjson available: {spec.orjson is not None}")
+        print()
+        rows = [
+            ("yaml.safe_load", best_of(load_yaml_pure, repeat=1)),
+            ("load_spec (yaml)", best_of(lambda: spec.load_spec(yaml_path))),
+            ("json.load", best_of(load_json_stdlib)),
+            ("load_spec (json)", best_of(lambda: spec.load_spec(json_path))),
+        ]
+        for name, seconds in rows:
+            print(f"{name:<20}{seconds * 1000:>10.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
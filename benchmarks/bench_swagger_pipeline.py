@@ -0,0 +1,161 @@
+"""
+Benchmark each stage of the swagger pipeline on a large synthetic spec.
+
+Times (best of `--repeat`) and memory-profiles (with `tracemalloc`) the stages that turn a parsed
+document into MCP tools, each fed with the output of the previous one:
+
+1. `expand_all_references`
+2. `clean_whitespace`
+3. `transform_swagger_to_operation_dict`
+4. `map_operations_to_tools`
+
+"peak" is the most memory allocated at once during a stage, "retained" the size of its output.
+The spec options (`--openapi-version`, `--nesting`, `--recursive`, ...) are those of
+`benchmarks.synthetic_spec`. Results can be written as JSON for regression tracking.
+
+Usage: `python -m benchmarks.bench_swagger_pipeline [--operations N] [--output FILE]`
+"""
+
+import argparse
+import gc
+import json
+import platform
+import resource
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from benchmarks.synthetic_spec import add_spec_arguments, spec_from_arguments
+from openapi_mcp.map import map_operations_to_tools
+from openapi_mcp.swagger import (
+    clean_whitespace,
+    expand_all_references,
+    transform_swagger_to_operation_dict,
+)
+
+STAGES: list[tuple[str, Callable[[Any], Any]]] = [
+    ("expand_all_references", expand_all_references),
+    ("clean_whitespace", clean_whitespace),
+    ("transform_swagger_to_operation_dict", transform_swagger_to_operation_dict),
+    ("map_operations_to_tools", map_operations_to_tools),
+]
+
+
+def count_refs(obj, seen: set[int] | None = None) -> int:
+    """The number of `$ref`s in an object; subtrees shared by several parents are counted once."""
+    if seen is None:
+        seen = set()
+    if not isinstance(obj, (dict, list)) or id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    if isinstance(obj, dict):
+        return ("$ref" in obj) + sum(count_refs(value, seen) for value in obj.values())
+    return sum(count_refs(item, seen) for item in obj)
+
+
+def time_stages(document: dict, repeat: int) -> dict[str, float]:
+    """The best time of each stage, in seconds."""
+    best = {name: float("inf") for name, _ in STAGES}
+    for _ in range(repeat):
+        value = document
+        for name, stage in STAGES:
+            gc.collect()
+            start = time.perf_counter()
+            value = stage(value)
+            best[name] = min(best[name], time.perf_counter() - start)
+    return best
+
+
+def profile_stages(document: dict) -> tuple[dict[str, dict[str, float]], list[Any]]:
+    """The peak and retained memory of each stage, in bytes, and the output of each stage."""
+    memory = {}
+    # Keep every output alive, as the pipeline does while the next stage runs
+    outputs = [document]
+    tracemalloc.start()
+    try:
+        for name, stage in STAGES:
+            gc.collect()
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            outputs.append(stage(outputs[-1]))
+            current, peak = tracemalloc.get_traced_memory()
+            memory[name] = {"peak": peak - before, "retained": current - before}
+    finally:
+        tracemalloc.stop()
+    return memory, outputs[1:]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    add_spec_arguments(parser)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", type=Path, help="Write the results to this JSON file.")
+    args = parser.parse_args()
+
+    document = spec_from_arguments(args)
+    spec_size = len(json.dumps(document))
+    refs = count_refs(document)
+    memory, outputs = profile_stages(document)
+    operations, tools = outputs[2], outputs[3]
+    # `$ref`s the pipeline did not expand, e.g. in OpenAPI v3 request bodies
+    refs_left = count_refs([operation["definition"] for operation in operations.values()])
+    n_tools = len(tools)
+    del outputs, operations, tools
+    times = time_stages(document, args.repeat)
+    # Linux reports kilobytes, macOS bytes
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    max_rss_mb = max_rss / 1e6 if sys.platform == "darwin" else max_rss / 1e3
+
+    print(
+        f"Spec: OpenAPI v{args.openapi_version}, {args.operations} operations, "
+        f"{args.definitions} definitions, {spec_size / 1e6:.1f} MB as JSON, {refs:,} $refs"
+    )
+    print()
+    print(f"{'stage':<38}{'time (ms)':>12}{'peak (MB)':>12}{'retained (MB)':>15}")
+    for name, _ in STAGES:
+        print(
+            f"{name:<38}{times[name] * 1000:>12.1f}{memory[name]['peak'] / 1e6:>12.1f}"
+            f"{memory[name]['retained'] / 1e6:>15.1f}"
+        )
+    print(f"{'total':<38}{sum(times.values()) * 1000:>12.1f}")
+    print()
+    print(f"Tools: {n_tools:,} ({refs_left:,} $refs left in the operations)")
+    print(f"Peak RSS: {max_rss_mb:.0f} MB")
+
+    if args.output is not None:
+        report = {
+            "benchmark": "bench_swagger_pipeline",
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "spec": {
+                "openapi_version": args.openapi_version,
+                "operations": args.operations,
+                "definitions": args.definitions,
+                "shared_refs": args.shared_refs,
+                "nesting": args.nesting,
+                "recursive": args.recursive,
+                "description_sentences": args.description_sentences,
+                "json_bytes": spec_size,
+                "refs": refs,
+            },
+            "stages": {
+                name: {
+                    "seconds": times[name],
+                    "peak_bytes": memory[name]["peak"],
+                    "retained_bytes": memory[name]["retained"],
+                }
+                for name, _ in STAGES
+            },
+            "tools": n_tools,
+            "refs_left": refs_left,
+            "max_rss_mb": max_rss_mb,
+        }
+        args.output.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Benchmark the tool search index on a large synthetic spec.
+
+Measures:
+
+- building the `ToolSearchIndex` of every operation (time and memory allocated), from the
+  unexpanded document as `connect_api` does;
+- the latency of `search()` for random keyword queries;
+- how often an operation is found (in the top `--limit`) by a query made of its summary;
+- the size of the `tools/list` result with every tool, and with `search_tools` and the tools of
+  one search, as in the dynamic `TOOL_SEARCH` mode.
+
+By default each model references one other model (`--shared-refs 1`), as denser `$ref` graphs
+make the inlined input schemas very large.
+
+Usage: `python -m benchmarks.bench_tool_search [--operations N] [--queries N] [--limit K]`
+"""
+
+import argparse
+import gc
+import random
+import statistics
+import time
+import tracemalloc
+
+from benchmarks.synthetic_spec import WORDS, add_spec_arguments, spec_from_arguments
+from openapi_mcp.batch import make_batch_tool
+from openapi_mcp.index import OperationIndex
+from openapi_mcp.search import ToolSearchIndex, make_search_tool
+from openapi_mcp.tool_list import ToolList
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    add_spec_arguments(parser)
+    parser.set_defaults(operations=10000, shared_refs=1)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--limit", type=int, default=10, help="Results per search.")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    operations = OperationIndex(spec_from_arguments(args))
+    rng = random.Random(args.seed)
+
+    build_times = []
+    for _ in range(3):
+        gc.collect()
+        start = time.perf_counter()
+        index = ToolSearchIndex(operations)
+        build_times.append(time.perf_counter() - start)
+    build_time = min(build_times)
+    tracemalloc.start()
+    index = ToolSearchIndex(operations)
+    _, build_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    queries = [" ".join(rng.sample(WORDS, rng.randint(1, 3))) for _ in range(args.queries)]
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        index.search(query, args.limit)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+
+    names = rng.sample(list(operations), min(args.queries, len(operations)))
+    found = sum(
+        name in {result.name for result in index.search(query, args.limit)}
+        for name, query in (
+            (name, f"{operations.unexpanded(name)['summary']} {name}") for name in names
+        )
+    )
+
+    stats = index.stats()
+    print(
+        f"Spec: {len(operations):,} operations; index of {stats['terms']:,} terms built in "
+        f"{build_time * 1000:.1f} ms ({build_peak / 1e6:.1f} MB allocated at peak)"
+    )
+    print(
+        f"search (limit {args.limit}): p50 {statistics.median(latencies) * 1e6:.0f} us, "
+        f"p99 {latencies[int(len(latencies) * 0.99)] * 1e6:.0f} us, "
+        f"{len(latencies) / sum(latencies):,.0f} searches/s"
+    )
+    print(
+        f"operation found by summary + name: {found / len(names):.1%} "
+        f"(in the top {args.limit}, {len(names):,} operations)"
+    )
+
+    found_names = [result.name for result in index.search(queries[0], args.limit)]
+    dynamic = ToolList(
+        [
+            make_search_tool(max_results=args.limit, dynamic=True),
+            *(operations.tool(name) for name in found_names),
+            make_batch_tool(found_names),
+        ]
+    )
+    start = time.perf_counter()
+    every = ToolList([*operations.tools(), make_batch_tool(operations)])
+    every_time = time.perf_counter() - start
+    print(
+        f"tools/list: every tool {result_size(every) / 1e6:.1f} MB (built in {every_time:.1f} s); "
+        f"search_tools + {len(found_names)} found tools {result_size(dynamic) / 1e3:.1f} KB"
+    )
+
+
+def result_size(tool_list: ToolList) -> int:
+    """The size of the serialized `tools/list` result."""
+    return len(tool_list.result.model_dump_json(by_alias=True, exclude_none=True))
+
+
+if __name__ == "__main__":
+    main()
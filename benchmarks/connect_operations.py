@@ -0,0 +1,150 @@
+"""
+Connect operations used by the benchmarks.
+
+These mirror the operations exposed by `openapi_mcp.connect_api` after reference expansion, so
+benchmarks can run without a Connect `swagger.yaml`.
+"""
+
+from openapi_mcp.swagger import OperationDef
+
+USER_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "email": {"type": "string", "description": "The user's email"},
+        "username": {"type": "string", "description": "The user's username"},
+        "first_name": {"type": "string", "description": "The user's first name"},
+        "last_name": {"type": "string", "description": "The user's last name"},
+        "user_role": {"type": "string", "description": "The user's role"},
+        "created_time": {"type": "string", "format": "date-time"},
+        "updated_time": {"type": "string", "format": "date-time"},
+        "active_time": {"type": "string", "format": "date-time"},
+        "confirmed": {"type": "boolean"},
+        "locked": {"type": "boolean"},
+        "guid": {"type": "string", "description": "The user's GUID"},
+    },
+}
+
+CONTENT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "guid": {"type": "string"},
+        "name": {"type": "string"},
+        "title": {"type": "string"},
+        "description": {"type": "string"},
+        "access_type": {"type": "string"},
+        "created_time": {"type": "string", "format": "date-time"},
+        "last_deployed_time": {"type": "string", "format": "date-time"},
+        "app_mode": {"type": "string"},
+        "content_category": {"type": "string"},
+        "owner_guid": {"type": "string"},
+        "content_url": {"type": "string"},
+        "dashboard_url": {"type": "string"},
+        "app_role": {"type": "string"},
+        "id": {"type": "string"},
+    },
+}
+
+CONNECT_OPERATIONS: dict[str, OperationDef] = {
+    "getCurrentUser": {
+        "name": "getCurrentUser",
+        "tags": ["users"],
+        "method": "get",
+        "route": "/v1/user",
+        "definition": {
+            "operationId": "getCurrentUser",
+            "tags": ["users"],
+            "summary": "Get current user details",
+            "description": "Get the details of the user that is associated with the API key.",
+            "responses": {"200": {"description": "The current user.", "schema": USER_SCHEMA}},
+        },
+    },
+    "updateUser": {
+        "name": "updateUser",
+        "tags": ["users"],
+        "method": "patch",
+        "route": "/v1/users/{guid}",
+        "definition": {
+            "operationId": "updateUser",
+            "tags": ["users"],
+            "summary": "Update a user",
+            "description": "Update a user's details. Only administrators may update other users.",
+            "parameters": [
+                {
+                    "name": "guid",
+                    "in": "path",
+                    "type": "string",
+                    "required": True,
+                    "description": "The user's GUID.",
+                },
+                {
+                    "name": "body",
+                    "in": "body",
+                    "required": True,
+                    "description": "The fields to update.",
+                    "schema": {
+                        "type": "object",
+                        "properties": {
+                            "email": {"type": "string"},
+                            "username": {"type": "string"},
+                            "first_name": {"type": "string"},
+                            "last_name": {"type": "string"},
+                            "user_role": {"type": "string"},
+                        },
+                    },
+                },
+            ],
+            "responses": {"200": {"description": "The updated user.", "schema": USER_SCHEMA}},
+        },
+    },
+    "getContents": {
+        "name": "getContents",
+        "tags": ["content"],
+        "method": "get",
+        "route": "/v1/content",
+        "definition": {
+            "operationId": "getContents",
+            "tags": ["content"],
+            "summary": "List content items",
+            "description": "List all of the content items that are visible to the caller.",
+            "parameters": [
+                {
+                    "name": "name",
+                    "in": "query",
+                    "type": "string",
+                    "description": "The content name specified when the content was created.",
+                },
+                {
+                    "name": "owner_guid",
+                    "in": "query",
+                    "type": "string",
+                    "description": "The unique identifier of the user who owns the content.",
+                },
+                {
+                    "name": "include",
+                    "in": "query",
+                    "type": "string",
+                    "description": "Comma separated list of details to include (owner, tags).",
+                },
+            ],
+            "responses": {
+                "200": {
+                    "description": "The content items.",
+                    "schema": {"type": "array", "items": CONTENT_SCHEMA},
+                }
+            },
+        },
+    },
+}
+
+# Representative tool arguments for each operation
+CONNECT_ARGUMENTS: dict[str, dict] = {
+    "getCurrentUser": {},
+    "updateUser": {
+        "guid": "8f37d6e0-3395-4a2c-aa6a-d7f2fe1babc0",
+        "body": {"first_name": "Testing", "last_name": "User"},
+    },
+    "getContents": {
+        "owner_guid": "8f37d6e0-3395-4a2c-aa6a-d7f2fe1babc0",
+        "include": "owner,tags",
+    },
+}
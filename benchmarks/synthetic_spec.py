@@ -0,0 +1,340 @@
+"""
+Synthetic OpenAPI documents for benchmarking.
+
+Swagger (OpenAPI v2) and OpenAPI v3 documents of any size, with shared, deep or recursive `$ref`
+graphs and long descriptions.
+
+Usage: `python -m benchmarks.synthetic_spec OUTPUT [--operations N] [--openapi-version 3]` writes
+a spec to OUTPUT (`.json` or `.yaml`); see `--help` for the other options.
+"""
+
+import argparse
+import json
+import random
+from pathlib import Path
+
+from openapi_mcp.spec import dump_spec
+
+WORDS = (
+    "content user group bundle deployment schedule variable permission owner tag environment "
+    "job process audit instance server version package vanity token session task key"
+).split()
+
+METHODS = ["get", "post", "put", "patch", "delete"]
+
+
+def _sentence(rng: random.Random, n_words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(n_words)).capitalize() + "."
+
+
+def _make_definitions(
+    rng: random.Random,
+    n_definitions: int,
+    *,
+    ref_prefix: str,
+    shared_refs: int,
+    nesting: int,
+    recursive: bool,
+) -> dict[str, dict]:
+    definitions = {}
+    for i in range(n_definitions):
+        properties = {
+            f"{rng.choice(WORDS)}_{j}": {
+                "type": rng.choice(["string", "integer", "boolean"]),
+                "description": _sentence(rng, 8),
+            }
+            for j in range(8)
+        }
+        # Reference previously defined models to build a shared (acyclic) graph
+        for j in range(min(i, shared_refs)):
+            properties[f"ref_{j}"] = {"$ref": f"{ref_prefix}Model{rng.randrange(i)}"}
+        if recursive:
+            # e.g. a tree of groups: expanded up to the resolver's cycle depth
+            properties["parent"] = {"$ref": f"{ref_prefix}Model{i}"}
+        # Wrap the properties in inline objects, as in request bodies with nested settings
+        for level in range(nesting):
+            properties = {
+                f"nested_{level}": {
+                    "type": "object",
+                    "description": _sentence(rng, 6),
+                    "properties": properties,
+                }
+            }
+        definitions[f"Model{i}"] = {
+            "type": "object",
+            "description": _sentence(rng, 12),
+            "properties": properties,
+        }
+    return definitions
+
+
+def _make_paths(
+    rng: random.Random,
+    n_operations: int,
+    n_definitions: int,
+    *,
+    version: int,
+    description_sentences: int,
+) -> dict[str, dict]:
+    ref_prefix = "#/definitions/" if version == 2 else "#/components/schemas/"
+    components = "#/" if version == 2 else "#/components/"
+    string_type = {"type": "string"} if version == 2 else {"schema": {"type": "string"}}
+
+    def schema(ref: str) -> dict:
+        # The schema of a v2 body parameter or response, or the content of a v3 one
+        if version == 2:
+            return {"schema": {"$ref": ref}}
+        return {"content": {"application/json": {"schema": {"$ref": ref}}}}
+
+    paths: dict[str, dict] = {}
+    for i in range(n_operations):
+        resource = f"/v1/{rng.choice(WORDS)}s_{i // 3}"
+        method = METHODS[i % len(METHODS)]
+        route = resource if method in ("get", "post") else resource + "/{guid}"
+        parameters: list[dict] = [
+            {
+                "name": f"{rng.choice(WORDS)}_filter",
+                "in": "query",
+                **string_type,
+                "description": _sentence(rng, 10),
+            }
+        ]
+        if "{guid}" in route:
+            parameters.append({"$ref": f"{components}parameters/Guid"})
+        operation: dict = {}
+        if method in ("post", "put", "patch"):
+            description = _sentence(rng, 6)
+            body_ref = f"{ref_prefix}Model{rng.randrange(n_definitions)}"
+            if version == 2:
+                parameters.append(
+                    {
+                        "name": "body",
+                        "in": "body",
+                        "required": True,
+                        "description": description,
+                        **schema(body_ref),
+                    }
+                )
+            else:
+                operation["requestBody"] = {
+                    "required": True,
+                    "description": description,
+                    **schema(body_ref),
+                }
+        paths.setdefault(route, {})[method] = {
+            "operationId": f"{method}{rng.choice(WORDS).capitalize()}{i}",
+            "tags": [rng.choice(WORDS)],
+            "summary": _sentence(rng, 6),
+            "description": "\n".join(_sentence(rng, 15) for _ in range(description_sentences)),
+            "parameters": parameters,
+            **operation,
+            "responses": {
+                "200": {
+                    "description": "OK",
+                    **schema(f"{ref_prefix}Model{rng.randrange(n_definitions)}"),
+                },
+                "401": {"$ref": f"{components}responses/Unauthorized"},
+            },
+        }
+    return paths
+
+
+def make_swagger_v2(
+    n_operations: int = 2000,
+    *,
+    n_definitions: int = 200,
+    shared_refs: int = 2,
+    nesting: int = 0,
+    recursive: bool = False,
+    description_sentences: int = 3,
+    seed: int = 0,
+) -> dict:
+    """
+    Generate a Swagger (OpenAPI v2) document.
+
+    Operations reference shared definitions, and definitions reference each other, so `$ref`
+    expansion has real work to do.
+
+    Arguments
+    ---------
+    n_operations
+        The number of operations (spread over `n_operations / 3` paths).
+    n_definitions
+        The number of shared model definitions.
+    shared_refs
+        The number of (earlier) definitions each definition references. Higher values make the
+        `$ref` graph denser and deeper.
+    nesting
+        Levels of inline objects wrapping the properties of each definition.
+    recursive
+        Make every definition reference itself, as recursive models do.
+    description_sentences
+        The number of 15 word sentences (one per line) in each operation description.
+    seed
+        Random seed; the same arguments always produce the same document.
+    """
+    rng = random.Random(seed)
+    definitions = _make_definitions(
+        rng,
+        n_definitions,
+        ref_prefix="#/definitions/",
+        shared_refs=shared_refs,
+        nesting=nesting,
+        recursive=recursive,
+    )
+    paths = _make_paths(
+        rng,
+        n_operations,
+        n_definitions,
+        version=2,
+        description_sentences=description_sentences,
+    )
+    return {
+        "swagger": "2.0",
+        "info": {"title": "Synthetic API", "version": "1.0.0"},
+        "basePath": "/__api__",
+        "paths": paths,
+        "parameters": {
+            "Guid": {
+                "name": "guid",
+                "in": "path",
+                "type": "string",
+                "required": True,
+                "description": "The unique identifier.",
+            }
+        },
+        "responses": {
+            "Unauthorized": {"description": "Unauthorized", "schema": {"type": "object"}},
+        },
+        "definitions": definitions,
+    }
+
+
+def make_openapi_v3(
+    n_operations: int = 2000,
+    *,
+    n_definitions: int = 200,
+    shared_refs: int = 2,
+    nesting: int = 0,
+    recursive: bool = False,
+    description_sentences: int = 3,
+    seed: int = 0,
+) -> dict:
+    """
+    Generate an OpenAPI v3 document.
+
+    The same API as `make_swagger_v2()`, with the schemas in `components` and request bodies in
+    `requestBody`.
+
+    Arguments
+    ---------
+    n_operations
+        The number of operations (spread over `n_operations / 3` paths).
+    n_definitions
+        The number of shared component schemas.
+    shared_refs
+        The number of (earlier) schemas each schema references.
+    nesting
+        Levels of inline objects wrapping the properties of each schema.
+    recursive
+        Make every schema reference itself, as recursive models do.
+    description_sentences
+        The number of 15 word sentences (one per line) in each operation description.
+    seed
+        Random seed; the same arguments always produce the same document.
+    """
+    rng = random.Random(seed)
+    schemas = _make_definitions(
+        rng,
+        n_definitions,
+        ref_prefix="#/components/schemas/",
+        shared_refs=shared_refs,
+        nesting=nesting,
+        recursive=recursive,
+    )
+    paths = _make_paths(
+        rng,
+        n_operations,
+        n_definitions,
+        version=3,
+        description_sentences=description_sentences,
+    )
+    return {
+        "openapi": "3.0.3",
+        "info": {"title": "Synthetic API", "version": "1.0.0"},
+        "servers": [{"url": "/__api__"}],
+        "paths": paths,
+        "components": {
+            "schemas": schemas,
+            "parameters": {
+                "Guid": {
+                    "name": "guid",
+                    "in": "path",
+                    "schema": {"type": "string"},
+                    "required": True,
+                    "description": "The unique identifier.",
+                }
+            },
+            "responses": {
+                "Unauthorized": {
+                    "description": "Unauthorized",
+                    "content": {"application/json": {"schema": {"type": "object"}}},
+                },
+            },
+        },
+    }
+
+
+def make_spec(version: int = 2, n_operations: int = 2000, **kwargs) -> dict:
+    """Generate a Swagger (`version=2`) or OpenAPI v3 document; see `make_swagger_v2()`."""
+    if version == 2:
+        return make_swagger_v2(n_operations, **kwargs)
+    if version == 3:
+        return make_openapi_v3(n_operations, **kwargs)
+    raise ValueError(f"Unsupported OpenAPI version: {version}")
+
+
+def add_spec_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the options of `make_spec()` to a command line parser."""
+    parser.add_argument("--operations", type=int, default=2000)
+    parser.add_argument("--openapi-version", type=int, choices=[2, 3], default=2)
+    parser.add_argument("--definitions", type=int, default=200)
+    parser.add_argument("--shared-refs", type=int, default=2)
+    parser.add_argument("--nesting", type=int, default=0)
+    parser.add_argument("--recursive", action="store_true")
+    parser.add_argument("--description-sentences", type=int, default=3)
+
+
+def spec_from_arguments(args: argparse.Namespace) -> dict:
+    return make_spec(
+        args.openapi_version,
+        args.operations,
+        n_definitions=args.definitions,
+        shared_refs=args.shared_refs,
+        nesting=args.nesting,
+        recursive=args.recursive,
+        description_sentences=args.description_sentences,
+    )
+
+
+def write_spec(document: dict, path: str | Path) -> Path:
+    """Write a document as JSON or YAML depending on the file extension."""
+    path = Path(path)
+    with open(path, "w", encoding="utf-8") as file:
+        if path.suffix == ".json":
+            json.dump(document, file)
+        else:
+            dump_spec(document, file)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("output")
+    add_spec_arguments(parser)
+    args = parser.parse_args()
+    write_spec(spec_from_arguments(args), args.output)
+
+
+if __name__ == "__main__":
+    main()
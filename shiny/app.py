@@ -5,23 +5,33 @@
 # as well as https://github.com/anthropics/anthropic-sdk-python#aws-bedrock
 # ------------------------------------------------------------------------------------
 import asyncio
+import logging
 import os
 
 import chatlas
 import htmltools
 import requests
 
-from openapi_mcp.chatlas import SwaggerTool
+from openapi_mcp.chatlas import SwaggerBatchTool, SwaggerSearchTool, SwaggerTool
+from openapi_mcp.log import LOGGER_NAME, configure_logging
 from openapi_mcp.map import map_operations_to_tools
+from openapi_mcp.pool import ClientPool
+from openapi_mcp.spec import loads_spec
 from openapi_mcp.swagger import (
     expand_all_references,
     transform_swagger_to_operation_dict,
 )
-from shiny import reactive, req
+from shiny import reactive, req, session
 from shiny import ui as core_ui
 from shiny.express import input, render, ui  # noqa: A004
 
+configure_logging(os.getenv("LOG_LEVEL", "INFO"))
+logger = logging.getLogger(f"{LOGGER_NAME}.shiny")
+
 STREAM_CHAT = True
+# Register a `search_tools` tool that registers the operations it finds, instead of every
+# operation (for large APIs)
+TOOL_SEARCH = os.getenv("TOOL_SEARCH", "").lower() in ("1", "true", "yes")
 IS_LOCAL = not os.environ.get("CONNECT_CONTENT_GUID", "")
 DEFAULT_OPENAPI_URL = (
     "http://127.0.0.1:8000/"
@@ -33,6 +43,10 @@ aws_model = os.getenv("AWS_MODEL", "us.anthropic.claude-3-5-sonnet-20241022-v2:0
 aws_region = os.getenv("AWS_REGION", "us-east-1")
 chat = chatlas.ChatBedrockAnthropic(model=aws_model, aws_region=aws_region)
 
+# The upstream clients of this session (the app module runs once per session), closed with it
+client_pool = ClientPool()
+session.get_current_session().on_ended(client_pool.aclose)
+
 # Set some Shiny page options
 ui.page_opts(
     window_title="OpenAPI Chat",
@@ -65,14 +79,35 @@ def _():
     api_url = openapi_url.get()
 
     SwaggerTool.reset_tools(chat)
+    if TOOL_SEARCH:
+        SwaggerTool.register_tool(
+            chat,
+            SwaggerSearchTool(
+                chat=chat,
+                base_url=api_url,
+                operations=api_operations,
+                client_pool=client_pool,
+            ),
+        )
+        return
     for operation in api_operations.values():
         SwaggerTool.register_tool(
             chat,
             SwaggerTool(
                 base_url=api_url,
                 operation=operation,
+                client_pool=client_pool,
             ),
         )
+    # Lets the model fan out many calls (e.g. one per character) in a single turn
+    SwaggerTool.register_tool(
+        chat,
+        SwaggerBatchTool(
+            base_url=api_url,
+            operations=api_operations,
+            client_pool=client_pool,
+        ),
+    )
 
 
 with ui.sidebar(open="open", id="sidebar", width="50%"):
@@ -151,8 +186,7 @@ def openapi_json():
     ui.notification_show(f"Fetching OpenAPI schema from {url}", id="fetching_openapi")
     response = requests.get(url)
     if response.status_code != 200:
-        print("Failed to fetch OpenAPI schema from", url)
-        print(response)
+        logger.warning("Failed to fetch OpenAPI schema from %s: %s", url, response.status_code)
         ui.notification_show(
             f"Failed to get OpenAPI\n{response.text}",
             id="fetching_openapi",
@@ -161,7 +195,7 @@ def openapi_json():
         )
         req(False)
         return
-    result = response.json()
+    result = loads_spec(response.content)
     return result
 
 
@@ -185,19 +219,20 @@ def openapi_tools():
 @reactive.effect
 def _():
     req(openapi_operations())
-    print("OpenAPI operations:", openapi_operations())
+    logger.info("OpenAPI operations: %s", list(openapi_operations()))
 
 
 @reactive.effect
 def _():
     req(openapi_tools())
-    print("OpenAPI tools:", openapi_tools())
+    # The full tool and spec definitions are only rendered when debug logging is enabled
+    logger.debug("OpenAPI tools: %s", openapi_tools())
 
 
 @reactive.effect
 def _():
     req(openapi_json())
-    print("OpenAPI JSON:", openapi_json())
+    logger.debug("OpenAPI JSON: %s", openapi_json())
 
 
 @reactive.effect
@@ -207,7 +242,7 @@ async def _():
     if input_api_url is None:
         return
     if not isinstance(input_api_url, str):
-        print("Be sure to enter a string. Received:", input_api_url)
+        logger.warning("Be sure to enter a string. Received: %r", input_api_url)
         return
     if input_api_url == "":
         input_api_url = DEFAULT_OPENAPI_URL
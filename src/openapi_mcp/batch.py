@@ -0,0 +1,124 @@
+import asyncio
+import json
+from collections.abc import Awaitable, Callable, Iterable
+from typing import Any
+
+import mcp.types as types
+
+BATCH_TOOL_NAME = "batch_call"
+
+
+def make_batch_tool(operation_names: Iterable[str], *, max_calls: int = 50) -> types.Tool:
+    """
+    Create the `batch_call` tool, which calls many operations in a single tool call.
+
+    Arguments
+    ---------
+    operation_names
+        The operations that may be called from the batch.
+    max_calls
+        The maximum number of calls in one batch.
+    """
+    return types.Tool(
+        name=BATCH_TOOL_NAME,
+        description=(
+            "Call several operations concurrently in a single request. Use this instead of "
+            "calling tools one at a time when the calls do not depend on each other (e.g. the "
+            "same operation for several inputs). Results are returned in the same order as the "
+            "calls; a failing call returns an `error` instead of a `result`."
+        ),
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "calls": {
+                    "type": "array",
+                    "description": "The operations to call.",
+                    "minItems": 1,
+                    "maxItems": max_calls,
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "operation": {
+                                "type": "string",
+                                "enum": list(operation_names),
+                                "description": "The name of the operation (tool) to call.",
+                            },
+                            "arguments": {
+                                "type": "object",
+                                "description": "The arguments for the operation.",
+                            },
+                        },
+                        "required": ["operation"],
+                    },
+                },
+            },
+            "required": ["calls"],
+        },
+    )
+
+
+async def run_batch(
+    calls: list[dict[str, Any]],
+    call_operation: Callable[[str, dict | None], Awaitable[str]],
+    *,
+    operation_names: Iterable[str],
+    max_concurrency: int = 8,
+    max_calls: int = 50,
+) -> str:
+    """
+    Run the calls of a `batch_call` concurrently.
+
+    Arguments
+    ---------
+    calls
+        The `calls` argument of the batch tool: a list of `{operation, arguments}` entries.
+    call_operation
+        Calls a single operation with its arguments and returns the response text.
+    operation_names
+        The operations that may be called from the batch.
+    max_concurrency
+        The maximum number of calls running at the same time.
+    max_calls
+        The maximum number of calls in one batch.
+
+    Returns
+    -------
+    :
+        A JSON array with one `{operation, result}` or `{operation, error}` entry per call, in
+        the order of `calls`. JSON responses are embedded as JSON rather than as strings.
+    """
+    if not isinstance(calls, list) or len(calls) == 0:
+        raise ValueError("`calls` must be a non-empty list of `{operation, arguments}` entries.")
+    if len(calls) > max_calls:
+        raise ValueError(f"A batch can contain at most {max_calls} calls; got {len(calls)}.")
+
+    allowed = set(operation_names)
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def run_one(call: Any) -> dict[str, Any]:
+        operation = call.get("operation") if isinstance(call, dict) else None
+        if (
+            not isinstance(operation, str)
+            or operation not in allowed
+            or operation == BATCH_TOOL_NAME
+        ):
+            return {"operation": operation, "error": f"Operation '{operation}' is not supported."}
+        arguments = call.get("arguments")
+        if not isinstance(arguments, dict | None):
+            return {
+                "operation": operation,
+                "error": f"`arguments` must be an object; got {type(arguments).__name__}.",
+            }
+        try:
+            async with semaphore:
+                text = await call_operation(operation, arguments)
+        except Exception as e:
+            return {"operation": operation, "error": f"{type(e).__name__}: {e}"}
+        try:
+            result = json.loads(text)
+        except ValueError:
+            result = text
+        return {"operation": operation, "result": result}
+
+    results = await asyncio.gather(*(run_one(call) for call in calls))
+    return json.dumps(results)
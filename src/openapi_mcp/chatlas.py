@@ -1,3 +1,4 @@
+import json
 import os
 from typing import Any, Callable
 
@@ -5,11 +6,15 @@ import chatlas
 import mcp.types as mcp_types
 from typing_extensions import TYPE_CHECKING
 
+from .batch import make_batch_tool, run_batch
 from .map import (
+    SupportedOperations,
     make_request,
-    map_arguments_to_api_params,
     map_operations_to_tools,
 )
+from .pool import ClientPool
+from .search import ToolSearchIndex, make_search_tool
+from .shaping import ResponseShape
 from .swagger import (
     OperationDef,
 )
@@ -52,7 +57,13 @@ class RawChatlasTool(chatlas.Tool):
 
 
 class SwaggerTool(RawChatlasTool):
-    def __init__(self, *, base_url: str, operation: OperationDef):
+    def __init__(
+        self,
+        *,
+        base_url: str,
+        operation: OperationDef,
+        client_pool: ClientPool,
+    ):
         operation_name = operation["name"]
 
         operation_description = operation["definition"]["description"]
@@ -61,18 +72,20 @@ class SwaggerTool(RawChatlasTool):
 
         async def call_api(**kwargs: Any):
             # print("\n\nCalling tool", self.name, "with args:", kwargs)
-            api_params = map_arguments_to_api_params(
-                kwargs,
-                operation["definition"].get("parameters", []),
-            )
             CONNECT_API_KEY = os.environ.get("CONNECT_API_KEY", "")
+            shape = ResponseShape.from_arguments(operation, kwargs)
             result = await make_request(
                 base_url,
                 operation,
-                api_params,
+                kwargs,
                 CONNECT_API_KEY="",
+                client_pool=client_pool,
             )
-            return [mcp_types.TextContent(text=result, type="text")]
+            return [
+                mcp_types.TextContent(
+                    text=shape.apply(result.text, result.status_code), type="text"
+                )
+            ]
 
         super().__init__(
             name=operation_name,
@@ -83,3 +96,91 @@ class SwaggerTool(RawChatlasTool):
 
         # RawChatlasTool class variables
         self._operation = operation
+
+
+class SwaggerBatchTool(RawChatlasTool):
+    def __init__(
+        self,
+        *,
+        base_url: str,
+        operations: SupportedOperations,
+        client_pool: ClientPool,
+        max_concurrency: int = 8,
+        max_calls: int = 50,
+    ):
+        tool = make_batch_tool(operations, max_calls=max_calls)
+
+        async def call_operation(name: str, arguments: dict | None) -> str:
+            shape = ResponseShape.from_arguments(operations[name], arguments)
+            result = await make_request(
+                base_url,
+                operations[name],
+                arguments,
+                CONNECT_API_KEY="",
+                client_pool=client_pool,
+            )
+            return shape.apply(result.text, result.status_code)
+
+        async def call_batch(calls: list[dict[str, Any]]):
+            result = await run_batch(
+                calls,
+                call_operation,
+                operation_names=operations,
+                max_concurrency=max_concurrency,
+                max_calls=max_calls,
+            )
+            return [mcp_types.TextContent(text=result, type="text")]
+
+        super().__init__(
+            name=tool.name,
+            fn=call_batch,
+            description=tool.description or "",
+            input_schema=tool.inputSchema,
+        )
+
+
+class SwaggerSearchTool(RawChatlasTool):
+    """
+    The `search_tools` tool, which finds operations by keywords.
+
+    With a `chat`, the operations found are registered as tools of the chat (replacing those of
+    the previous search), so only the search tool needs to be registered up front.
+    """
+
+    def __init__(
+        self,
+        *,
+        operations: SupportedOperations,
+        chat: chatlas.Chat | None = None,
+        base_url: str = "",
+        client_pool: ClientPool,
+        max_results: int = 10,
+    ):
+        index = ToolSearchIndex(operations)
+        tool = make_search_tool(max_results=max_results, dynamic=chat is not None)
+        found: list[str] = []
+
+        async def search(query: str, limit: int = max_results):
+            results = index.search(query, max(1, min(limit, max_results)))
+            if chat is not None:
+                for name in found:
+                    # TODO-chatlas: Add a method to remove a tool to the chatlas.Chat class
+                    chat._tools.pop(name, None)
+                found[:] = [result.name for result in results]
+                for name in found:
+                    self.register_tool(
+                        chat,
+                        SwaggerTool(
+                            base_url=base_url,
+                            operation=operations[name],
+                            client_pool=client_pool,
+                        ),
+                    )
+            return [mcp_types.TextContent(text=json.dumps(index.describe(results)), type="text")]
+
+        super().__init__(
+            name=tool.name,
+            fn=search,
+            description=tool.description or "",
+            input_schema=tool.inputSchema,
+        )
@@ -1,12 +1,40 @@
+import logging
 from contextlib import AsyncExitStack
 from typing import Any, Optional
 
 import chatlas
+import mcp.types as types
 from chatlas import Chat
 from mcp import ClientSession
 from mcp.client.sse import sse_client
 
 from openapi_mcp.chatlas import RawChatlasTool
+from openapi_mcp.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+
+async def call_tool(
+    session: ClientSession, name: str, arguments: dict | None = None
+) -> types.CallToolResult:
+    """
+    Send a tools/call request, propagating the current trace context in the request `_meta`.
+
+    Same as `ClientSession.call_tool()`, which does not accept request metadata.
+    """
+    meta: dict[str, Any] = {}
+    tracer.inject(meta)
+    return await session.send_request(
+        types.ClientRequest(
+            types.CallToolRequest(
+                method="tools/call",
+                params=types.CallToolRequestParams(
+                    name=name, arguments=arguments, _meta=meta or None
+                ),
+            )
+        ),
+        types.CallToolResult,
+    )
 
 
 class MCPClient:
@@ -37,14 +65,19 @@ class MCPClient:
         # List available tools
         response = await self.session.list_tools()
         tools = response.tools
-        print("\nConnected to server with tools:", [tool.name for tool in tools])
+        logger.info("Connected to %s with tools: %s", server_url, [tool.name for tool in tools])
 
         self_session = self.session
 
         def register_mcp_tool(chat: chatlas.Chat, mcp_tool):
             async def _call(**args: Any) -> Any:
                 # print(f"Client - Calling: {mcp_tool.name}")
-                result = await self_session.call_tool(mcp_tool.name, args)
+                with tracer.start_span(
+                    f"mcp.call_tool {mcp_tool.name}",
+                    kind="client",
+                    attributes={"mcp.tool": mcp_tool.name},
+                ):
+                    result = await call_tool(self_session, mcp_tool.name, args)
                 # print(f"Client - Called: {mcp_tool.name}; Result: {result}")
                 if result.content[0].type == "text":
                     return result.content[0].text
@@ -0,0 +1,399 @@
+import argparse
+import json
+import logging
+import re
+from collections import Counter
+from collections.abc import Callable, Iterable
+from typing import Any, NamedTuple
+
+import mcp.types as types
+from pydantic_core import to_json
+
+# Shrinking tools whose description and input schema exceed a token budget. References are
+# inlined into the input schemas, so deeply nested or repeated request body models can make a
+# single tool many thousands of tokens long.
+
+logger = logging.getLogger(__name__)
+
+# Tokens are estimated from the size of the JSON sent to the model
+CHARS_PER_TOKEN = 4
+
+# Keywords whose value is a schema, a list of schemas or a mapping of names to schemas
+_SCHEMA_KEYWORDS = ("items", "additionalProperties", "additionalItems", "not", "contains")
+_SCHEMA_LIST_KEYWORDS = ("allOf", "anyOf", "oneOf", "prefixItems", "items")
+_SCHEMA_MAP_KEYWORDS = ("properties", "patternProperties")
+
+# Sub-schemas shorter than this (in JSON characters) are not worth replacing with a `$ref`
+_MIN_DEDUPE_LENGTH = 200
+# Descriptions of properties are cut to their first sentence, at most this long
+_PROPERTY_DESCRIPTION_LENGTH = 100
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s")
+
+
+def estimate_tokens(obj: Any) -> int:
+    """Estimate the number of tokens of an object sent to a model as JSON."""
+    return -(-len(to_json(obj)) // CHARS_PER_TOKEN)
+
+
+def tool_tokens(tool: types.Tool) -> int:
+    """Estimate the number of tokens of a tool's name, description and input schema."""
+    return estimate_tokens(
+        {"name": tool.name, "description": tool.description, "input_schema": tool.inputSchema}
+    )
+
+
+class ToolSize(NamedTuple):
+    name: str
+    before: int
+    """Estimated tokens before compaction."""
+    after: int
+    """Estimated tokens after compaction."""
+    steps: tuple[str, ...]
+    """The compaction steps applied (empty if the tool was within the budget)."""
+
+
+def _map_subschemas(schema: dict[str, Any], fn: Callable[[Any], Any]) -> dict[str, Any]:
+    # A copy of `schema` with `fn` applied to each of its direct sub-schemas
+    result = dict(schema)
+    for keyword in _SCHEMA_KEYWORDS:
+        if isinstance(result.get(keyword), dict):
+            result[keyword] = fn(result[keyword])
+    for keyword in _SCHEMA_LIST_KEYWORDS:
+        if isinstance(result.get(keyword), list):
+            result[keyword] = [
+                fn(item) if isinstance(item, dict) else item for item in result[keyword]
+            ]
+    for keyword in _SCHEMA_MAP_KEYWORDS:
+        if isinstance(result.get(keyword), dict):
+            result[keyword] = {
+                name: fn(value) if isinstance(value, dict) else value
+                for name, value in result[keyword].items()
+            }
+    return result
+
+
+def _subschemas(schema: dict[str, Any]) -> Iterable[dict[str, Any]]:
+    for keyword in _SCHEMA_KEYWORDS:
+        if isinstance(schema.get(keyword), dict):
+            yield schema[keyword]
+    for keyword in _SCHEMA_LIST_KEYWORDS:
+        if isinstance(schema.get(keyword), list):
+            yield from (item for item in schema[keyword] if isinstance(item, dict))
+    for keyword in _SCHEMA_MAP_KEYWORDS:
+        if isinstance(schema.get(keyword), dict):
+            yield from (value for value in schema[keyword].values() if isinstance(value, dict))
+
+
+def _shorten(text: str, max_length: int) -> str:
+    """Cut text at the last sentence end within `max_length` (or at `max_length`)."""
+    if len(text) <= max_length:
+        return text
+    ends = [match.start() for match in _SENTENCE_END_RE.finditer(text, 0, max_length)]
+    if ends:
+        return text[: ends[-1]]
+    return text[: max_length - 3].rstrip() + "..."
+
+
+class _Sub:
+    # Stands for a numbered sub-schema in the structure of its parent
+    __slots__ = ("number",)
+
+    def __init__(self, number: int):
+        self.number = number
+
+
+def dedupe_schema(schema: dict[str, Any]) -> dict[str, Any]:
+    """
+    Replace sub-schemas that occur several times in a schema with references to a single copy.
+
+    The copies are moved to the schema's `$defs`. The schema describes the same values.
+
+    Arguments
+    ---------
+    schema
+        The schema. It is not modified.
+
+    Returns
+    -------
+    :
+        The deduplicated schema, or `schema` itself if no sub-schema is worth deduplicating.
+    """
+    # Equal sub-schemas get the same number. A sub-schema's structure is its own keywords with its
+    # sub-schemas replaced by their numbers, so each distinct object (expanded references are
+    # shared) is only serialized shallowly, once.
+    numbers: dict[int, int] = {}
+    structures: dict[str, int] = {}
+    objects: list[dict[str, Any]] = []
+    children: list[list[int]] = []
+    lengths: list[int] = []
+
+    def number(sub: dict[str, Any]) -> int:
+        n = numbers.get(id(sub))
+        if n is not None:
+            return n
+        sub_numbers = []
+
+        def placeholder(child: dict[str, Any]) -> _Sub:
+            sub_numbers.append(number(child))
+            return _Sub(sub_numbers[-1])
+
+        structure = json.dumps(
+            _map_subschemas(sub, placeholder),
+            sort_keys=True,
+            default=lambda value: {"$sub": value.number},
+        )
+        n = structures.get(structure)
+        if n is None:
+            n = structures[structure] = len(objects)
+            objects.append(sub)
+            children.append(sub_numbers)
+            lengths.append(len(structure) + sum(lengths[child] for child in sub_numbers))
+        numbers[id(sub)] = n
+        return n
+
+    # Occurrences of each sub-schema; the insides of repeated sub-schemas are counted once, as
+    # they are deduplicated together with it
+    counts: Counter[int] = Counter()
+    pending = list(children[number(schema)])
+    while pending:
+        n = pending.pop()
+        counts[n] += 1
+        if counts[n] == 1:
+            pending.extend(children[n])
+    repeated = {n for n, count in counts.items() if count > 1 and lengths[n] >= _MIN_DEDUPE_LENGTH}
+    if not repeated:
+        return schema
+
+    defs: dict[str, Any] = dict(schema.get("$defs") or {})
+    names: dict[int, str] = {}
+    built: dict[int, dict[str, Any]] = {}
+
+    def build(sub: dict[str, Any]) -> dict[str, Any]:
+        n = numbers[id(sub)]
+        if n not in repeated:
+            if n not in built:
+                built[n] = _map_subschemas(objects[n], build)
+            return built[n]
+        if n not in names:
+            name = names[n] = _def_name(objects[n], defs)
+            defs[name] = {}
+            defs[name] = _map_subschemas(objects[n], build)
+        return {"$ref": f"#/$defs/{names[n]}"}
+
+    result = _map_subschemas(schema, build)
+    result["$defs"] = defs
+    return result
+
+
+def _def_name(schema: dict[str, Any], defs: dict[str, Any]) -> str:
+    base = re.sub(r"[^A-Za-z0-9_]", "", str(schema.get("title") or "")) or "Schema"
+    name = base
+    n = 1
+    while name in defs:
+        n += 1
+        name = f"{base}{n}"
+    return name
+
+
+def trim_descriptions(schema: dict[str, Any]) -> dict[str, Any]:
+    """Cut the descriptions in a schema to their first sentence."""
+    # Trimmed copies by identity, as expanded references are shared
+    trimmed: dict[int, dict[str, Any]] = {}
+
+    def trim(sub: dict[str, Any]) -> dict[str, Any]:
+        result = trimmed.get(id(sub))
+        if result is None:
+            result = trimmed[id(sub)] = _map_subschemas(sub, trim)
+            if isinstance(result.get("description"), str):
+                result["description"] = _shorten(
+                    _SENTENCE_END_RE.split(result["description"].strip(), maxsplit=1)[0],
+                    _PROPERTY_DESCRIPTION_LENGTH,
+                )
+        return result
+
+    return _map_subschemas(schema, trim)
+
+
+def collapse_schema(schema: dict[str, Any], max_depth: int) -> dict[str, Any]:
+    """
+    Drop the sub-schemas nested deeper than `max_depth`.
+
+    The properties of the schema itself are at depth 1, their properties (or items) at depth 2,
+    and so on. Schemas at `max_depth` keep only their type and description.
+    """
+    # Collapsed copies by identity and depth, as expanded references are shared
+    collapsed_schemas: dict[tuple[int, int], dict[str, Any]] = {}
+
+    def collapse(sub: dict[str, Any], depth: int) -> dict[str, Any]:
+        if depth < max_depth:
+            result = collapsed_schemas.get((id(sub), depth))
+            if result is None:
+                result = collapsed_schemas[(id(sub), depth)] = _map_subschemas(
+                    sub, lambda child: collapse(child, depth + 1)
+                )
+            return result
+        if not any(True for _ in _subschemas(sub)):
+            return sub
+        collapsed = {key: sub[key] for key in ("type", "title") if key in sub}
+        description = sub.get("description")
+        note = "(Nested fields omitted.)"
+        collapsed["description"] = f"{description} {note}" if description else note
+        return collapsed
+
+    return _map_subschemas(schema, lambda child: collapse(child, 1))
+
+
+class ToolCompactor:
+    """
+    Compacts tools that exceed a token budget.
+
+    Tools within the budget are returned as is. Larger tools go through these steps until they
+    fit (or every step was applied), cumulatively:
+
+    1. `dedupe`: repeated sub-schemas are replaced with references (lossless);
+    2. `descriptions`: the tool description is shortened to `description_length` characters and
+       the descriptions in the schema to their first sentence;
+    3. `depth=N`: sub-schemas nested deeper than `N` are collapsed, for `N` from `max_depth`
+       down to 1 (only the types and descriptions of the parameters are left).
+
+    Compacted tools are cached by name, and rebuilt when a different tool of the same name is
+    compacted (e.g. after the spec was reloaded).
+
+    Arguments
+    ---------
+    budget
+        The token budget of a tool (estimated as `CHARS_PER_TOKEN` characters per token).
+    max_depth
+        The deepest nesting kept when descriptions alone do not bring a tool within the budget.
+    description_length
+        The maximum length of shortened tool descriptions, in characters.
+    """
+
+    def __init__(self, budget: int, *, max_depth: int = 3, description_length: int = 500):
+        self.budget = budget
+        self.max_depth = max_depth
+        self.description_length = description_length
+        self._tools: dict[str, tuple[types.Tool, types.Tool, ToolSize]] = {}
+
+    def compact(self, tool: types.Tool) -> types.Tool:
+        """Compact a tool if it exceeds the budget."""
+        cached = self._tools.get(tool.name)
+        if cached is not None and cached[0] is tool:
+            return cached[1]
+        compacted, size = self._compact(tool)
+        self._tools[tool.name] = (tool, compacted, size)
+        if size.steps:
+            logger.debug(
+                "Compacted tool %s from ~%d to ~%d tokens (%s)",
+                size.name,
+                size.before,
+                size.after,
+                ", ".join(size.steps),
+            )
+        return compacted
+
+    def compact_all(self, tools: Iterable[types.Tool]) -> list[types.Tool]:
+        """Compact tools, logging a summary of those compacted for the first time."""
+        compacted = []
+        sizes = []
+        for tool in tools:
+            cached = self._tools.get(tool.name)
+            result = self.compact(tool)
+            if result is not tool and (cached is None or cached[0] is not tool):
+                sizes.append(self._tools[tool.name][2])
+            compacted.append(result)
+        if sizes:
+            logger.info(
+                "Compacted %d of %d tools from ~%d to ~%d tokens (%d still over the budget)",
+                len(sizes),
+                len(compacted),
+                sum(size.before for size in sizes),
+                sum(size.after for size in sizes),
+                sum(1 for size in sizes if size.after > self.budget),
+            )
+        return compacted
+
+    def _compact(self, tool: types.Tool) -> tuple[types.Tool, ToolSize]:
+        before = tool_tokens(tool)
+        if before <= self.budget:
+            return tool, ToolSize(tool.name, before, before, ())
+
+        description = tool.description or ""
+
+        def shorten_description(schema):
+            nonlocal description
+            description = _shorten(description.strip().split("\n\n")[0], self.description_length)
+            return trim_descriptions(schema)
+
+        steps: list[tuple[str, Callable[[dict[str, Any]], dict[str, Any]]]] = [
+            ("dedupe", lambda schema: schema),
+            ("descriptions", shorten_description),
+            *(
+                (f"depth={depth}", lambda schema, depth=depth: collapse_schema(schema, depth))
+                for depth in range(self.max_depth, 0, -1)
+            ),
+        ]
+        schema = tool.inputSchema
+        applied = []
+        for name, step in steps:
+            schema = step(schema)
+            applied.append(name)
+            compacted = tool.model_copy(
+                update={"description": description, "inputSchema": dedupe_schema(schema)}
+            )
+            after = tool_tokens(compacted)
+            if after <= self.budget:
+                break
+        return compacted, ToolSize(tool.name, before, after, tuple(applied))
+
+    def sizes(self) -> list[ToolSize]:
+        """The size of every tool compacted so far, before and after compaction."""
+        return [size for _, _, size in self._tools.values()]
+
+    def stats(self) -> dict[str, int]:
+        sizes = self.sizes()
+        return {
+            "tools": len(sizes),
+            "compacted": sum(1 for size in sizes if size.steps),
+            "over_budget": sum(1 for size in sizes if size.after > self.budget),
+            "tokens_before": sum(size.before for size in sizes),
+            "tokens_after": sum(size.after for size in sizes),
+        }
+
+
+def format_report(sizes: Iterable[ToolSize]) -> str:
+    """A table of the size of each tool before and after compaction."""
+    sizes = list(sizes)
+    width = max([len("total"), *(len(size.name) for size in sizes)])
+    lines = [f"{'tool':<{width}}  {'before':>8}  {'after':>8}  steps"]
+    for size in sizes:
+        lines.append(
+            f"{size.name:<{width}}  {size.before:>8,}  {size.after:>8,}  {', '.join(size.steps)}"
+        )
+    lines.append(
+        f"{'total':<{width}}  {sum(size.before for size in sizes):>8,}  "
+        f"{sum(size.after for size in sizes):>8,}"
+    )
+    return "\n".join(lines)
+
+
+def main():
+    # Imported here as `index` (through `map`) depends on much of the package
+    from .index import OperationIndex
+    from .spec import load_spec
+
+    parser = argparse.ArgumentParser(
+        description="Report the size of the tools of a spec before and after compaction."
+    )
+    parser.add_argument("spec", help="The swagger file.")
+    parser.add_argument("--budget", type=int, default=2000, help="Token budget per tool.")
+    parser.add_argument("--max-depth", type=int, default=3)
+    args = parser.parse_args()
+
+    compactor = ToolCompactor(args.budget, max_depth=args.max_depth)
+    compactor.compact_all(OperationIndex(load_spec(args.spec)).tools())
+    print(format_report(compactor.sizes()))
+
+
+if __name__ == "__main__":
+    main()
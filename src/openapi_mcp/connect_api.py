@@ -1,26 +1,142 @@
+import asyncio
+import contextlib
+import json
+import logging
 import os
-from typing import TYPE_CHECKING, Sequence
+import time
+import weakref
+from typing import TYPE_CHECKING, Iterable, Sequence
 
 import mcp.types as types
-import yaml
-from mcp.server import Server
+from mcp.server import NotificationOptions, Server
+from mcp.server.session import ServerSession
 from mcp.server.sse import SseServerTransport
 from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import Response
 from starlette.routing import Route
 
-from .map import (
-    SupportedOperations,
-    handle_operation,
-    map_operations_to_tools,
-)
-from .swagger import (
-    expand_swagger,
-    transform_swagger_to_operation_dict,
+from .batch import BATCH_TOOL_NAME, make_batch_tool, run_batch
+from .compact import ToolCompactor
+from .index import OperationIndex
+from .limits import UpstreamLimits
+from .log import LOGGER_NAME, configure_logging
+from .map import handle_operation
+from .metrics import (
+    COMPONENT_STATS,
+    CONTENT_TYPE,
+    LIST_TOOLS_DURATION,
+    SESSIONS,
+    SESSIONS_ACTIVE,
+    SPEC_RELOADS,
+    TOOL_CALL_DURATION,
+    TOOL_CALLS,
+    TOOL_RESULT_SIZE,
+    default_registry,
 )
+from .plan import clear_request_plans
+from .pool import ClientPool
+from .reload import SpecReloader
+from .response_cache import ResponseCache
+from .retry import RetryPolicy
+from .search import SEARCH_TOOL_NAME, ToolSearchIndex, make_search_tool
+from .selection import OperationSelector
+from .singleflight import SingleFlight
+from .spec import load_hashed_spec
+from .spec_cache import read_spec_cache, save_spec_cache
+from .streaming import ProgressCallback
+from .timeouts import TimeoutPolicy, deadline_after
+from .tool_list import SessionToolLists, ToolList, ToolListCache
+from .tracing import configure_tracing, tracer
+
+
+def parse_operation_values(value: str) -> dict[str, float]:
+    """Parse per-operation settings such as `getCurrentUser=300,getContents=30`."""
+    values = {}
+    for item in value.split(","):
+        if not item.strip():
+            continue
+        name, _, number = item.partition("=")
+        values[name.strip()] = float(number)
+    return values
+
 
 CONNECT_SERVER = os.environ.get("CONNECT_SERVER", "http://localhost:3939")
 CONNECT_API_KEY = os.environ.get("CONNECT_API_KEY", "")
 SWAGGER_FILE = os.environ.get("SWAGGER_FILE") or "swagger.yaml"
+SWAGGER_CACHE = os.environ.get("SWAGGER_CACHE", "true").lower() in ("1", "true", "yes")
+# Reload SWAGGER_FILE when it changes, checking every this many seconds (0 disables reloading)
+SWAGGER_RELOAD_INTERVAL = float(os.environ.get("SWAGGER_RELOAD_INTERVAL", "0"))
+# The operations exposed as tools: a YAML/JSON file of include/exclude rules, or comma separated
+# rules such as `getContents,tag:Users,path:/v1/content*+method:get` (empty includes everything)
+OPERATIONS_FILE = os.environ.get("OPERATIONS_FILE", "")
+INCLUDE_OPERATIONS = os.environ.get("INCLUDE_OPERATIONS", "getCurrentUser,updateUser,getContents")
+EXCLUDE_OPERATIONS = os.environ.get("EXCLUDE_OPERATIONS", "")
+# Write tracing spans to this JSON lines file (tracing is disabled when unset)
+TRACE_FILE = os.environ.get("TRACE_FILE", "")
+# Logs are written to stderr as logfmt (or `json`) lines; high-volume events (`tool_call`,
+# `tool_result`) can be sampled, e.g. `tool_call=0.1`
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO")
+LOG_FORMAT = os.environ.get("LOG_FORMAT", "logfmt")
+LOG_SAMPLE_RATES = parse_operation_values(os.environ.get("LOG_SAMPLE_RATES", ""))
+# Concurrent upstream requests allowed per Connect server and per operation (0 for no limit), and
+# how many further requests may wait for a slot, for how long, before being rejected
+CONNECT_MAX_CONCURRENCY = int(os.environ.get("CONNECT_MAX_CONCURRENCY", "32"))
+CONNECT_OPERATION_CONCURRENCY = parse_operation_values(
+    os.environ.get("CONNECT_OPERATION_CONCURRENCY", "")
+)
+CONNECT_MAX_QUEUE = int(os.environ.get("CONNECT_MAX_QUEUE", "64"))
+CONNECT_QUEUE_TIMEOUT = float(os.environ.get("CONNECT_QUEUE_TIMEOUT", "10"))
+# Upstream timeouts in seconds. The total timeout covers retries and can be set per operation
+# (overriding the `x-timeout` spec extension); a tool call as a whole must finish within
+# TOOL_CALL_TIMEOUT (0 for no limit)
+HTTP_CONNECT_TIMEOUT = float(os.environ.get("HTTP_CONNECT_TIMEOUT", "5"))
+HTTP_READ_TIMEOUT = float(os.environ.get("HTTP_READ_TIMEOUT", "30"))
+REQUEST_TIMEOUT = float(os.environ.get("REQUEST_TIMEOUT", "60"))
+REQUEST_TIMEOUTS = parse_operation_values(os.environ.get("REQUEST_TIMEOUTS", ""))
+TOOL_CALL_TIMEOUT = float(os.environ.get("TOOL_CALL_TIMEOUT", "120"))
+# Retries of transient upstream failures (429/502/503/504 and transport errors)
+RETRY_MAX_ATTEMPTS = int(os.environ.get("RETRY_MAX_ATTEMPTS", "3"))
+RETRY_BASE_DELAY = float(os.environ.get("RETRY_BASE_DELAY", "0.25"))
+RETRY_MAX_DELAY = float(os.environ.get("RETRY_MAX_DELAY", "5"))
+RETRY_BUDGET = float(os.environ.get("RETRY_BUDGET", "15"))
+# Non-idempotent operations that may be retried, e.g. `updateUser`
+RETRY_OPERATIONS = [name.strip() for name in os.environ.get("RETRY_OPERATIONS", "").split(",")]
+# Consecutive upstream failures after which requests fail fast (0 disables), and for how long
+CIRCUIT_BREAKER_THRESHOLD = int(os.environ.get("CIRCUIT_BREAKER_THRESHOLD", "5"))
+CIRCUIT_BREAKER_RESET = float(os.environ.get("CIRCUIT_BREAKER_RESET", "30"))
+
+# Upstream connection pool settings
+HTTP_MAX_CONNECTIONS = int(os.environ.get("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.environ.get("HTTP_MAX_KEEPALIVE_CONNECTIONS", "20"))
+HTTP_KEEPALIVE_EXPIRY = float(os.environ.get("HTTP_KEEPALIVE_EXPIRY", "30"))
+HTTP_HTTP2 = os.environ.get("HTTP_HTTP2", "").lower() in ("1", "true", "yes")
+
+
+# Response cache for GET/HEAD operations (disabled when the size is 0)
+RESPONSE_CACHE_SIZE = int(os.environ.get("RESPONSE_CACHE_SIZE", "0"))
+RESPONSE_CACHE_TTL = float(os.environ.get("RESPONSE_CACHE_TTL", "60"))
+RESPONSE_CACHE_TTLS = parse_operation_values(os.environ.get("RESPONSE_CACHE_TTLS", ""))
+# Response bodies are streamed and truncated after this many bytes (0 for no limit)
+RESPONSE_MAX_BYTES = int(os.environ.get("RESPONSE_MAX_BYTES", "1000000"))
+# Drop response fields that are not declared in the operation's response schema (off by default:
+# specs such as Connect's often under-declare the fields responses contain)
+RESPONSE_FILTER = os.environ.get("RESPONSE_FILTER", "false").lower() in ("1", "true", "yes")
+# `batch_call` tool limits
+BATCH_MAX_CONCURRENCY = int(os.environ.get("BATCH_MAX_CONCURRENCY", "8"))
+BATCH_MAX_CALLS = int(os.environ.get("BATCH_MAX_CALLS", "50"))
+# Share one upstream request between concurrent identical GET/HEAD tool calls
+REQUEST_COALESCING = os.environ.get("REQUEST_COALESCING", "true").lower() in ("1", "true", "yes")
+# A `search_tools` tool to find operations by keywords: `true` adds it to the tools, `dynamic`
+# lists only it and the operations found by the session's last search
+TOOL_SEARCH = os.environ.get("TOOL_SEARCH", "false").lower()
+TOOL_SEARCH_RESULTS = int(os.environ.get("TOOL_SEARCH_RESULTS", "10"))
+TOOL_SEARCH_DYNAMIC = TOOL_SEARCH == "dynamic"
+TOOL_SEARCH_ENABLED = TOOL_SEARCH_DYNAMIC or TOOL_SEARCH in ("1", "true", "yes")
+# Compact the description and input schema of tools estimated above this many tokens (0 disables)
+TOOL_TOKEN_BUDGET = int(os.environ.get("TOOL_TOKEN_BUDGET", "0"))
+# The deepest input schema nesting kept when compacting a tool needs to collapse nested objects
+TOOL_SCHEMA_MAX_DEPTH = int(os.environ.get("TOOL_SCHEMA_MAX_DEPTH", "3"))
 
 if not os.path.exists(SWAGGER_FILE):
     raise FileNotFoundError(
@@ -28,38 +144,208 @@ if not os.path.exists(SWAGGER_FILE):
         "Please specify the path to the file using the SWAGGER_FILE= environment variable."
     )
 
+configure_logging(LOG_LEVEL, sample_rates=LOG_SAMPLE_RATES, json_lines=LOG_FORMAT == "json")
+configure_tracing(TRACE_FILE)
+# Not `__name__`, which is `__main__` when the server is run as a script
+logger = logging.getLogger(f"{LOGGER_NAME}.connect_api")
+
 server = Server("connect-api-server")
 sse = SseServerTransport("/messages")
+client_pool = ClientPool(
+    max_connections=HTTP_MAX_CONNECTIONS,
+    max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+    keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+    http2=HTTP_HTTP2,
+)
+response_cache = (
+    ResponseCache(
+        max_entries=RESPONSE_CACHE_SIZE,
+        default_ttl=RESPONSE_CACHE_TTL,
+        ttls=RESPONSE_CACHE_TTLS,
+    )
+    if RESPONSE_CACHE_SIZE > 0
+    else None
+)
+single_flight = SingleFlight() if REQUEST_COALESCING else None
+tool_list_cache = ToolListCache()
+session_tool_lists = SessionToolLists()
+search_tool = make_search_tool(max_results=TOOL_SEARCH_RESULTS, dynamic=TOOL_SEARCH_DYNAMIC)
+tool_compactor = (
+    ToolCompactor(TOOL_TOKEN_BUDGET, max_depth=TOOL_SCHEMA_MAX_DEPTH)
+    if TOOL_TOKEN_BUDGET > 0
+    else None
+)
+timeouts = TimeoutPolicy(
+    connect=HTTP_CONNECT_TIMEOUT,
+    read=HTTP_READ_TIMEOUT,
+    total=REQUEST_TIMEOUT or None,
+    operation_totals=REQUEST_TIMEOUTS,
+)
+retry_policy = RetryPolicy(
+    max_attempts=RETRY_MAX_ATTEMPTS,
+    base_delay=RETRY_BASE_DELAY,
+    max_delay=RETRY_MAX_DELAY,
+    budget=RETRY_BUDGET,
+    retry_operations=[name for name in RETRY_OPERATIONS if name],
+    failure_threshold=CIRCUIT_BREAKER_THRESHOLD,
+    reset_timeout=CIRCUIT_BREAKER_RESET,
+)
+upstream_limits = UpstreamLimits(
+    max_concurrency=CONNECT_MAX_CONCURRENCY,
+    max_queue=CONNECT_MAX_QUEUE,
+    queue_timeout=CONNECT_QUEUE_TIMEOUT or None,
+    operation_concurrency={
+        name: int(limit) for name, limit in CONNECT_OPERATION_CONCURRENCY.items() if limit > 0
+    },
+)
+
+
+operation_selector = (
+    OperationSelector.from_file(OPERATIONS_FILE)
+    if OPERATIONS_FILE
+    else OperationSelector.from_terms(INCLUDE_OPERATIONS, EXCLUDE_OPERATIONS)
+)
+
+# Reuse the processed spec from a previous start when the swagger file has not changed
+spec_cache = (
+    read_spec_cache(SWAGGER_FILE, selection=operation_selector.fingerprint)
+    if SWAGGER_CACHE
+    else None
+)
+if spec_cache is not None:
+    SUPPORTED_OPERATIONS = OperationIndex(
+        spec_cache["document"],
+        operations=spec_cache["operations"],
+        tools=spec_cache["tools"],
+    )
+    spec_hash = spec_cache["spec_hash"]
+    logger.info("Loaded %s from the spec cache", SWAGGER_FILE)
+else:
+    # Unselected operations are dropped before anything is expanded; the selected ones are
+    # expanded lazily, the first time they are listed or called. The cache is written on shutdown,
+    # with the operations materialized by then (see `save_operations_cache()`)
+    document, spec_hash = load_hashed_spec(SWAGGER_FILE)
+    SUPPORTED_OPERATIONS = OperationIndex(document, selector=operation_selector)
+# Number of operations in the spec cache (as read or last written)
+spec_cache_operations = len(spec_cache["operations"]) if spec_cache is not None else 0
+if not SUPPORTED_OPERATIONS:
+    logger.warning("No operations of %s are selected", SWAGGER_FILE)
+
+# Built from the unexpanded operations, so it does not expand them
+tool_search_index = ToolSearchIndex(SUPPORTED_OPERATIONS) if TOOL_SEARCH_ENABLED else None
+
+
+def compact_tools(tools: Iterable[types.Tool]) -> list[types.Tool]:
+    """Compact the tools over `TOOL_TOKEN_BUDGET`."""
+    if tool_compactor is None:
+        return list(tools)
+    return tool_compactor.compact_all(tools)
 
 
-with open(SWAGGER_FILE, "r", encoding="utf-8") as file:
-    document = yaml.safe_load(file)
+def build_tools(operations: OperationIndex) -> list[types.Tool]:
+    return [
+        *compact_tools(operations.tools()),
+        make_batch_tool(operations, max_calls=BATCH_MAX_CALLS),
+        *([search_tool] if TOOL_SEARCH_ENABLED else []),
+    ]
+
 
-document = expand_swagger(document)
-operations = transform_swagger_to_operation_dict(document)
+def build_session_tools(operations: OperationIndex, names: Sequence[str]) -> list[types.Tool]:
+    """The tools of a session in the dynamic `TOOL_SEARCH` mode."""
+    names = [name for name in names if name in operations]
+    tools = [search_tool, *compact_tools(operations.tool(name) for name in names)]
+    if names:
+        tools.append(make_batch_tool(names, max_calls=BATCH_MAX_CALLS))
+    return tools
 
 
-SUPPORTED_OPERATIONS: SupportedOperations = {
-    # "listHosts": operations["listHosts"],
-    "getCurrentUser": operations["getCurrentUser"],
-    "updateUser": operations["updateUser"],
-    "getContents": operations["getContents"],
-}
+# Sessions that listed the tools, to be notified when the tools change
+tool_list_sessions: "weakref.WeakSet[ServerSession]" = weakref.WeakSet()
 
 
-@server.list_tools()
-async def handle_list_tools() -> list[types.Tool]:
+async def handle_list_tools(_request: types.ListToolsRequest) -> types.ServerResult:
     """
     List available tools.
 
-    Each tool specifies its arguments using JSON Schema validation.
+    Each tool specifies its arguments using JSON Schema validation. The result is built (and
+    serialized) once for the supported operations and reused for every request. In the dynamic
+    `TOOL_SEARCH` mode, each session has its own result.
 
     Returns
     -------
     :
-        A list of tool objects.
+        The `tools/list` result.
     """
-    return map_operations_to_tools(SUPPORTED_OPERATIONS)
+    start = time.perf_counter()
+    operations = SUPPORTED_OPERATIONS
+    session = None
+    with contextlib.suppress(LookupError):
+        session = server.request_context.session
+        tool_list_sessions.add(session)
+    if TOOL_SEARCH_DYNAMIC and session is not None:
+        tool_list = session_tool_lists.get(
+            session, operations, lambda names: build_session_tools(operations, names)
+        )
+    else:
+        tool_list = tool_list_cache.get(operations, lambda: build_tools(operations))
+    LIST_TOOLS_DURATION.observe(time.perf_counter() - start)
+    return tool_list.result
+
+
+# Registered directly (instead of with `@server.list_tools()`) to reply with the precomputed result
+server.request_handlers[types.ListToolsRequest] = handle_list_tools
+
+
+def progress_callback() -> ProgressCallback | None:
+    """Report upstream download progress to the MCP client, if it asked for progress."""
+    try:
+        ctx = server.request_context
+    except LookupError:
+        # Not handling an MCP request
+        return None
+    progress_token = ctx.meta.progressToken if ctx.meta is not None else None
+    if progress_token is None:
+        return None
+
+    async def on_progress(received: int, total: int | None):
+        await ctx.session.send_progress_notification(progress_token, received, total)
+
+    return on_progress
+
+
+def request_traceparent() -> str | None:
+    """The trace context the MCP client sent in the `_meta` of the current request, if any."""
+    try:
+        meta = server.request_context.meta
+    except LookupError:
+        return None
+    return getattr(meta, "traceparent", None)
+
+
+async def call_operation(
+    name: str,
+    arguments: dict | None,
+    *,
+    deadline: float | None = None,
+    on_progress: ProgressCallback | None = None,
+):
+    return await handle_operation(
+        SUPPORTED_OPERATIONS,
+        name,
+        arguments,
+        CONNECT_SERVER=CONNECT_SERVER,
+        CONNECT_API_KEY=CONNECT_API_KEY,
+        client_pool=client_pool,
+        response_cache=response_cache,
+        single_flight=single_flight,
+        max_response_bytes=RESPONSE_MAX_BYTES or None,
+        on_progress=on_progress,
+        limits=upstream_limits,
+        retry_policy=retry_policy,
+        timeouts=timeouts,
+        deadline=deadline,
+        schema_filter=RESPONSE_FILTER,
+    )
 
 
 @server.call_tool()
@@ -73,13 +359,95 @@ async def handle_call_tool(
     -------
         A list containing a single text content object.
     """
-    return await handle_operation(
-        SUPPORTED_OPERATIONS,
-        name,
-        arguments,
-        CONNECT_SERVER=CONNECT_SERVER,
-        CONNECT_API_KEY=CONNECT_API_KEY,
+    # Unknown tool names are grouped to keep the number of metric label values bounded
+    tool = (
+        name
+        if name == BATCH_TOOL_NAME
+        or (TOOL_SEARCH_ENABLED and name == SEARCH_TOOL_NAME)
+        or name in SUPPORTED_OPERATIONS
+        else "unknown"
     )
+    start = time.perf_counter()
+    status = "error"
+    try:
+        with tracer.start_span(
+            f"mcp.call_tool {name}",
+            kind="server",
+            attributes={"mcp.tool": name},
+            traceparent=request_traceparent(),
+        ):
+            result = await call_tool(name, arguments)
+        status = "ok"
+    except Exception as e:
+        logger.warning("Tool call %s failed: %s: %s", tool, type(e).__name__, e)
+        raise
+    finally:
+        TOOL_CALLS.inc((tool, status))
+        TOOL_CALL_DURATION.observe(time.perf_counter() - start, (tool,))
+    TOOL_RESULT_SIZE.observe(
+        sum(len(content.text) for content in result if isinstance(content, types.TextContent)),
+        (tool,),
+    )
+    return result
+
+
+async def call_tool(name: str, arguments: dict | None) -> list[types.TextContent]:
+    # Every upstream request made for this tool call (including batched calls and retries) must
+    # finish by this deadline
+    deadline = deadline_after(TOOL_CALL_TIMEOUT)
+
+    if name == BATCH_TOOL_NAME:
+        # No progress for batched calls: they share the request's progress token, and their byte
+        # counts would interleave and go backwards
+        async def call_text(name: str, arguments: dict | None) -> str:
+            return (await call_operation(name, arguments, deadline=deadline))[0].text
+
+        result = await run_batch(
+            (arguments or {}).get("calls", []),
+            call_text,
+            operation_names=SUPPORTED_OPERATIONS,
+            max_concurrency=BATCH_MAX_CONCURRENCY,
+            max_calls=BATCH_MAX_CALLS,
+        )
+        return [types.TextContent(text=result, type="text")]
+
+    if TOOL_SEARCH_ENABLED and name == SEARCH_TOOL_NAME:
+        return await search_tools(arguments or {})
+
+    return await call_operation(
+        name, arguments, deadline=deadline, on_progress=progress_callback()
+    )
+
+
+async def search_tools(arguments: dict) -> list[types.TextContent]:
+    """
+    Run a `search_tools` call.
+
+    In the dynamic `TOOL_SEARCH` mode, the operations found become the session's tools and the
+    session is notified that its tools changed.
+    """
+    global tool_search_index
+    query = arguments.get("query")
+    if not isinstance(query, str) or not query.strip():
+        raise ValueError("`query` must be a non-empty string.")
+    limit = min(max(int(arguments.get("limit") or TOOL_SEARCH_RESULTS), 1), TOOL_SEARCH_RESULTS)
+
+    operations = SUPPORTED_OPERATIONS
+    search_index = tool_search_index
+    if search_index is None or search_index.operations is not operations:
+        search_index = tool_search_index = ToolSearchIndex(operations)
+    results = search_index.search(query, limit)
+
+    if TOOL_SEARCH_DYNAMIC:
+        session = server.request_context.session
+        if session_tool_lists.expose(
+            session,
+            operations,
+            [result.name for result in results],
+            lambda names: build_session_tools(operations, names),
+        ):
+            await session.send_tool_list_changed()
+    return [types.TextContent(text=json.dumps(search_index.describe(results)), type="text")]
 
 
 # Needed to allow starlette to process handlers
@@ -91,21 +459,186 @@ def setup_handler(f):
 
 
 async def handle_sse(scope, receive, send):
-    async with sse.connect_sse(scope, receive, send) as streams:
-        await server.run(streams[0], streams[1], server.create_initialization_options())
+    SESSIONS.inc()
+    SESSIONS_ACTIVE.inc()
+    try:
+        async with sse.connect_sse(scope, receive, send) as streams:
+            await server.run(
+                streams[0],
+                streams[1],
+                server.create_initialization_options(
+                    NotificationOptions(
+                        tools_changed=SWAGGER_RELOAD_INTERVAL > 0 or TOOL_SEARCH_DYNAMIC
+                    )
+                ),
+            )
+    finally:
+        SESSIONS_ACTIVE.dec()
 
 
 async def handle_messages(scope, receive, send):
     await sse.handle_post_message(scope, receive, send)
 
 
+def update_component_stats():
+    """Copy the counters kept by the server components into the metrics registry."""
+    stats = {"retry": retry_policy.stats(), "tool_list": tool_list_cache.stats()}
+    if tool_search_index is not None:
+        stats["tool_search"] = tool_search_index.stats()
+    if TOOL_SEARCH_DYNAMIC:
+        stats["session_tool_lists"] = session_tool_lists.stats()
+    if tool_compactor is not None:
+        stats["tool_compaction"] = tool_compactor.stats()
+    if response_cache is not None:
+        stats["response_cache"] = {
+            "hits": response_cache.hits,
+            "misses": response_cache.misses,
+            "revalidations": response_cache.revalidations,
+            "entries": len(response_cache),
+        }
+    if single_flight is not None:
+        stats["single_flight"] = single_flight.stats()
+    for name, limiter_stats in upstream_limits.stats().items():
+        stats[f"limiter:{name}"] = limiter_stats
+    for component, values in stats.items():
+        for stat, value in values.items():
+            COMPONENT_STATS.set(value, (component, stat))
+
+
+async def handle_metrics(_request: Request) -> Response:
+    update_component_stats()
+    return Response(default_registry.render(), media_type=CONTENT_TYPE)
+
+
+spec_reloader = (
+    SpecReloader(
+        SWAGGER_FILE, SUPPORTED_OPERATIONS, selector=operation_selector, spec_hash=spec_hash
+    )
+    if SWAGGER_RELOAD_INTERVAL > 0
+    else None
+)
+
+
+async def reload_spec() -> bool:
+    """
+    Reload SWAGGER_FILE if it changed, and notify the sessions if the tools changed.
+
+    The new spec is loaded, expanded and its tools (and search index) built in a worker thread;
+    the operations are then swapped at once. Tool calls already running finish with the operations
+    they started with.
+
+    Returns
+    -------
+    :
+        Whether a new version of the spec was loaded.
+    """
+    global SUPPORTED_OPERATIONS, tool_search_index, spec_hash, spec_cache_operations
+    assert spec_reloader is not None
+
+    def load() -> tuple[OperationIndex, ToolList | None, ToolSearchIndex | None] | None:
+        index = spec_reloader.check()
+        if index is None:
+            return None
+        # Sessions of the dynamic mode build their own tool lists
+        tool_list = ToolList(build_tools(index)) if not TOOL_SEARCH_DYNAMIC else None
+        search_index = ToolSearchIndex(index) if TOOL_SEARCH_ENABLED else None
+        return index, tool_list, search_index
+
+    loaded = await asyncio.to_thread(load)
+    if loaded is None:
+        return False
+    index, tool_list, search_index = loaded
+    spec_reloader.accept(index)
+    previous_version = tool_list_cache.version
+    SUPPORTED_OPERATIONS = index
+    spec_hash = spec_reloader.spec_hash
+    spec_cache_operations = 0
+    if tool_list is not None:
+        tool_list_cache.put(index, tool_list)
+    if search_index is not None:
+        tool_search_index = search_index
+    # Plans, timeouts and cached responses were derived from the previous operations (reloads are
+    # rare, so the whole response cache is dropped rather than the changed routes)
+    clear_request_plans()
+    timeouts.clear()
+    if response_cache is not None:
+        response_cache.clear()
+
+    if tool_list is None or tool_list.version != previous_version:
+        await notify_tool_list_changed()
+    return True
+
+
+async def notify_tool_list_changed():
+    """Send a `tools/list_changed` notification to every session that listed the tools."""
+
+    async def notify(session: ServerSession):
+        try:
+            async with asyncio.timeout(5):
+                await session.send_tool_list_changed()
+        except Exception:
+            # Closed or unresponsive; it lists the tools again if it reconnects
+            tool_list_sessions.discard(session)
+
+    sessions = list(tool_list_sessions)
+    await asyncio.gather(*(notify(session) for session in sessions))
+    logger.info("Notified %d sessions that the tools changed", len(sessions))
+
+
+async def watch_spec():
+    while True:
+        await asyncio.sleep(SWAGGER_RELOAD_INTERVAL)
+        try:
+            if await reload_spec():
+                SPEC_RELOADS.inc(("ok",))
+        except Exception:
+            SPEC_RELOADS.inc(("error",))
+            logger.exception("Failed to reload %s; keeping the current spec", SWAGGER_FILE)
+
+
+def save_operations_cache():
+    """
+    Write the spec cache with the operations materialized so far.
+
+    Nothing is written if no operation was materialized since the cache was read or last written,
+    e.g. when no tool was listed or called.
+    """
+    global spec_cache_operations
+    operations = SUPPORTED_OPERATIONS
+    materialized = sum(operations.is_materialized(name) for name in operations)
+    if materialized <= spec_cache_operations:
+        return
+    if save_spec_cache(
+        SWAGGER_FILE, operations, spec_hash=spec_hash, selection=operation_selector.fingerprint
+    ):
+        spec_cache_operations = materialized
+        logger.info("Wrote %d operations to the spec cache of %s", materialized, SWAGGER_FILE)
+
+
+@contextlib.asynccontextmanager
+async def lifespan(_app: Starlette):
+    # Upstream clients live for the lifetime of the app and are closed on shutdown
+    async with client_pool:
+        watcher = asyncio.create_task(watch_spec()) if spec_reloader is not None else None
+        try:
+            yield
+        finally:
+            if watcher is not None:
+                watcher.cancel()
+            # Written on shutdown rather than on startup, so starting never expands every operation
+            if SWAGGER_CACHE:
+                await asyncio.to_thread(save_operations_cache)
+
+
 # TODO: add basic auth
 
 app = Starlette(
     routes=[
         Route("/sse", endpoint=setup_handler(handle_sse)),
         Route("/messages", endpoint=setup_handler(handle_messages), methods=["POST"]),
-    ]
+        Route("/metrics", endpoint=handle_metrics),
+    ],
+    lifespan=lifespan,
 )
 
 if __name__ == "__main__":
@@ -0,0 +1,179 @@
+from collections.abc import Container, Iterable, Iterator, Mapping
+from typing import Any
+
+import mcp.types as types
+
+from .map import map_operations_to_tools
+from .selection import OperationSelector
+from .swagger import (
+    OperationDef,
+    RefResolver,
+    SwaggerDocument,
+    clean_whitespace,
+    expand_operation_references,
+)
+
+
+class OperationIndex(Mapping[str, OperationDef]):
+    """
+    Lazy mapping of operation IDs to operation definitions.
+
+    Only the route and method of every operation are recorded when the index is created. An
+    operation's references are expanded, its whitespace cleaned and its tool built the first time
+    it is requested; the results are cached and shared by every index created through `select()`.
+
+    Arguments
+    ---------
+    document
+        The (unexpanded) swagger document. It is never modified.
+    selector
+        Selects the operations to index. The index then keeps only the part of `document` the
+        selected operations use (see `OperationSelector.select()`).
+    resolver
+        The resolver used to expand references. Defaults to a new resolver over `document` that
+        also cleans whitespace, so expansions shared by several operations are cleaned once.
+    operations
+        Already materialized operations (e.g. from a `SpecCache`) to seed the index with.
+    tools
+        Already built tools (e.g. from a `SpecCache`) to seed the index with.
+    """
+
+    def __init__(
+        self,
+        document: SwaggerDocument,
+        *,
+        selector: OperationSelector | None = None,
+        resolver: RefResolver | None = None,
+        operations: Mapping[str, OperationDef] | None = None,
+        tools: Iterable[types.Tool] | None = None,
+    ):
+        if selector is not None:
+            document = selector.select(document)
+        self.document = document
+        self._resolver = resolver if resolver is not None else RefResolver(document, clean=True)
+        self._entries: dict[str, tuple[str, str]] = {}
+        self._operations: dict[str, OperationDef] = dict(operations) if operations else {}
+        self._tools: dict[str, types.Tool] = {tool.name: tool for tool in tools or ()}
+
+        for route, path_item in document.get("paths", {}).items():
+            for method, operation in path_item.items():
+                if not isinstance(operation, dict):
+                    continue
+                if "operationId" in operation:
+                    self._entries[operation["operationId"]] = (route, method)
+
+    def select(self, names: Iterable[str]) -> "OperationIndex":
+        """
+        Create an index restricted to the given operation IDs.
+
+        The new index shares its caches with this index.
+
+        Arguments
+        ---------
+        names
+            The operation IDs to keep. Raises a `KeyError` for unknown IDs.
+        """
+        index = OperationIndex.__new__(OperationIndex)
+        index.document = self.document
+        index._resolver = self._resolver
+        index._entries = {name: self._entries[name] for name in names}
+        index._operations = self._operations
+        index._tools = self._tools
+        return index
+
+    def adopt(self, other: "OperationIndex", routes: Container[str]) -> int:
+        """
+        Reuse the operations and tools `other` has already built for the given routes.
+
+        Used when the spec is reloaded, so operations whose path item did not change are not
+        expanded again.
+
+        Arguments
+        ---------
+        other
+            The index of the previous version of the spec.
+        routes
+            The routes whose path items (and everything they reference) are unchanged.
+
+        Returns
+        -------
+        :
+            The number of operations reused.
+        """
+        reused = 0
+        for name, entry in self._entries.items():
+            operation = other._operations.get(name)
+            if operation is None or entry[0] not in routes or other._entries.get(name) != entry:
+                continue
+            self._operations[name] = operation
+            tool = other._tools.get(name)
+            if tool is not None:
+                self._tools[name] = tool
+            reused += 1
+        return reused
+
+    def __getitem__(self, name: str) -> OperationDef:
+        operation = self._operations.get(name)
+        if operation is None:
+            operation = self._materialize(name)
+            self._operations[name] = operation
+        return operation
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._entries
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def unexpanded(self, name: str) -> dict[str, Any]:
+        """Get an operation's definition as it is in the document, without expanding it."""
+        route, method = self._entries[name]
+        return self.document["paths"][route][method]  # pyright: ignore[reportTypedDictNotRequiredAccess]
+
+    def _materialize(self, name: str) -> OperationDef:
+        route, method = self._entries[name]
+        operation = self.unexpanded(name)
+        definition = expand_operation_references(operation, self._resolver)
+        if not self._resolver.clean:
+            definition = clean_whitespace(definition)
+        return {
+            "name": name,
+            "tags": definition["tags"] if "tags" in definition else [],
+            "method": method,
+            "route": route,
+            "definition": definition,
+        }
+
+    def tool(self, name: str) -> types.Tool:
+        """Get the MCP tool for an operation, building it on first use."""
+        tool = self._tools.get(name)
+        if tool is None:
+            tool = map_operations_to_tools({name: self[name]})[0]
+            self._tools[name] = tool
+        return tool
+
+    def tools(self) -> list[types.Tool]:
+        """Get the MCP tools for every operation in the index."""
+        return [self.tool(name) for name in self._entries]
+
+    def materialized(self) -> tuple[dict[str, OperationDef], list[types.Tool]]:
+        """
+        Get the operations of the index that have already been built, without building others.
+
+        Returns
+        -------
+        :
+            The materialized operations, and the tools already built for them.
+        """
+        operations = {
+            name: self._operations[name] for name in self._entries if name in self._operations
+        }
+        tools = [self._tools[name] for name in operations if name in self._tools]
+        return operations, tools
+
+    def is_materialized(self, name: str) -> bool:
+        """Whether the operation and its tool have already been built."""
+        return name in self._operations and name in self._tools
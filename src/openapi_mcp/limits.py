@@ -0,0 +1,196 @@
+import asyncio
+import contextlib
+from collections.abc import AsyncIterator, Mapping
+
+
+class ConcurrencyLimitError(RuntimeError):
+    """A call could not start because its concurrency limit was reached."""
+
+
+class ConcurrencyLimiter:
+    """
+    Limit the number of concurrent calls, queueing a bounded number of calls over the limit.
+
+    A call that finds the queue full, or that waits longer than `queue_timeout` for a slot, fails
+    immediately with a `ConcurrencyLimitError` instead of piling up.
+
+    Arguments
+    ---------
+    max_concurrency
+        The maximum number of calls running at the same time.
+    max_queue
+        The maximum number of calls waiting for a slot. `0` rejects every call over the limit.
+    queue_timeout
+        Seconds a call may wait for a slot. `None` waits until a slot is free.
+    name
+        What is being limited, used in error messages (e.g. the upstream URL or operation name).
+    """
+
+    __slots__ = (
+        "name",
+        "max_concurrency",
+        "max_queue",
+        "queue_timeout",
+        "active",
+        "waiting",
+        "rejected",
+        "timed_out",
+        "_semaphore",
+    )
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        *,
+        max_queue: int = 0,
+        queue_timeout: float | None = None,
+        name: str = "upstream",
+    ):
+        if max_concurrency < 1:
+            raise ValueError(f"`max_concurrency` must be at least 1; got {max_concurrency}.")
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self.waiting = 0
+        self.rejected = 0
+        """Calls rejected because the queue was full."""
+        self.timed_out = 0
+        """Calls rejected because they waited longer than `queue_timeout`."""
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def acquire(self) -> None:
+        """
+        Wait for a slot.
+
+        Raises
+        ------
+        ConcurrencyLimitError
+            If the queue is full or no slot became free within `queue_timeout`.
+        """
+        if self._semaphore.locked():
+            if self.waiting >= self.max_queue:
+                self.rejected += 1
+                raise ConcurrencyLimitError(
+                    f"Too many concurrent calls to {self.name} ({self.active} running, "
+                    f"{self.waiting} queued). Try again later."
+                )
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), self.queue_timeout)
+            except TimeoutError:
+                self.timed_out += 1
+                raise ConcurrencyLimitError(
+                    f"Timed out after {self.queue_timeout:g}s waiting to call {self.name} "
+                    f"({self.active} calls running). Try again later."
+                ) from None
+            finally:
+                self.waiting -= 1
+        else:
+            await self._semaphore.acquire()
+        self.active += 1
+
+    def release(self) -> None:
+        self.active -= 1
+        self._semaphore.release()
+
+    async def __aenter__(self) -> "ConcurrencyLimiter":
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.release()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "active": self.active,
+            "waiting": self.waiting,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+        }
+
+
+class UpstreamLimits:
+    """
+    Per-upstream and per-operation concurrency limits for upstream requests.
+
+    A request takes a slot of its operation's limiter (if the operation has one) and then a slot
+    of its upstream's limiter (one per base URL).
+
+    Arguments
+    ---------
+    max_concurrency
+        The maximum number of concurrent requests to each upstream. `0` for no limit.
+    max_queue
+        The maximum number of requests waiting for a slot of each limiter.
+    queue_timeout
+        Seconds a request may wait for a slot. `None` waits until a slot is free.
+    operation_concurrency
+        The maximum number of concurrent requests for specific operations, keyed by operation name.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_concurrency: int = 0,
+        max_queue: int = 0,
+        queue_timeout: float | None = None,
+        operation_concurrency: Mapping[str, int] | None = None,
+    ):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._upstreams: dict[str, ConcurrencyLimiter] = {}
+        self._operations = {
+            name: ConcurrencyLimiter(
+                int(limit), max_queue=max_queue, queue_timeout=queue_timeout, name=name
+            )
+            for name, limit in (operation_concurrency or {}).items()
+        }
+
+    def _upstream(self, base_url: str) -> ConcurrencyLimiter | None:
+        if self.max_concurrency <= 0:
+            return None
+        limiter = self._upstreams.get(base_url)
+        if limiter is None:
+            limiter = ConcurrencyLimiter(
+                self.max_concurrency,
+                max_queue=self.max_queue,
+                queue_timeout=self.queue_timeout,
+                name=base_url,
+            )
+            self._upstreams[base_url] = limiter
+        return limiter
+
+    @contextlib.asynccontextmanager
+    async def slot(self, base_url: str, operation_name: str) -> AsyncIterator[None]:
+        """
+        Hold a slot for a request to an upstream for the duration of the `async with` block.
+
+        Raises
+        ------
+        ConcurrencyLimitError
+            If a limiter's queue is full or no slot became free in time.
+        """
+        operation = self._operations.get(operation_name)
+        upstream = self._upstream(base_url)
+        if operation is not None:
+            await operation.acquire()
+        try:
+            if upstream is not None:
+                await upstream.acquire()
+            try:
+                yield
+            finally:
+                if upstream is not None:
+                    upstream.release()
+        finally:
+            if operation is not None:
+                operation.release()
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        return {
+            name: limiter.stats()
+            for name, limiter in (*self._upstreams.items(), *self._operations.items())
+        }
@@ -0,0 +1,204 @@
+import atexit
+import itertools
+import json
+import logging
+import logging.handlers
+import queue
+import re
+import sys
+import time
+from collections.abc import Mapping
+from typing import Any
+
+# Logging for the server, the chat client and the Shiny app. Records are handed to a queue and
+# formatted and written by a background thread, so logging never blocks the event loop on stdout.
+# Log arguments are formatted lazily (only if the record is emitted), high-volume events can be
+# sampled, and tool arguments are redacted before they are written.
+
+# The parent of the package's loggers, which are named after their modules. This is
+# `src.openapi_mcp` when the server runs as `python -m src.openapi_mcp.connect_api`.
+LOGGER_NAME = __package__ or "openapi_mcp"
+
+REDACTED = "[REDACTED]"
+# Keys whose values are never logged
+SENSITIVE_KEY_RE = re.compile(
+    r"pass(word)?|secret|token|api[_-]?key|authorization|cookie|credential|private", re.IGNORECASE
+)
+# Longest string value (and longest rendered value) that is logged in full
+MAX_VALUE_CHARS = 200
+MAX_RENDERED_CHARS = 2000
+
+# Attributes of every `LogRecord`; anything else was passed with `extra=` and is a field
+_RECORD_ATTRIBUTES = frozenset(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+
+def redact(value: Any, *, max_chars: int = MAX_VALUE_CHARS) -> Any:
+    """
+    Copy a value for logging, hiding sensitive fields and shortening long strings.
+
+    Values of mapping keys that look like credentials (`password`, `token`, `api_key`, ...) are
+    replaced by `[REDACTED]`.
+    """
+    if isinstance(value, Mapping):
+        return {
+            key: REDACTED
+            if isinstance(key, str) and SENSITIVE_KEY_RE.search(key)
+            else redact(item, max_chars=max_chars)
+            for key, item in value.items()
+        }
+    if isinstance(value, (list, tuple)):
+        return [redact(item, max_chars=max_chars) for item in value]
+    if isinstance(value, str) and len(value) > max_chars:
+        return f"{value[:max_chars]}... ({len(value):,} chars)"
+    return value
+
+
+class Redacted:
+    """
+    Log a value redacted with `redact()`.
+
+    The value is only redacted and rendered when the record is formatted, i.e. not at all when
+    the log level filters the record out.
+    """
+
+    __slots__ = ("value",)
+
+    def __init__(self, value: Any):
+        self.value = value
+
+    def __str__(self) -> str:
+        text = json.dumps(redact(self.value), default=repr, ensure_ascii=False)
+        if len(text) > MAX_RENDERED_CHARS:
+            return f"{text[:MAX_RENDERED_CHARS]}... ({len(text):,} chars)"
+        return text
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep a fraction of high-volume log events.
+
+    Records logged with `extra={"event": <name>}` are kept at the rate configured for that event
+    (every `1 / rate`-th record is kept). Warnings and errors are always kept.
+
+    Arguments
+    ---------
+    rates
+        The fraction of records to keep per event name, between `0` and `1`.
+    """
+
+    def __init__(self, rates: Mapping[str, float]):
+        super().__init__()
+        self.intervals = {
+            event: (round(1 / rate) if rate > 0 else 0) for event, rate in rates.items()
+        }
+        self._counters = {event: itertools.count() for event in rates}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        event = getattr(record, "event", None)
+        interval = self.intervals.get(event) if event is not None else None
+        if interval is None:
+            return True
+        if interval == 0:
+            return False
+        return next(self._counters[event]) % interval == 0
+
+
+class StructuredFormatter(logging.Formatter):
+    """
+    Format records as `logfmt` (`key=value`) lines or as JSON objects.
+
+    Fields passed with `extra=` are included after the message.
+    """
+
+    def __init__(self, *, json_lines: bool = False):
+        super().__init__()
+        self.json_lines = json_lines
+
+    def format(self, record: logging.LogRecord) -> str:
+        fields: dict[str, Any] = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created))
+            + f".{int(record.msecs):03d}Z",
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+                fields[key] = redact(value)
+        if record.exc_info:
+            fields["exc"] = self.formatException(record.exc_info)
+
+        if self.json_lines:
+            return json.dumps(fields, default=str, ensure_ascii=False)
+        return " ".join(f"{key}={_logfmt_value(value)}" for key, value in fields.items())
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    # The queue stays in-process, so the record is passed on as is: formatting (including the
+    # lazy arguments) happens in the listener thread instead of the logging one
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+_listener: logging.handlers.QueueListener | None = None
+
+
+def configure_logging(
+    level: str | int = "INFO",
+    *,
+    sample_rates: Mapping[str, float] | None = None,
+    json_lines: bool = False,
+) -> None:
+    """
+    Send the package's logs to stderr through a background thread.
+
+    Only applications (the MCP server, the chat client, the Shiny app) should call this; the
+    library itself only logs. Calling it again replaces the previous configuration.
+
+    Arguments
+    ---------
+    level
+        The minimum level of the records written.
+    sample_rates
+        The fraction of records to keep for high-volume events, e.g. `{"tool_call": 0.1}`.
+    json_lines
+        Write JSON objects instead of `logfmt` lines.
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+
+    stream_handler = logging.StreamHandler(sys.stderr)
+    stream_handler.setFormatter(StructuredFormatter(json_lines=json_lines))
+    records: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+    queue_handler = _QueueHandler(records)
+    if sample_rates:
+        queue_handler.addFilter(SamplingFilter(sample_rates))
+
+    logger = logging.getLogger(LOGGER_NAME)
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+    logger.addHandler(queue_handler)
+    logger.setLevel(level.upper() if isinstance(level, str) else level)
+    logger.propagate = False
+
+    _listener = logging.handlers.QueueListener(records, stream_handler)
+    _listener.start()
+
+
+@atexit.register
+def _flush_logs() -> None:
+    # Write the records still in the queue before the process exits
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def _logfmt_value(value: Any) -> str:
+    text = value if isinstance(value, str) else json.dumps(value, default=str, ensure_ascii=False)
+    if text == "" or any(char in text for char in ' ="\n'):
+        return json.dumps(text, ensure_ascii=False)
+    return text
@@ -1,16 +1,45 @@
+import asyncio
+import functools
+import logging
+import time
 import urllib.parse
+from collections.abc import Mapping
 
 import httpx
 import mcp.types as types
 
+from .limits import UpstreamLimits
+from .log import Redacted
+from .metrics import UPSTREAM_DURATION, UPSTREAM_REQUESTS, UPSTREAM_RESPONSE_SIZE
+from .plan import get_request_plan
+from .pool import ClientPool
+from .response_cache import (
+    CACHEABLE_METHODS,
+    CacheKey,
+    ResponseCache,
+    UpstreamResponse,
+    request_key,
+    send_cached,
+)
+from .retry import RetryPolicy, send_with_retries
+from .shaping import ResponseShape, operation_response_schema, shaping_properties
+from .singleflight import SingleFlight
+from .streaming import ProgressCallback, ProgressFanOut, send_streaming
 from .swagger import (
     OperationDef,
 )
+from .timeouts import TimeoutPolicy, deadline_after, earliest
+from .tracing import tracer
+
+SupportedOperations = Mapping[str, OperationDef]
 
-SupportedOperations = dict[str, OperationDef]
+logger = logging.getLogger(__name__)
 
+# The progress of the upstream requests shared by coalesced calls, by single-flight and key
+_shared_progress: dict[tuple[SingleFlight, CacheKey], ProgressFanOut] = {}
 
-def map_swagger_params_to_input_schema(params):
+
+def map_swagger_params_to_input_schema(params, response_schema=None):
     schema = {
         "type": "object",
         "properties": {},
@@ -43,6 +72,10 @@ def map_swagger_params_to_input_schema(params):
             }
         if "required" in param and param["required"]:
             schema["required"].append(param["name"])
+
+    # Response shaping arguments (`fields`, `limit`, `offset`) that don't clash with a parameter
+    for name, prop in shaping_properties(response_schema).items():
+        schema["properties"].setdefault(name, prop)
     return schema
 
 
@@ -54,7 +87,8 @@ def map_operations_to_tools(operations: SupportedOperations) -> list[types.Tool]
                 "description"
             ],  # + f" Possible responses: {operation['definition']['responses']}",
             inputSchema=map_swagger_params_to_input_schema(
-                operation["definition"].get("parameters", [])
+                operation["definition"].get("parameters", []),
+                response_schema=operation_response_schema(operation["definition"]),
             ),
         )
         for operation in operations.values()
@@ -161,44 +195,182 @@ def map_body_params(body_params):
     return body
 
 
-async def make_request(base_url: str, operation, api_params, *, CONNECT_API_KEY: str):
+async def make_request(
+    base_url: str,
+    operation: OperationDef,
+    arguments: dict | None,
+    *,
+    CONNECT_API_KEY: str,
+    client_pool: ClientPool,
+    response_cache: ResponseCache | None = None,
+    single_flight: SingleFlight | None = None,
+    max_response_bytes: int | None = None,
+    on_progress: ProgressCallback | None = None,
+    limits: UpstreamLimits | None = None,
+    retry_policy: RetryPolicy | None = None,
+    timeouts: TimeoutPolicy | None = None,
+    deadline: float | None = None,
+) -> UpstreamResponse:
     """
-    Makes an HTTP request using httpx with the given operation and parameters.
+    Makes an HTTP request using httpx with the given operation and arguments.
 
     Arguments
     ---------
     operation
-        A dictionary containing the HTTP method and route.
-    api_params
-        A dictionary containing path, query, and body parameters.
+        The operation to call.
+    arguments
+        The tool arguments. They are mapped to path, query, header and body parameters using the
+        operation's precompiled `RequestPlan`.
+    client_pool
+        The pool providing the shared client for `base_url`. It is owned (and closed) by the
+        caller, e.g. the server's lifespan.
+    response_cache
+        An optional cache for the responses of GET/HEAD operations. Other requests invalidate the
+        cached responses for the resource they change.
+    single_flight
+        Coalesces concurrent identical GET/HEAD requests (same operation, URL, header parameters
+        and API key) into a single upstream request whose response is shared. The shared request
+        reports its progress to the `on_progress` of every caller waiting for it.
+    max_response_bytes
+        Stream the response body and keep at most this many bytes of it, followed by a notice
+        that it was truncated. `None` keeps the whole body.
+    on_progress
+        Stream the response body and report the number of bytes received as it arrives.
+    limits
+        Concurrency limits for upstream requests. Requests over the limit are queued; a
+        `ConcurrencyLimitError` is raised when the queue is full or the wait is too long. Cached
+        and coalesced responses do not take a slot.
+    retry_policy
+        Retry transient upstream failures (429/502/503/504 responses and transport errors) and
+        fail fast while the upstream is down. Each attempt takes its own concurrency slot.
+    timeouts
+        The connect, read and total timeouts of the operation.
+    deadline
+        The `time.monotonic()` time by which the caller needs the response. The call (including
+        retries) is cancelled when the deadline or the operation's total timeout is reached, and
+        each attempt's connect and read timeouts are shortened to end by then.
 
     Returns
     -------
     :
-        The response text.
+        The response status code and text.
+
+    Raises
+    ------
+    TimeoutError
+        If the deadline was reached before the response was received.
     """
-    # Map path, query, and body parameters
-    route = map_path_params(operation["route"], api_params["path"])
-    query_params = map_query_params(api_params["query"])
-    body_params = map_body_params(api_params["body"])
-
-    # # Construct the full URL
-    # base_url = urllib.parse.urljoin(CONNECT_SERVER, "__api__")
-
-    # print(base_url, route)
-    # print(query_params)
-    # print(body_params)
-
-    # Make the request
-    async with httpx.AsyncClient(verify=False, base_url=base_url) as client:
-        response = await client.request(
-            method=operation["method"],
-            url=route,
-            headers={"Authorization": f"Key {CONNECT_API_KEY}"} if CONNECT_API_KEY else None,
-            params=query_params,
-            json=body_params,
+    plan = get_request_plan(operation)
+
+    # Make the request using the pooled client (authorization header is set on the client)
+    client = client_pool.get_client(base_url, api_key=CONNECT_API_KEY)
+    request = plan.build_request(client, arguments)
+
+    timeout = timeouts.for_operation(operation) if timeouts is not None else None
+    operation_deadline = deadline_after(timeout.total) if timeout is not None else None
+    deadline = earliest(deadline, operation_deadline)
+
+    labels = (operation["name"],)
+
+    async def transfer(
+        request: httpx.Request, deadline: float | None, progress: ProgressCallback | None
+    ) -> httpx.Response:
+        if timeout is not None:
+            request.extensions["timeout"] = timeout.httpx_timeout(deadline).as_dict()
+        start = time.perf_counter()
+        with tracer.start_span(
+            f"upstream {request.method} {operation['route']}",
+            kind="client",
+            attributes={"http.method": request.method, "http.route": operation["route"]},
+        ) as span:
+            tracer.inject(request.headers)
+            try:
+                if max_response_bytes is None and progress is None:
+                    response = await client.send(request)
+                else:
+                    response = await send_streaming(
+                        client, request, max_bytes=max_response_bytes, on_progress=progress
+                    )
+            except BaseException as e:
+                UPSTREAM_REQUESTS.inc((operation["name"], type(e).__name__))
+                raise
+            finally:
+                UPSTREAM_DURATION.observe(time.perf_counter() - start, labels)
+            if span is not None:
+                span.set_attribute("http.status_code", response.status_code)
+        UPSTREAM_REQUESTS.inc((operation["name"], str(response.status_code)))
+        UPSTREAM_RESPONSE_SIZE.observe(len(response.content), labels)
+        return response
+
+    async def attempt(
+        request: httpx.Request, deadline: float | None, progress: ProgressCallback | None
+    ) -> httpx.Response:
+        if limits is None:
+            return await transfer(request, deadline, progress)
+        async with limits.slot(base_url, operation["name"]):
+            return await transfer(request, deadline, progress)
+
+    async def send(
+        request: httpx.Request, deadline: float | None, progress: ProgressCallback | None
+    ) -> httpx.Response:
+        if retry_policy is None:
+            return await attempt(request, deadline, progress)
+        return await send_with_retries(
+            functools.partial(attempt, deadline=deadline, progress=progress),
+            request,
+            retry_policy,
+            base_url=base_url,
+            operation_name=operation["name"],
+            deadline=deadline,
         )
-        return response.text
+
+    async def fetch(deadline: float | None, progress: ProgressCallback | None) -> UpstreamResponse:
+        if response_cache is not None:
+            return await send_cached(
+                functools.partial(send, deadline=deadline, progress=progress),
+                request,
+                response_cache,
+                operation_name=operation["name"],
+                api_key=CONNECT_API_KEY,
+                header_names=plan.header_names,
+            )
+        response = await send(request, deadline, progress)
+        return UpstreamResponse(response.status_code, response.text)
+
+    async def call() -> UpstreamResponse:
+        if single_flight is not None and request.method in CACHEABLE_METHODS:
+            key = request_key(operation["name"], request, CONNECT_API_KEY, plan.header_names)
+            shared = (single_flight, key)
+            progress = _shared_progress.get(shared)
+            if progress is None:
+                progress = _shared_progress[shared] = ProgressFanOut()
+            progress.callers += 1
+            if on_progress is not None:
+                progress.callbacks.append(on_progress)
+            try:
+                # The shared request is not bound to the deadline of the caller that started it
+                # (each caller stops waiting at its own deadline); it is cancelled once every
+                # caller left
+                return await single_flight.do(key, lambda: fetch(operation_deadline, progress))
+            finally:
+                progress.callers -= 1
+                if on_progress in progress.callbacks:
+                    progress.callbacks.remove(on_progress)
+                if not progress.callers and _shared_progress.get(shared) is progress:
+                    del _shared_progress[shared]
+        return await fetch(deadline, on_progress)
+
+    if deadline is None:
+        return await call()
+    try:
+        async with asyncio.timeout_at(deadline) as scope:
+            return await call()
+    except TimeoutError:
+        if not scope.expired():
+            raise
+        raise TimeoutError(
+            f"{operation['name']} did not complete in time; the upstream request was cancelled."
+        ) from None
 
 
 async def handle_operation(
@@ -208,6 +380,16 @@ async def handle_operation(
     *,
     CONNECT_SERVER: str,
     CONNECT_API_KEY: str,
+    client_pool: ClientPool,
+    response_cache: ResponseCache | None = None,
+    single_flight: SingleFlight | None = None,
+    max_response_bytes: int | None = None,
+    on_progress: ProgressCallback | None = None,
+    limits: UpstreamLimits | None = None,
+    retry_policy: RetryPolicy | None = None,
+    timeouts: TimeoutPolicy | None = None,
+    deadline: float | None = None,
+    schema_filter: bool = False,
 ):
     """
     Handle tool execution requests.
@@ -220,11 +402,33 @@ async def handle_operation(
         The name of the operation to execute.
     arguments
         The arguments to pass to the operation.
+    client_pool
+        The pool providing the shared upstream client.
+    response_cache
+        An optional cache for the responses of GET/HEAD operations.
+    single_flight
+        Coalesces concurrent identical GET/HEAD requests into a single upstream request.
+    max_response_bytes
+        The maximum number of response bytes returned to the caller. `None` for no limit.
+    on_progress
+        Called with the number of response bytes received as the response arrives.
+    limits
+        Concurrency limits for upstream requests.
+    retry_policy
+        How transient upstream failures are retried.
+    timeouts
+        The upstream timeouts per operation.
+    deadline
+        The `time.monotonic()` time by which the caller needs the result.
+    schema_filter
+        Drop the response fields that are not declared in the operation's response schema.
 
     Returns
     -------
     :
-        A list containing a single text content object.
+        A list containing a single text content object. Successful JSON responses are shaped with
+        the `fields`, `limit` and `offset` arguments (see `ResponseShape`); error responses are
+        returned as is.
     """
     if name not in operations:
         return [
@@ -234,15 +438,34 @@ async def handle_operation(
             )
         ]
 
-    print(f"Calling {name} with args: {arguments}")
-    operation = operations[name]
-    api_params = map_arguments_to_api_params(
-        arguments,
-        operation["definition"].get("parameters", []),
+    logger.info(
+        "Calling %s with args: %s", name, Redacted(arguments), extra={"event": "tool_call"}
     )
+    operation = operations[name]
+    shape = ResponseShape.from_arguments(operation, arguments, schema_filter=schema_filter)
 
     base_url = urllib.parse.urljoin(CONNECT_SERVER, "__api__")
-    result = await make_request(base_url, operation, api_params, CONNECT_API_KEY=CONNECT_API_KEY)
-    print("Received Result")
-    # print("Received Result: {result}")
-    return [types.TextContent(text=result, type="text")]
+    with tracer.start_span(f"handle_operation {name}", attributes={"operation": name}):
+        result = await make_request(
+            base_url,
+            operation,
+            arguments,
+            CONNECT_API_KEY=CONNECT_API_KEY,
+            client_pool=client_pool,
+            response_cache=response_cache,
+            single_flight=single_flight,
+            max_response_bytes=max_response_bytes,
+            on_progress=on_progress,
+            limits=limits,
+            retry_policy=retry_policy,
+            timeouts=timeouts,
+            deadline=deadline,
+        )
+    logger.debug(
+        "Received result for %s (%d chars, status %d)",
+        name,
+        len(result.text),
+        result.status_code,
+        extra={"event": "tool_result"},
+    )
+    return [types.TextContent(text=shape.apply(result.text, result.status_code), type="text")]
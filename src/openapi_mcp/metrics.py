@@ -0,0 +1,230 @@
+import abc
+import bisect
+import math
+from collections.abc import Sequence
+from typing import TypeVar
+
+# In-process metrics exported in the Prometheus text exposition format. Metrics are only updated
+# from the event loop thread, so updates are plain dictionary and list operations without locks.
+
+Labels = tuple[str, ...]
+M = TypeVar("M", bound="Metric")
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; suited to tool calls and upstream requests
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+# Bytes; from small JSON objects to responses near `RESPONSE_MAX_BYTES`
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+class Metric(abc.ABC):
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    @abc.abstractmethod
+    def samples(self) -> list[tuple[str, Labels, Sequence[str], float]]:
+        """The samples of the metric: `(suffix, label values, extra label pairs, value)`."""
+
+    def render(self) -> list[str]:
+        lines = [
+            f"# HELP {self.name} {_escape_help(self.documentation)}",
+            f"# TYPE {self.name} {self.type}",
+        ]
+        for suffix, labels, extra, value in self.samples():
+            pairs = [
+                f'{name}="{_escape_label(value)}"'
+                for name, value in zip(self.labelnames, labels, strict=True)
+            ]
+            pairs.extend(extra)
+            label_text = "{" + ",".join(pairs) + "}" if pairs else ""
+            lines.append(f"{self.name}{suffix}{label_text} {_format_value(value)}")
+        return lines
+
+
+class Counter(Metric):
+    """A value that only goes up, e.g. the number of calls."""
+
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        if not name.endswith("_total"):
+            name += "_total"
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[Labels, float] = {} if labelnames else {(): 0.0}
+
+    def inc(self, labels: Labels = (), amount: float = 1.0) -> None:
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, labels: Labels = ()) -> float:
+        return self._values.get(labels, 0.0)
+
+    def samples(self):
+        return [("", labels, (), value) for labels, value in self._values.items()]
+
+
+class Gauge(Metric):
+    """A value that goes up and down, e.g. the number of open sessions."""
+
+    type = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[Labels, float] = {} if labelnames else {(): 0.0}
+
+    def set(self, value: float, labels: Labels = ()) -> None:
+        self._values[labels] = value
+
+    def inc(self, labels: Labels = (), amount: float = 1.0) -> None:
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def dec(self, labels: Labels = (), amount: float = 1.0) -> None:
+        self._values[labels] = self._values.get(labels, 0.0) - amount
+
+    def value(self, labels: Labels = ()) -> float:
+        return self._values.get(labels, 0.0)
+
+    def samples(self):
+        return [("", labels, (), value) for labels, value in self._values.items()]
+
+
+class Histogram(Metric):
+    """The distribution of observed values (e.g. latencies) over fixed buckets."""
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        *,
+        buckets: Sequence[float] = DURATION_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Labels -> [count per bucket (last one is +Inf)..., sum]
+        self._values: dict[Labels, list[float]] = {}
+
+    def observe(self, value: float, labels: Labels = ()) -> None:
+        state = self._values.get(labels)
+        if state is None:
+            state = self._values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        state[bisect.bisect_left(self.buckets, value)] += 1
+        state[-1] += value
+
+    def count(self, labels: Labels = ()) -> int:
+        state = self._values.get(labels)
+        return int(sum(state[:-1])) if state is not None else 0
+
+    def samples(self):
+        samples = []
+        for labels, state in self._values.items():
+            cumulative = 0
+            for bound, count in zip((*self.buckets, math.inf), state[:-1], strict=True):
+                cumulative += count
+                samples.append(("_bucket", labels, (f'le="{_format_value(bound)}"',), cumulative))
+            samples.append(("_sum", labels, (), state[-1]))
+            samples.append(("_count", labels, (), cumulative))
+        return samples
+
+
+class MetricsRegistry:
+    """A set of metrics rendered together on the metrics endpoint."""
+
+    def __init__(self):
+        self._metrics: dict[str, Metric] = {}
+
+    def register(self, metric: M) -> M:
+        if metric.name in self._metrics:
+            raise ValueError(f"A metric named `{metric.name}` is already registered.")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        *,
+        buckets: Sequence[float] = DURATION_BUCKETS,
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets=buckets))
+
+    def render(self) -> str:
+        """Render every metric in the Prometheus text exposition format."""
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+default_registry = MetricsRegistry()
+
+TOOL_CALLS = default_registry.counter(
+    "mcp_tool_calls", "Tool calls handled, by tool and outcome.", ["tool", "status"]
+)
+TOOL_CALL_DURATION = default_registry.histogram(
+    "mcp_tool_call_duration_seconds", "Time spent handling a tool call.", ["tool"]
+)
+TOOL_RESULT_SIZE = default_registry.histogram(
+    "mcp_tool_result_bytes",
+    "Size of the text returned by tool calls.",
+    ["tool"],
+    buckets=SIZE_BUCKETS,
+)
+LIST_TOOLS_DURATION = default_registry.histogram(
+    "mcp_list_tools_duration_seconds", "Time spent handling a tools/list request."
+)
+SESSIONS_ACTIVE = default_registry.gauge("mcp_sse_sessions_active", "Open SSE sessions.")
+SESSIONS = default_registry.counter("mcp_sse_sessions", "SSE sessions opened.")
+UPSTREAM_REQUESTS = default_registry.counter(
+    "upstream_requests",
+    "Upstream request attempts, by operation and HTTP status (or error type).",
+    ["operation", "status"],
+)
+UPSTREAM_DURATION = default_registry.histogram(
+    "upstream_request_duration_seconds",
+    "Time taken by an upstream request attempt, including reading the response.",
+    ["operation"],
+)
+UPSTREAM_RESPONSE_SIZE = default_registry.histogram(
+    "upstream_response_bytes",
+    "Size of the (decoded) upstream response bodies.",
+    ["operation"],
+    buckets=SIZE_BUCKETS,
+)
+SPEC_RELOADS = default_registry.counter(
+    "openapi_mcp_spec_reloads", "Reloads of the spec file, by outcome.", ["status"]
+)
+COMPONENT_STATS = default_registry.gauge(
+    "openapi_mcp_component_stat",
+    "Counters of the server components (response cache, request coalescing, limits, retries, tool list).",
+    ["component", "stat"],
+)
+
+
+def _escape_help(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _escape_label(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
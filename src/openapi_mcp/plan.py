@@ -0,0 +1,167 @@
+import re
+import urllib.parse
+from typing import Any
+
+import httpx
+
+from .swagger import OperationDef
+
+# Splits `/v1/users/{guid}` into `["/v1/users/", "guid", ""]`: literals at even indices and path
+# parameter names at odd indices
+_ROUTE_PARAM_RE = re.compile(r"\{([^{}]+)\}")
+
+
+class RequestPlan:
+    """
+    A precompiled plan for turning tool arguments into an HTTP request.
+
+    Built once per operation; binding arguments is a single pass over the arguments with no
+    per-call parsing of the swagger parameters or the route.
+
+    Arguments
+    ---------
+    operation
+        The operation the plan is compiled for.
+    """
+
+    __slots__ = ("method", "route", "slots", "header_names", "_segments", "_has_body")
+
+    def __init__(self, operation: OperationDef):
+        self.method: str = operation["method"].upper()
+        self.route: str = operation["route"]
+        # Parameter name -> location (`path`, `query`, `header`, `body` or `formData`)
+        self.slots: dict[str, str] = {
+            param["name"]: param["in"]
+            for param in operation["definition"].get("parameters", [])
+            if "name" in param and "in" in param
+        }
+        # The `in: header` parameters, which (unlike other headers) can change the response
+        self.header_names: tuple[str, ...] = tuple(
+            sorted(name for name, location in self.slots.items() if location == "header")
+        )
+        self._segments: list[str] = _ROUTE_PARAM_RE.split(self.route)
+        self._has_body = "body" in self.slots.values()
+
+    def build_request(self, client: httpx.AsyncClient, arguments: dict[str, Any] | None):
+        """
+        Build the HTTP request for the given tool arguments.
+
+        Arguments that are not parameters of the operation and empty values are ignored.
+
+        Arguments
+        ---------
+        client
+            The client the request will be sent with (provides the base URL and headers).
+        arguments
+            The tool arguments.
+
+        Returns
+        -------
+        :
+            The `httpx.Request`, ready to be sent with `client.send()`.
+        """
+        path: dict[str, str] | None = None
+        query: dict[str, Any] | None = None
+        headers: dict[str, str] | None = None
+        form: dict[str, Any] | None = None
+        body: Any = None
+
+        if arguments:
+            slots = self.slots
+            for arg_name, arg_value in arguments.items():
+                location = slots.get(arg_name)
+                if location is None or arg_value is None:
+                    continue
+                if isinstance(arg_value, (str, list, dict)) and len(arg_value) == 0:
+                    continue
+
+                if location == "path":
+                    if path is None:
+                        path = {}
+                    path[arg_name] = str(arg_value)
+                elif location == "query":
+                    if query is None:
+                        query = {}
+                    query[arg_name] = arg_value
+                elif location == "header":
+                    if headers is None:
+                        headers = {}
+                    headers[arg_name] = str(arg_value)
+                elif location == "formData":
+                    if form is None:
+                        form = {}
+                    form[arg_name] = arg_value
+                elif location == "body":
+                    if body is None:
+                        body = arg_value
+                    elif isinstance(body, dict) and isinstance(arg_value, dict):
+                        body = {**body, **arg_value}
+                    else:
+                        body = arg_value
+
+        if body is None and self._has_body:
+            body = {}
+
+        # An absolute URL with the query already encoded lets httpx parse the URL once instead of
+        # once for the relative route, once when merging with the base URL and once per params
+        url = str(client.base_url) + self._route(path).lstrip("/")
+        if query is not None:
+            url += "?" + _encode_query(query)
+
+        return client.build_request(
+            self.method,
+            url,
+            headers=headers,
+            data=form,
+            json=body,
+        )
+
+    def _route(self, path: dict[str, str] | None) -> str:
+        segments = self._segments
+        if len(segments) == 1:
+            return segments[0]
+        parts = segments.copy()
+        for i in range(1, len(parts), 2):
+            name = parts[i]
+            # Unbound path parameters keep their placeholder
+            parts[i] = path[name] if path is not None and name in path else f"{{{name}}}"
+        return "".join(parts)
+
+
+def _encode_query(query: dict[str, Any]) -> str:
+    # Match httpx's encoding of primitive values (e.g. `true` rather than `True`)
+    items = []
+    for key, value in query.items():
+        for item in value if isinstance(value, (list, tuple)) else (value,):
+            if item is None:
+                continue
+            if isinstance(item, bool):
+                item = "true" if item else "false"
+            items.append((key, item))
+    return urllib.parse.urlencode(items, quote_via=urllib.parse.quote)
+
+
+_request_plans: dict[int, tuple[OperationDef, RequestPlan]] = {}
+
+
+def get_request_plan(operation: OperationDef) -> RequestPlan:
+    """
+    Get the compiled request plan for an operation, compiling it on first use.
+
+    Arguments
+    ---------
+    operation
+        The operation definition. Plans are cached per operation object.
+    """
+    cached = _request_plans.get(id(operation))
+    # Holding on to the operation keeps its `id()` from being reused while cached
+    if cached is not None and cached[0] is operation:
+        return cached[1]
+    plan = RequestPlan(operation)
+    _request_plans[id(operation)] = (operation, plan)
+    return plan
+
+
+def clear_request_plans() -> None:
+    """Drop every cached request plan (e.g. after the operations are reloaded)."""
+    _request_plans.clear()
@@ -0,0 +1,112 @@
+import asyncio
+import importlib.util
+import warnings
+
+import httpx
+
+
+class ClientPool:
+    """
+    A pool of long-lived `httpx.AsyncClient`s.
+
+    Clients are keyed by base URL and API key so that every tool call against the same upstream
+    reuses the same connection pool (keep-alive, TLS sessions and, optionally, HTTP/2
+    multiplexing) instead of opening a new client per request.
+
+    Arguments
+    ---------
+    max_connections
+        Maximum number of concurrent connections per client.
+    max_keepalive_connections
+        Maximum number of idle connections kept alive per client.
+    keepalive_expiry
+        Seconds an idle connection is kept alive before being closed.
+    http2
+        Whether to enable HTTP/2. Requires the `h2` package; falls back to HTTP/1.1 with a
+        warning if it is not installed.
+    verify
+        Whether to verify TLS certificates.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_connections: int | None = 100,
+        max_keepalive_connections: int | None = 20,
+        keepalive_expiry: float | None = 30.0,
+        http2: bool = False,
+        verify: bool = False,
+    ):
+        if http2 and importlib.util.find_spec("h2") is None:
+            warnings.warn(
+                "HTTP/2 was requested but the `h2` package is not installed. "
+                "Install it with `pip install httpx[http2]`. Falling back to HTTP/1.1.",
+                stacklevel=2,
+            )
+            http2 = False
+
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.http2 = http2
+        self.verify = verify
+        self._clients: dict[tuple[str, str], httpx.AsyncClient] = {}
+        # Clients can only be used from the event loop they were created in
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._lock = asyncio.Lock()
+
+    def get_client(self, base_url: str, *, api_key: str = "") -> httpx.AsyncClient:
+        """
+        Get (or create) the shared client for a base URL and API key.
+
+        Arguments
+        ---------
+        base_url
+            The base URL every request made with the client is relative to.
+        api_key
+            The Connect API key sent in the `Authorization` header. No header is sent if empty.
+
+        Returns
+        -------
+        :
+            A client that must not be closed by the caller.
+
+        Raises
+        ------
+        RuntimeError
+            If the pool's clients were created in another event loop. Each event loop (e.g. the
+            server's, or a Shiny session's) needs its own pool.
+        """
+        loop = asyncio.get_running_loop()
+        if self._loop is None or not self._clients:
+            self._loop = loop
+        elif self._loop is not loop:
+            raise RuntimeError("A ClientPool can only be used from one event loop.")
+        key = (base_url, api_key)
+        client = self._clients.get(key)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                base_url=base_url,
+                headers={"Authorization": f"Key {api_key}"} if api_key else None,
+                limits=self.limits,
+                http2=self.http2,
+                verify=self.verify,
+            )
+            self._clients[key] = client
+        return client
+
+    async def aclose(self) -> None:
+        """Close every client in the pool."""
+        async with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+            for client in clients:
+                await client.aclose()
+
+    async def __aenter__(self) -> "ClientPool":
+        return self
+
+    async def __aexit__(self, *_args) -> None:
+        await self.aclose()
@@ -0,0 +1,167 @@
+import hashlib
+import json
+import logging
+import os
+import sys
+from pathlib import Path
+
+from .index import OperationIndex
+from .selection import OperationSelector
+from .spec import loads_spec
+from .spec_cache import hash_spec_file
+from .swagger import SwaggerDocument, find_refs, find_value, ref_to_path
+
+# Reloading the spec file while the server runs. The file is polled; when its contents change the
+# new document is indexed and the operations of path items that did not change (including
+# everything they reference) keep their expanded definitions and tools.
+
+logger = logging.getLogger(__name__)
+
+# Marker for "this digest did not skip any cyclic reference"
+_NO_CYCLE = sys.maxsize
+
+
+def path_item_digests(document: SwaggerDocument) -> dict[str, str]:
+    """
+    Digest every path item of a document, including the objects its `$ref`s point to.
+
+    Digests are Merkle hashes: a path item's digest covers its own contents and the digests of
+    the objects it references, so changing a shared definition changes the digest of every path
+    item that (directly or indirectly) uses it.
+
+    Returns
+    -------
+    :
+        The digest of each path item, keyed by route.
+    """
+    ref_digests: dict[str, str] = {}
+    stack: list[str] = []
+
+    def digest(obj) -> tuple[str, int]:
+        # Returns the digest and the lowest `stack` index of a cyclic `$ref` skipped on the way.
+        # Such digests depend on where the cycle was entered and are not memoized.
+        lowest = _NO_CYCLE
+        hasher = hashlib.sha256(_canonical_json(obj))
+        for ref in sorted(find_refs(obj)):
+            ref_digest, ref_lowest = digest_ref(ref)
+            hasher.update(ref_digest.encode())
+            lowest = min(lowest, ref_lowest)
+        return hasher.hexdigest(), lowest
+
+    def digest_ref(ref: str) -> tuple[str, int]:
+        if ref in ref_digests:
+            return ref_digests[ref], _NO_CYCLE
+        if ref in stack:
+            # The referenced object's contents are covered by the digest being computed
+            return ref, stack.index(ref)
+        index = len(stack)
+        stack.append(ref)
+        try:
+            value, lowest = digest(find_value(document, ref_to_path(ref)))
+        finally:
+            stack.pop()
+        if lowest >= index:
+            ref_digests[ref] = value
+            lowest = _NO_CYCLE
+        return value, lowest
+
+    return {route: digest(path_item)[0] for route, path_item in document.get("paths", {}).items()}
+
+
+def _canonical_json(obj) -> bytes:
+    return json.dumps(obj, sort_keys=True, separators=(",", ":"), default=str).encode("utf-8")
+
+
+class SpecReloader:
+    """
+    Reloads a spec file when its contents change.
+
+    `check()` does blocking work (reading, hashing and indexing the spec) and is meant to run in a
+    worker thread. A new index (and the file version it was loaded from) is only adopted as the
+    current one once `accept()` is called, so the caller can validate it first.
+
+    Arguments
+    ---------
+    path
+        The spec file.
+    operations
+        The index of the currently loaded spec.
+    selector
+        Selects the operations to index in new versions of the spec.
+    spec_hash
+        The SHA-256 of the file contents `operations` were loaded from. Defaults to the hash of
+        the file when the reloader is created.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        operations: OperationIndex,
+        *,
+        selector: OperationSelector | None = None,
+        spec_hash: str | None = None,
+    ):
+        self.path = Path(path).expanduser()
+        self.operations = operations
+        self.selector = selector
+        self._stat = self._read_stat()
+        self.spec_hash = spec_hash if spec_hash is not None else hash_spec_file(self.path)
+        """The SHA-256 of the file contents the last loaded index was parsed from."""
+        # Digests of `operations.document`, computed on the first reload
+        self._digests: dict[str, str] | None = None
+        # The index returned by the last `check()`, with its digests, file stat and hash
+        self._pending: tuple[OperationIndex, dict[str, str], tuple[int, int], str] | None = None
+
+    def _read_stat(self) -> tuple[int, int] | None:
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def check(self) -> OperationIndex | None:
+        """
+        Load the spec if the file changed since the last check.
+
+        Returns
+        -------
+        :
+            An index of the new spec, reusing the operations of unchanged path items, or `None` if
+            the file did not change. A file that fails to load (e.g. while it is being written)
+            or whose index is not accepted is loaded again on the next check.
+        """
+        stat = self._read_stat()
+        if stat is None or stat == self._stat:
+            return None
+        # Hash and parse the same bytes, so `spec_hash` always matches the index
+        data = self.path.read_bytes()
+        spec_hash = hashlib.sha256(data).hexdigest()
+        if spec_hash == self.spec_hash:
+            # Rewritten with the same contents
+            self._stat = stat
+            return None
+
+        index = OperationIndex(loads_spec(data), selector=self.selector)
+        if self._digests is None:
+            self._digests = path_item_digests(self.operations.document)
+        digests = path_item_digests(index.document)
+        unchanged = {
+            route for route, digest in digests.items() if self._digests.get(route) == digest
+        }
+        reused = index.adopt(self.operations, unchanged)
+        logger.info(
+            "Reloaded %s: %d of %d path items changed, %d operations reused",
+            self.path,
+            len(digests) - len(unchanged),
+            len(digests),
+            reused,
+        )
+        self._pending = (index, digests, stat, spec_hash)
+        return index
+
+    def accept(self, index: OperationIndex) -> None:
+        """Make an index returned by `check()` the current one."""
+        if self._pending is None or self._pending[0] is not index:
+            raise ValueError("The index was not returned by the last `check()`.")
+        self.operations, self._digests, self._stat, self.spec_hash = self._pending
+        self._pending = None
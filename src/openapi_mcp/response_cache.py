@@ -0,0 +1,273 @@
+import functools
+import hashlib
+import re
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Mapping, Sequence
+from typing import NamedTuple
+
+import httpx
+
+CACHEABLE_METHODS = ("GET", "HEAD")
+
+_MAX_AGE_RE = re.compile(r"(?:^|,)\s*(?:s-)?max-age\s*=\s*\"?(\d+)")
+
+CacheKey = tuple[str, str, str, str, tuple[tuple[str, str], ...]]
+
+
+class UpstreamResponse(NamedTuple):
+    """The status code and text of an upstream response, possibly answered from the cache."""
+
+    status_code: int
+    text: str
+
+
+class CachedResponse:
+    __slots__ = ("path", "text", "etag", "expires_at")
+
+    def __init__(self, *, path: str, text: str, etag: str | None, expires_at: float):
+        self.path = path
+        self.text = text
+        self.etag = etag
+        self.expires_at = expires_at
+
+    def is_fresh(self, now: float) -> bool:
+        return now < self.expires_at
+
+
+@functools.lru_cache(maxsize=64)
+def auth_identity(api_key: str) -> str:
+    """A non-reversible identifier for an API key, used to keep cached responses per caller."""
+    if not api_key:
+        return ""
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+
+
+def request_key(
+    operation_name: str,
+    request: httpx.Request,
+    api_key: str,
+    header_names: Sequence[str] = (),
+) -> CacheKey:
+    """
+    Identifies requests that produce the same response for the same caller.
+
+    Arguments
+    ---------
+    operation_name
+        The name of the operation the request is for.
+    request
+        The request.
+    api_key
+        The API key the request is authorized with.
+    header_names
+        The operation's header parameters (see `RequestPlan.header_names`). Other headers, such as
+        `traceparent` and `If-None-Match`, do not change the response and are not part of the key.
+    """
+    headers = tuple(
+        (name, request.headers[name]) for name in header_names if name in request.headers
+    )
+    return (operation_name, request.method, str(request.url), auth_identity(api_key), headers)
+
+
+class ResponseCache:
+    """
+    An in-memory LRU cache of upstream responses for idempotent (GET/HEAD) operations.
+
+    Responses are keyed by operation name, method, resolved URL (route and query), header
+    parameters and the caller's API key. `Cache-Control: no-store` responses are not cached,
+    `max-age` shortens the TTL and `no-cache` forces revalidation. Expired entries with an `ETag` are revalidated with
+    `If-None-Match`. Successful mutating requests invalidate the cached responses of the same
+    resource path, its sub-resources and its parent collection.
+
+    Arguments
+    ---------
+    max_entries
+        The maximum number of cached responses. The least recently used entry is evicted first.
+    default_ttl
+        Seconds a response is fresh for when the operation has no TTL in `ttls`.
+    ttls
+        Per-operation TTLs in seconds, keyed by operation name. A TTL of `0` disables caching for
+        that operation.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = 256,
+        default_ttl: float = 60.0,
+        ttls: Mapping[str, float] | None = None,
+    ):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.ttls = dict(ttls or {})
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self._entries: OrderedDict[CacheKey, CachedResponse] = OrderedDict()
+        # Resource path -> keys of the cached responses for that path
+        self._paths: dict[str, set[CacheKey]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def ttl(self, operation_name: str) -> float:
+        return self.ttls.get(operation_name, self.default_ttl)
+
+    def lookup(self, key: CacheKey) -> CachedResponse | None:
+        """Get a cached response (fresh or stale) and mark it as recently used."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def store(self, key: CacheKey, response: httpx.Response, ttl: float) -> None:
+        """Cache a successful response, honouring its `Cache-Control` header."""
+        # A truncated body (see `send_streaming`) is not the resource the ETag describes
+        if response.status_code != 200 or response.extensions.get("truncated"):
+            return
+
+        ttl = _response_ttl(response, ttl)
+        etag = response.headers.get("etag")
+        if ttl is None or (ttl <= 0 and etag is None):
+            # Could never be served without revalidation and can not be revalidated
+            return
+
+        self._remove(key)
+        path = response.request.url.path
+        self._entries[key] = CachedResponse(
+            path=path,
+            text=response.text,
+            etag=etag,
+            expires_at=time.monotonic() + ttl,
+        )
+        self._paths.setdefault(path, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+
+    def refresh(self, entry: CachedResponse, response: httpx.Response, ttl: float) -> None:
+        """Extend a cached response after the upstream answered `304 Not Modified`."""
+        self.revalidations += 1
+        ttl = _response_ttl(response, ttl)
+        entry.expires_at = time.monotonic() + (ttl or 0)
+        entry.etag = response.headers.get("etag", entry.etag)
+
+    def invalidate_path(self, path: str) -> int:
+        """
+        Drop the cached responses affected by a change to a resource path.
+
+        Arguments
+        ---------
+        path
+            The URL path a mutating request was sent to (e.g. `/__api__/v1/users/<guid>`).
+
+        Returns
+        -------
+        :
+            The number of responses dropped.
+        """
+        path = path.rstrip("/")
+        parent = path.rsplit("/", 1)[0]
+        affected = [
+            cached_path
+            for cached_path in self._paths
+            if cached_path == path or cached_path == parent or cached_path.startswith(path + "/")
+        ]
+        count = 0
+        for cached_path in affected:
+            for key in list(self._paths.get(cached_path, ())):
+                self._remove(key)
+                count += 1
+        return count
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._paths.clear()
+
+    def _remove(self, key: CacheKey) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        keys = self._paths.get(entry.path)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._paths[entry.path]
+
+
+async def send_cached(
+    send: Callable[[httpx.Request], Awaitable[httpx.Response]],
+    request: httpx.Request,
+    cache: ResponseCache,
+    *,
+    operation_name: str,
+    api_key: str,
+    header_names: Sequence[str] = (),
+) -> UpstreamResponse:
+    """
+    Send a request through the response cache.
+
+    Cacheable requests are answered from the cache while fresh and revalidated with their `ETag`
+    once stale. Other requests are sent as is and, when successful, invalidate the cached
+    responses for their resource path.
+
+    Arguments
+    ---------
+    send
+        Sends a request upstream (e.g. `client.send`).
+    request
+        The request to send.
+    cache
+        The cache to answer from and store into.
+    operation_name
+        The name of the operation the request is for.
+    api_key
+        The API key the request is authorized with.
+    header_names
+        The operation's header parameters, which are part of the cache key.
+
+    Returns
+    -------
+    :
+        The response status code and text. Cached responses are successful (`200`) ones.
+    """
+    if request.method not in CACHEABLE_METHODS:
+        response = await send(request)
+        if response.is_success:
+            cache.invalidate_path(request.url.path)
+        return UpstreamResponse(response.status_code, response.text)
+
+    ttl = cache.ttl(operation_name)
+    if ttl <= 0:
+        response = await send(request)
+        return UpstreamResponse(response.status_code, response.text)
+
+    key = request_key(operation_name, request, api_key, header_names)
+    entry = cache.lookup(key)
+    if entry is not None:
+        if entry.is_fresh(time.monotonic()):
+            cache.hits += 1
+            return UpstreamResponse(200, entry.text)
+        if entry.etag is not None:
+            request.headers["If-None-Match"] = entry.etag
+
+    cache.misses += 1
+    response = await send(request)
+    if response.status_code == 304 and entry is not None:
+        cache.refresh(entry, response, ttl)
+        return UpstreamResponse(200, entry.text)
+    cache.store(key, response, ttl)
+    return UpstreamResponse(response.status_code, response.text)
+
+
+def _response_ttl(response: httpx.Response, ttl: float) -> float | None:
+    # The TTL allowed by the response's `Cache-Control` header; `None` if it must not be stored
+    cache_control = response.headers.get("cache-control", "").lower()
+    if "no-store" in cache_control:
+        return None
+    if "no-cache" in cache_control:
+        return 0
+    match = _MAX_AGE_RE.search(cache_control)
+    if match is not None:
+        return min(ttl, float(match.group(1)))
+    return ttl
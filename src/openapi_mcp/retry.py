@@ -0,0 +1,250 @@
+import asyncio
+import email.utils
+import random
+import time
+from collections.abc import Awaitable, Callable, Iterable
+from datetime import datetime, timezone
+
+import httpx
+
+# Methods that can be sent again without changing the outcome
+IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS", "PUT", "DELETE")
+# Responses worth retrying: rate limited or upstream temporarily unavailable
+RETRY_STATUSES = (429, 502, 503, 504)
+# Transport errors raised before the request reached the upstream; safe to retry for any method
+_NOT_SENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+class CircuitOpenError(RuntimeError):
+    """The upstream failed repeatedly and requests to it fail fast for a while."""
+
+
+class CircuitBreaker:
+    """
+    Fail fast while an upstream is down.
+
+    After `failure_threshold` consecutive failures (transport errors or 502/503/504 responses) the
+    circuit opens and requests fail immediately with a `CircuitOpenError`. Once `reset_timeout`
+    has passed, one trial request is let through: success closes the circuit, failure keeps it
+    open for another `reset_timeout`.
+    """
+
+    __slots__ = ("name", "failure_threshold", "reset_timeout", "failures", "opened_at")
+
+    def __init__(self, name: str, *, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        """Consecutive failures."""
+        self.opened_at: float | None = None
+
+    @property
+    def is_open(self) -> bool:
+        return self.opened_at is not None
+
+    def before_request(self) -> None:
+        """
+        Check that a request may be sent.
+
+        Raises
+        ------
+        CircuitOpenError
+            If the circuit is open and it is not yet time for a trial request.
+        """
+        if self.opened_at is None:
+            return
+        now = time.monotonic()
+        remaining = self.opened_at + self.reset_timeout - now
+        if remaining > 0:
+            raise CircuitOpenError(
+                f"{self.name} is unavailable after {self.failures} consecutive failures; "
+                f"requests fail fast for the next {remaining:.0f}s."
+            )
+        # Let this request through as the trial; the others keep failing fast until it reports
+        self.opened_at = now
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+
+
+class RetryPolicy:
+    """
+    How upstream requests are retried.
+
+    Idempotent requests (and those of the operations in `retry_operations`) are retried on
+    429/502/503/504 responses and transport errors, with capped exponential backoff and full
+    jitter, honouring `Retry-After`. Requests that never reached the upstream (connection errors)
+    are retried for any method. All attempts of a request, including the waits between them, must
+    fit in `budget` seconds.
+
+    Arguments
+    ---------
+    max_attempts
+        The maximum number of attempts per request, including the first one. `1` disables retries.
+    base_delay
+        The backoff before the first retry, in seconds; doubled for every further retry.
+    max_delay
+        The maximum backoff between two attempts, in seconds.
+    budget
+        Seconds from the first attempt after which no retry is started.
+    retry_operations
+        Names of non-idempotent operations that may be retried.
+    failure_threshold
+        Consecutive failures of an upstream that open its circuit breaker. `0` disables circuit
+        breaking.
+    reset_timeout
+        Seconds an open circuit fails fast before a trial request is let through.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_attempts: int = 3,
+        base_delay: float = 0.25,
+        max_delay: float = 5.0,
+        budget: float = 15.0,
+        retry_operations: Iterable[str] = (),
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+    ):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget = budget
+        self.retry_operations = frozenset(retry_operations)
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.retries = 0
+        """Retries made (attempts after the first)."""
+        self._breakers: dict[str, CircuitBreaker] = {}
+
+    def circuit_breaker(self, base_url: str) -> CircuitBreaker | None:
+        """Get the circuit breaker of an upstream, or `None` if circuit breaking is disabled."""
+        if self.failure_threshold <= 0:
+            return None
+        breaker = self._breakers.get(base_url)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                base_url,
+                failure_threshold=self.failure_threshold,
+                reset_timeout=self.reset_timeout,
+            )
+            self._breakers[base_url] = breaker
+        return breaker
+
+    def is_retryable(self, method: str, operation_name: str) -> bool:
+        return method.upper() in IDEMPOTENT_METHODS or operation_name in self.retry_operations
+
+    def backoff(self, attempt: int) -> float:
+        """A random delay before retrying after `attempt` attempts ("full jitter")."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "retries": self.retries,
+            "open_circuits": sum(breaker.is_open for breaker in self._breakers.values()),
+        }
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Parse a `Retry-After` header (delay in seconds or HTTP date) into seconds from now."""
+    if value is None:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        date = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+    return max(0.0, (date - datetime.now(timezone.utc)).total_seconds())
+
+
+async def send_with_retries(
+    send: Callable[[httpx.Request], Awaitable[httpx.Response]],
+    request: httpx.Request,
+    policy: RetryPolicy,
+    *,
+    base_url: str,
+    operation_name: str,
+    deadline: float | None = None,
+) -> httpx.Response:
+    """
+    Send a request, retrying transient failures according to a retry policy.
+
+    Arguments
+    ---------
+    send
+        Sends a single attempt of the request upstream.
+    request
+        The request to send.
+    policy
+        The retry policy.
+    base_url
+        The upstream the request is sent to; each upstream has its own circuit breaker.
+    operation_name
+        The name of the operation the request is for.
+    deadline
+        The `time.monotonic()` time after which no retry is started, if earlier than the policy's
+        budget allows.
+
+    Returns
+    -------
+    :
+        The first response that is not retried: successful, not retryable, or the last one
+        received when the attempts or the budget ran out.
+
+    Raises
+    ------
+    CircuitOpenError
+        If the upstream's circuit is open.
+    httpx.TransportError
+        If the last attempt failed with a transport error.
+    """
+    breaker = policy.circuit_breaker(base_url)
+    retryable = policy.is_retryable(request.method, operation_name)
+    budget_deadline = time.monotonic() + policy.budget
+    deadline = budget_deadline if deadline is None else min(deadline, budget_deadline)
+    attempt = 0
+    while True:
+        if breaker is not None:
+            breaker.before_request()
+        attempt += 1
+        try:
+            response = await send(request)
+        except httpx.TransportError as e:
+            if breaker is not None:
+                breaker.record_failure()
+            delay = policy.backoff(attempt)
+            if not (retryable or isinstance(e, _NOT_SENT_ERRORS)) or not _can_retry(
+                policy, attempt, delay, deadline
+            ):
+                raise
+        else:
+            status = response.status_code
+            if breaker is not None:
+                if status in RETRY_STATUSES and status != 429:
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+            if status not in RETRY_STATUSES or not retryable:
+                return response
+            retry_after = parse_retry_after(response.headers.get("retry-after"))
+            delay = retry_after if retry_after is not None else policy.backoff(attempt)
+            if not _can_retry(policy, attempt, delay, deadline):
+                return response
+        policy.retries += 1
+        await asyncio.sleep(delay)
+
+
+def _can_retry(policy: RetryPolicy, attempt: int, delay: float, deadline: float) -> bool:
+    return attempt < policy.max_attempts and time.monotonic() + delay < deadline
@@ -0,0 +1,242 @@
+import functools
+import heapq
+import math
+import re
+from collections import Counter
+from collections.abc import Iterable, Mapping
+from typing import Any, NamedTuple
+
+import mcp.types as types
+
+from .index import OperationIndex
+from .swagger import OperationDef, SwaggerDocument, find_value, ref_to_path
+
+# Searching the operations of large specs, so that clients can be given a `search_tools` tool
+# (and the tools it finds) instead of thousands of tools.
+
+SEARCH_TOOL_NAME = "search_tools"
+
+# Weight of each field of an operation; a token is counted this many times per occurrence
+FIELD_WEIGHTS = {"name": 3, "summary": 2, "tags": 2, "parameters": 1, "description": 1}
+
+_TOKEN_RE = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|\d+")
+_STOP_WORDS = frozenset(
+    "a an and are as at be by for from in is it of on or that the this to with".split()
+)
+
+
+def tokenize(text: str) -> list[str]:
+    """
+    Split text into lowercase search terms.
+
+    camelCase and snake_case identifiers are split into words, stop words are dropped and plural
+    `s` endings removed, so `listUsers` and "list of users" give the same terms.
+    """
+    return [term for term in map(_term, _TOKEN_RE.findall(text)) if term]
+
+
+@functools.lru_cache(maxsize=65536)
+def _term(token: str) -> str:
+    # The search term of a token, empty for stop words
+    token = token.lower()
+    if token in _STOP_WORDS:
+        return ""
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+class SearchResult(NamedTuple):
+    name: str
+    score: float
+
+
+class ToolSearchIndex:
+    """
+    A BM25 index of operations.
+
+    Operation IDs, summaries, tags, parameter names and descriptions are indexed (weighted by
+    `FIELD_WEIGHTS`). The operations of an `OperationIndex` are indexed from the unexpanded
+    document, so building the index does not expand them.
+
+    Arguments
+    ---------
+    operations
+        The operations to index.
+    k1
+        BM25 term frequency saturation.
+    b
+        BM25 document length normalization.
+    """
+
+    def __init__(
+        self, operations: Mapping[str, OperationDef], *, k1: float = 1.2, b: float = 0.75
+    ):
+        self.operations = operations
+        self.names: list[str] = []
+        # The operations (by position in `names`) of each term, and the term's BM25 score in each
+        self._postings: dict[str, tuple[list[int], list[float]]] = {}
+        self.searches = 0
+        """The number of searches run."""
+
+        document = operations.document if isinstance(operations, OperationIndex) else None
+        # The operations of each term, and the term's count in each
+        counts: dict[str, tuple[list[int], list[int]]] = {}
+        lengths = []
+        for name in operations:
+            terms = _operation_terms(name, self._definition(name), document)
+            doc_id = len(self.names)
+            self.names.append(name)
+            lengths.append(len(terms))
+            for term, count in Counter(terms).items():
+                postings = counts.get(term)
+                if postings is None:
+                    postings = counts[term] = ([], [])
+                postings[0].append(doc_id)
+                postings[1].append(count)
+
+        # The scores do not depend on the query, so they are computed once
+        n_docs = len(self.names)
+        average_length = sum(lengths) / n_docs if n_docs else 0.0
+        norms = [
+            k1 * (1 - b + b * length / average_length) if average_length else k1
+            for length in lengths
+        ]
+        for term, (doc_ids, term_counts) in counts.items():
+            idf = math.log(1 + (n_docs - len(doc_ids) + 0.5) / (len(doc_ids) + 0.5))
+            self._postings[term] = (
+                doc_ids,
+                [
+                    idf * count * (k1 + 1) / (count + norms[doc_id])
+                    for doc_id, count in zip(doc_ids, term_counts, strict=True)
+                ],
+            )
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def search(self, query: str, limit: int = 10) -> list[SearchResult]:
+        """
+        Find the operations that best match a query.
+
+        Arguments
+        ---------
+        query
+            Keywords, e.g. "update user email".
+        limit
+            The maximum number of results.
+
+        Returns
+        -------
+        :
+            The matching operations, best first.
+        """
+        self.searches += 1
+        scores: dict[int, float] = {}
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            if not scores:
+                scores = dict(zip(*postings, strict=True))
+                continue
+            get = scores.get
+            for doc_id, score in zip(*postings, strict=True):
+                scores[doc_id] = get(doc_id, 0.0) + score
+        best = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+        return [SearchResult(self.names[doc_id], score) for doc_id, score in best]
+
+    def describe(self, results: Iterable[SearchResult]) -> list[dict[str, Any]]:
+        """The name, summary and score of search results, as returned by `search_tools`."""
+        described = []
+        for name, score in results:
+            definition = self._definition(name)
+            summary = definition.get("summary") or _first_sentence(
+                definition.get("description") or ""
+            )
+            described.append({"name": name, "summary": summary, "score": round(score, 3)})
+        return described
+
+    def _definition(self, name: str) -> dict[str, Any]:
+        if isinstance(self.operations, OperationIndex):
+            return self.operations.unexpanded(name)
+        return self.operations[name]["definition"]
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "operations": len(self.names),
+            "terms": len(self._postings),
+            "searches": self.searches,
+        }
+
+
+def _operation_terms(
+    name: str, definition: dict[str, Any], document: SwaggerDocument | None
+) -> list[str]:
+    fields = {
+        "name": name,
+        "summary": definition.get("summary") or "",
+        "tags": " ".join(definition.get("tags") or []),
+        "parameters": " ".join(_parameter_names(definition, document)),
+        "description": definition.get("description") or "",
+    }
+    terms = []
+    for field, text in fields.items():
+        terms.extend(tokenize(text) * FIELD_WEIGHTS[field])
+    return terms
+
+
+def _parameter_names(definition: dict[str, Any], document: SwaggerDocument | None) -> list[str]:
+    names = []
+    for parameter in definition.get("parameters") or []:
+        if "$ref" in parameter and document is not None:
+            parameter = find_value(document, ref_to_path(parameter["$ref"])) or {}
+        if isinstance(parameter, dict) and isinstance(parameter.get("name"), str):
+            names.append(parameter["name"])
+    return names
+
+
+def _first_sentence(text: str, max_length: int = 200) -> str:
+    sentence = re.split(r"(?<=[.!?])\s", text.strip(), maxsplit=1)[0]
+    return sentence if len(sentence) <= max_length else sentence[: max_length - 3] + "..."
+
+
+def make_search_tool(*, max_results: int = 10, dynamic: bool = False) -> types.Tool:
+    """
+    Create the `search_tools` tool, which finds operations by keywords.
+
+    Arguments
+    ---------
+    max_results
+        The maximum number of results of one search.
+    dynamic
+        Whether the operations found are added to the client's tools (see `connect_api`), which
+        the description tells the model.
+    """
+    description = (
+        "Search the available operations by keywords, e.g. the action and the objects involved "
+        "(`update user email`). Returns the names and summaries of the best matching operations."
+    )
+    if dynamic:
+        description += (
+            " The operations found are added to your tools, replacing those found by the "
+            "previous search."
+        )
+    return types.Tool(
+        name=SEARCH_TOOL_NAME,
+        description=description,
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "query": {"type": "string", "description": "Keywords describing the operation."},
+                "limit": {
+                    "type": "integer",
+                    "description": "The maximum number of operations to return.",
+                    "minimum": 1,
+                    "maximum": max_results,
+                    "default": max_results,
+                },
+            },
+            "required": ["query"],
+        },
+    )
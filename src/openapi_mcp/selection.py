@@ -0,0 +1,295 @@
+import fnmatch
+import json
+import re
+from collections.abc import Iterable, Mapping
+from pathlib import Path
+from typing import Any
+
+from .spec import load_spec
+from .swagger import SwaggerDocument, find_refs, find_value, ref_to_path
+
+# Choosing which operations of a spec are exposed as tools. Rules are evaluated on the unexpanded
+# document, so operations that are not selected (and the definitions only they use) are dropped
+# before anything is expanded.
+
+HTTP_METHODS = frozenset(["get", "put", "post", "delete", "options", "head", "patch", "trace"])
+
+# The criteria of a rule, and the prefix of each in `INCLUDE_OPERATIONS`-style terms
+RULE_CRITERIA = ("operations", "tags", "paths", "methods")
+_TERM_PREFIXES = {"operation": "operations", "tag": "tags", "path": "paths", "method": "methods"}
+
+# Sections of `$ref` targets that are pruned down to the entries the selected operations use
+_SWAGGER_SECTIONS = ("definitions", "parameters", "responses")
+_COMPONENT_SECTIONS = (
+    "schemas",
+    "responses",
+    "parameters",
+    "examples",
+    "requestBodies",
+    "headers",
+    "links",
+    "callbacks",
+)
+
+
+def _compile_globs(patterns: list[str]) -> re.Pattern[str] | None:
+    if not patterns:
+        return None
+    return re.compile("|".join(f"(?:{fnmatch.translate(pattern)})" for pattern in patterns))
+
+
+class SelectionRule:
+    """
+    A rule matching operations by operation ID, tag, route and HTTP method.
+
+    The criteria are `operations` (operation ID patterns, e.g. `get*`), `tags` (tag patterns,
+    matching operations with any matching tag), `paths` (route patterns, e.g. `/v1/content*`) and
+    `methods` (HTTP methods, e.g. `get`). Patterns are case-sensitive globs (`*` also matches `/`);
+    methods are case-insensitive.
+
+    An operation matches the rule when it matches every criterion the rule sets, and it matches a
+    criterion when it matches any of its values.
+    """
+
+    __slots__ = ("criteria", "_operations", "_tags", "_paths", "_methods")
+
+    def __init__(
+        self,
+        *,
+        operations: Iterable[str] = (),
+        tags: Iterable[str] = (),
+        paths: Iterable[str] = (),
+        methods: Iterable[str] = (),
+    ):
+        self.criteria: dict[str, list[str]] = {
+            name: values
+            for name, values in zip(
+                RULE_CRITERIA,
+                [list(operations), list(tags), list(paths), [m.lower() for m in methods]],
+                strict=True,
+            )
+            if values
+        }
+        """The values of the criteria the rule sets."""
+        if not self.criteria:
+            raise ValueError("A selection rule needs at least one criterion.")
+        unknown = set(self.criteria.get("methods", [])) - HTTP_METHODS
+        if unknown:
+            raise ValueError(
+                f"Unknown HTTP methods in selection rule: {', '.join(sorted(unknown))}"
+            )
+        self._operations = _compile_globs(self.criteria.get("operations", []))
+        self._tags = _compile_globs(self.criteria.get("tags", []))
+        self._paths = _compile_globs(self.criteria.get("paths", []))
+        self._methods = frozenset(self.criteria.get("methods", []))
+
+    def matches(self, name: str, route: str, method: str, tags: Iterable[str]) -> bool:
+        """Whether an operation matches the rule."""
+        if self._operations is not None and not self._operations.match(name):
+            return False
+        if self._paths is not None and not self._paths.match(route):
+            return False
+        if self._methods and method.lower() not in self._methods:
+            return False
+        if self._tags is not None and not any(self._tags.match(tag) for tag in tags):
+            return False
+        return True
+
+    def __repr__(self) -> str:
+        return f"SelectionRule({', '.join(f'{k}={v!r}' for k, v in self.criteria.items())})"
+
+
+class OperationSelector:
+    """
+    Selects the operations of a spec to expose as tools.
+
+    An operation is selected when it matches any `include` rule (or there are none) and no
+    `exclude` rule.
+
+    Arguments
+    ---------
+    include
+        Rules of the operations to select. Every operation is selected when empty.
+    exclude
+        Rules of the operations not to select, even if they match an `include` rule.
+    """
+
+    __slots__ = ("include", "exclude")
+
+    def __init__(
+        self, include: Iterable[SelectionRule] = (), exclude: Iterable[SelectionRule] = ()
+    ):
+        self.include = list(include)
+        self.exclude = list(exclude)
+
+    @classmethod
+    def from_config(cls, config: Mapping[str, Any]) -> "OperationSelector":
+        """
+        Create a selector from a configuration.
+
+        For example:
+
+        ```yaml
+        include:
+          - tags: [Users]
+          - paths: ["/v1/content*"]
+            methods: [get]
+        exclude:
+          - operations: ["*Delete*"]
+        ```
+
+        A criterion can be a single value instead of a list.
+        """
+        if not isinstance(config, Mapping):
+            raise ValueError("The operation selection must be a mapping with `include`/`exclude`.")
+        unknown = set(config) - {"include", "exclude"}
+        if unknown:
+            raise ValueError(f"Unknown operation selection keys: {', '.join(sorted(unknown))}")
+
+        def parse_rules(key: str) -> list[SelectionRule]:
+            rules = []
+            for rule in config.get(key) or []:
+                if not isinstance(rule, Mapping) or set(rule) - set(RULE_CRITERIA):
+                    raise ValueError(
+                        f"Invalid `{key}` rule {rule!r}: expected a mapping with "
+                        f"{', '.join(f'`{name}`' for name in RULE_CRITERIA)}."
+                    )
+                rules.append(
+                    SelectionRule(
+                        **{
+                            name: [values] if isinstance(values, str) else values
+                            for name, values in rule.items()
+                        }
+                    )
+                )
+            return rules
+
+        return cls(parse_rules("include"), parse_rules("exclude"))
+
+    @classmethod
+    def from_file(cls, path: str | Path) -> "OperationSelector":
+        """Create a selector from a YAML or JSON file (see `from_config()`)."""
+        return cls.from_config(load_spec(path) or {})
+
+    @classmethod
+    def from_terms(cls, include: str = "", exclude: str = "") -> "OperationSelector":
+        """
+        Create a selector from comma separated rules.
+
+        For example `getCurrentUser,tag:Users,path:/v1/content*+method:get`. A term without a
+        prefix is an operation ID pattern; `tag:`, `path:`, `method:` and `operation:` set the
+        other criteria. Terms joined with `+` form a single rule that must match as a whole.
+        """
+
+        def parse_rules(terms: str) -> list[SelectionRule]:
+            rules = []
+            for term in terms.split(","):
+                if not term.strip():
+                    continue
+                criteria: dict[str, list[str]] = {}
+                for part in term.split("+"):
+                    prefix, colon, value = part.strip().partition(":")
+                    if colon and prefix.lower() in _TERM_PREFIXES:
+                        name = _TERM_PREFIXES[prefix.lower()]
+                    else:
+                        name, value = "operations", part.strip()
+                    criteria.setdefault(name, []).append(value)
+                rules.append(SelectionRule(**criteria))
+            return rules
+
+        return cls(parse_rules(include), parse_rules(exclude))
+
+    @property
+    def fingerprint(self) -> str:
+        """A canonical form of the rules, e.g. to tell whether a cache was built with them."""
+        return json.dumps(
+            {
+                "include": [rule.criteria for rule in self.include],
+                "exclude": [rule.criteria for rule in self.exclude],
+            },
+            sort_keys=True,
+        )
+
+    def matches(self, name: str, route: str, method: str, tags: Iterable[str]) -> bool:
+        """Whether an operation is selected."""
+        tags = list(tags)
+        if self.include and not any(
+            rule.matches(name, route, method, tags) for rule in self.include
+        ):
+            return False
+        return not any(rule.matches(name, route, method, tags) for rule in self.exclude)
+
+    def select(self, document: SwaggerDocument) -> SwaggerDocument:
+        """
+        Restrict a document to the selected operations.
+
+        Operations that are not selected and the path items left without operations are dropped,
+        and so are the definitions (and other `$ref` targets) that only they used. The document is
+        not modified; the objects that are kept are shared with it.
+
+        Arguments
+        ---------
+        document
+            The (unexpanded) swagger document.
+
+        Returns
+        -------
+        :
+            A document with only the selected operations.
+        """
+        paths = {}
+        for route, path_item in document.get("paths", {}).items():
+            selected = {}
+            has_operations = False
+            for key, value in path_item.items():
+                if key.lower() in HTTP_METHODS and isinstance(value, dict):
+                    if "operationId" not in value or not self.matches(
+                        value["operationId"], route, key, value.get("tags") or []
+                    ):
+                        continue
+                    has_operations = True
+                selected[key] = value
+            if has_operations:
+                paths[route] = selected
+
+        selected_document: dict[str, Any] = {**document, "paths": paths}
+        used = _used_targets(document, paths)
+        for section in _SWAGGER_SECTIONS:
+            if isinstance(document.get(section), dict):
+                selected_document[section] = {
+                    name: value
+                    for name, value in document[section].items()
+                    if (section, name) in used
+                }
+        components = document.get("components")
+        if isinstance(components, dict):
+            selected_document["components"] = {
+                section: (
+                    {
+                        name: value
+                        for name, value in entries.items()
+                        if ("components", section, name) in used
+                    }
+                    if section in _COMPONENT_SECTIONS and isinstance(entries, dict)
+                    else entries
+                )
+                for section, entries in components.items()
+            }
+        return selected_document  # pyright: ignore[reportReturnType]
+
+
+def _used_targets(document: SwaggerDocument, obj) -> set[tuple[str, ...]]:
+    # The `(section, name)` (or `("components", section, name)`) of every object `obj` references,
+    # directly or through other references
+    used: set[tuple[str, ...]] = set()
+    seen: set[str] = set()
+    pending = list(find_refs(obj))
+    while pending:
+        ref = pending.pop()
+        if ref in seen or not ref.startswith("#/"):
+            continue
+        seen.add(ref)
+        path = ref_to_path(ref)
+        used.add(tuple(path[:3] if path[0] == "components" else path[:2]))
+        pending.extend(find_refs(find_value(document, path)))
+    return used
@@ -0,0 +1,329 @@
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+from .plan import get_request_plan
+from .swagger import OperationDef
+
+# Properties of an object response that hold the records of a paginated collection
+COLLECTION_KEYS = ("results", "items", "data")
+
+# Field name -> nested fields to keep, or `None` to keep the whole value
+FieldTree = dict[str, "FieldTree | None"]
+
+
+def operation_response_schema(definition: dict[str, Any]) -> dict[str, Any] | None:
+    """
+    Get the schema of the first successful (2xx) JSON response of an operation.
+
+    Supports both Swagger 2.0 (`responses.<status>.schema`) and OpenAPI 3
+    (`responses.<status>.content.<media type>.schema`).
+    """
+    responses = definition.get("responses") or {}
+    # YAML may parse status codes as integers
+    for status, response in sorted(responses.items(), key=lambda item: str(item[0])):
+        if not str(status).startswith("2") or not isinstance(response, dict):
+            continue
+        if isinstance(response.get("schema"), dict):
+            return response["schema"]
+        for media_type, content in (response.get("content") or {}).items():
+            if "json" in media_type and isinstance(content.get("schema"), dict):
+                return content["schema"]
+        return None
+    return None
+
+
+def shaping_properties(schema: dict[str, Any] | None) -> dict[str, dict[str, Any]]:
+    """
+    The input schema properties of the shaping arguments supported by a response schema.
+
+    An operation parameter with the same name as a shaping argument takes precedence over it.
+
+    `fields` is offered for responses made of objects with known properties; `limit` and `offset`
+    for array responses and objects wrapping a collection (e.g. `{"results": [...]}`).
+    """
+    collection, record_schema = _collection(schema)
+    properties: dict[str, dict[str, Any]] = {}
+    of_each = " of each item" if collection is not None else ""
+    if _properties(record_schema):
+        properties["fields"] = {
+            "type": "string",
+            "description": (
+                f"Comma separated list of the response fields{of_each} to return, e.g. "
+                "`guid,name,owner.username`. Returns all fields when omitted."
+            ),
+        }
+    if collection is not None:
+        array_note = (
+            " When `limit` or `offset` is set, the response is returned as "
+            "`{total, offset, items}`."
+            if collection == ""
+            else ""
+        )
+        properties["limit"] = {
+            "type": "integer",
+            "minimum": 0,
+            "description": "The maximum number of response items to return." + array_note,
+        }
+        properties["offset"] = {
+            "type": "integer",
+            "minimum": 0,
+            "description": "The number of response items to skip. Defaults to 0.",
+        }
+    return properties
+
+
+def filter_by_schema(value: Any, schema: dict[str, Any] | None) -> Any:
+    """
+    Drop the object properties that are not declared in a schema.
+
+    Objects without declared properties (or using `anyOf`/`oneOf`) are kept as is. Undeclared
+    properties are kept when the schema explicitly allows `additionalProperties`.
+    """
+    if isinstance(value, dict):
+        properties = _properties(schema)
+        if properties is None:
+            return value
+        additional = schema.get("additionalProperties", False)  # type: ignore[union-attr]
+        result = {}
+        for key, item in value.items():
+            if key in properties:
+                result[key] = filter_by_schema(item, properties[key])
+            elif additional is True:
+                result[key] = item
+            elif isinstance(additional, dict):
+                result[key] = filter_by_schema(item, additional)
+        return result
+    if isinstance(value, list) and isinstance(schema, dict):
+        items = schema.get("items")
+        if isinstance(items, dict):
+            return [filter_by_schema(item, items) for item in value]
+    return value
+
+
+def parse_fields(fields: str | list[str]) -> FieldTree:
+    """Parse `guid,name,owner.username` into `{"guid": None, "name": None, "owner": {...}}`."""
+    if isinstance(fields, str):
+        fields = fields.split(",")
+    tree: FieldTree = {}
+    for field in fields:
+        parts = [part.strip() for part in str(field).split(".")]
+        if not all(parts):
+            continue
+        node = tree
+        for part in parts[:-1]:
+            child = node.get(part, {})
+            if child is None:
+                # The whole value is already selected
+                break
+            node[part] = child
+            node = child
+        else:
+            node[parts[-1]] = None
+    return tree
+
+
+def project(value: Any, fields: FieldTree | None) -> Any:
+    """Keep only the selected fields of an object (or of each object of a list)."""
+    if fields is None:
+        return value
+    if isinstance(value, dict):
+        return {key: project(value[key], sub) for key, sub in fields.items() if key in value}
+    if isinstance(value, list):
+        return [project(item, fields) for item in value]
+    return value
+
+
+class ResponseShape:
+    """
+    How to shape the JSON response of a single tool call.
+
+    The response is parsed once, filtered down to the properties declared in the operation's
+    response schema, sliced with `limit`/`offset` and projected onto the requested `fields`, then
+    written back as compact JSON. Responses that are not valid JSON (including truncated ones)
+    are returned verbatim.
+
+    Arguments
+    ---------
+    schema
+        The response schema of the operation.
+    fields
+        The fields to keep. `None` keeps every field.
+    limit
+        The maximum number of collection items to keep.
+    offset
+        The number of collection items to skip.
+    schema_filter
+        Whether to drop the properties not declared in `schema`. Off by default, as specs often
+        under-declare the fields their responses contain.
+    """
+
+    __slots__ = ("schema", "collection", "fields", "limit", "offset", "schema_filter")
+
+    def __init__(
+        self,
+        schema: dict[str, Any] | None,
+        *,
+        fields: FieldTree | None = None,
+        limit: int | None = None,
+        offset: int | None = None,
+        schema_filter: bool = False,
+    ):
+        self.schema = schema
+        self.collection, _ = _collection(schema)
+        self.fields = fields
+        self.limit = limit
+        self.offset = offset
+        self.schema_filter = schema_filter
+
+    @classmethod
+    def from_arguments(
+        cls, operation: OperationDef, arguments: dict | None, *, schema_filter: bool = False
+    ) -> "ResponseShape":
+        """
+        Read the shaping arguments of a tool call.
+
+        Arguments that are parameters of the operation are left to the request.
+
+        Raises
+        ------
+        ValueError
+            If a shaping argument is invalid or a requested field is not part of the response.
+        """
+        schema = operation_response_schema(operation["definition"])
+        arguments = arguments or {}
+        slots = get_request_plan(operation).slots
+
+        def argument(name: str) -> Any:
+            return None if name in slots else arguments.get(name)
+
+        fields = argument("fields")
+        field_tree = parse_fields(fields) if fields else None
+        if field_tree and schema_filter:
+            _, record_schema = _collection(schema)
+            known = _properties(record_schema)
+            unknown = [name for name in field_tree if known is not None and name not in known]
+            if unknown:
+                raise ValueError(
+                    f"Unknown response field(s) for {operation['name']}: {', '.join(unknown)}. "
+                    f"Available fields: {', '.join(known or ())}."
+                )
+
+        return cls(
+            schema,
+            fields=field_tree,
+            limit=_non_negative_int("limit", argument("limit")),
+            offset=_non_negative_int("offset", argument("offset")),
+            schema_filter=schema_filter,
+        )
+
+    def apply(self, text: str, status_code: int = 200) -> str:
+        """
+        Shape a response body.
+
+        Only successful (2xx) responses are shaped; the schema and fields are those of the
+        successful response, so error bodies (e.g. `{"code": 3, "error": "..."}`) are returned
+        as is.
+
+        Returns
+        -------
+        :
+            The shaped response as compact JSON, or `text` if it is not JSON or not successful.
+        """
+        if not 200 <= status_code < 300:
+            return text
+        if not text:
+            return text
+        try:
+            data = _loads(text)
+        except ValueError:
+            return text
+
+        if self.schema_filter and self.schema is not None:
+            data = filter_by_schema(data, self.schema)
+
+        paginate = self.limit is not None or self.offset is not None
+        if isinstance(data, list):
+            items = project(self._page(data), self.fields)
+            if paginate:
+                data = {"total": len(data), "offset": self.offset or 0, "items": items}
+            else:
+                data = items
+        elif (
+            self.collection
+            and isinstance(data, dict)
+            and isinstance(data.get(self.collection), list)
+        ):
+            data = {
+                **data,
+                self.collection: project(self._page(data[self.collection]), self.fields),
+            }
+        else:
+            data = project(data, self.fields)
+        return _dumps(data)
+
+    def _page(self, items: list[Any]) -> list[Any]:
+        start = self.offset or 0
+        if self.limit is None:
+            return items[start:] if start else items
+        return items[start : start + self.limit]
+
+
+def _properties(schema: Any) -> dict[str, Any] | None:
+    # The declared properties of an object schema (including `allOf` parts); `None` if unknown
+    if not isinstance(schema, dict) or "anyOf" in schema or "oneOf" in schema:
+        return None
+    properties = schema.get("properties")
+    found = isinstance(properties, dict)
+    merged = dict(properties) if found else {}
+    for part in schema.get("allOf") or ():
+        if isinstance(part, dict) and ("anyOf" in part or "oneOf" in part):
+            return None
+        part_properties = _properties(part)
+        if part_properties is not None:
+            found = True
+            merged.update(part_properties)
+    return merged if found else None
+
+
+def _collection(schema: Any) -> tuple[str | None, Any]:
+    # Where the records of a response are: `("", items)` for an array response, `(key, items)` for
+    # an object wrapping a collection and `(None, schema)` for a single record
+    if not isinstance(schema, dict):
+        return None, None
+    if schema.get("type") == "array" or "items" in schema:
+        return "", schema.get("items")
+    properties = _properties(schema) or {}
+    for key in COLLECTION_KEYS:
+        prop = properties.get(key)
+        if isinstance(prop, dict) and prop.get("type") == "array":
+            return key, prop.get("items")
+    return None, schema
+
+
+def _non_negative_int(name: str, value: Any) -> int | None:
+    if value is None or value == "":
+        return None
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"`{name}` must be a non-negative integer; got {value!r}.") from None
+    if number < 0:
+        raise ValueError(f"`{name}` must be a non-negative integer; got {value!r}.")
+    return number
+
+
+def _loads(text: str) -> Any:
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+def _dumps(data: Any) -> str:
+    if orjson is not None:
+        return orjson.dumps(data).decode("utf-8")
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
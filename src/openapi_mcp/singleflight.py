@@ -0,0 +1,83 @@
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent identical calls into a single call.
+
+    While a call for a key is in flight, further calls for the same key wait for it and share its
+    result (or exception) instead of starting their own. The shared call runs in its own task, so
+    a caller being cancelled does not cancel it for the other callers; it is only cancelled once
+    every caller waiting for it has been cancelled.
+
+    Only use this for idempotent work whose result can be shared (e.g. the text of a GET request).
+    """
+
+    def __init__(self):
+        self._tasks: dict[Hashable, asyncio.Task[Any]] = {}
+        # Number of callers waiting for each task
+        self._waiters: dict[asyncio.Task[Any], int] = {}
+        self.calls = 0
+        """Calls that were made (one per distinct in-flight key)."""
+        self.coalesced = 0
+        """Calls that were answered by sharing an in-flight call."""
+
+    @property
+    def in_flight(self) -> int:
+        """The number of calls currently in flight."""
+        return len(self._tasks)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run `fn()` unless a call with the same key is already in flight.
+
+        Arguments
+        ---------
+        key
+            Identifies calls that can share a result.
+        fn
+            Makes the call.
+
+        Returns
+        -------
+        :
+            The result of the (possibly shared) call.
+        """
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._tasks[key] = task
+            task.add_done_callback(lambda done: self._done(key, done))
+            self.calls += 1
+        else:
+            self.coalesced += 1
+
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        finally:
+            waiters = self._waiters[task] - 1
+            if waiters:
+                self._waiters[task] = waiters
+            else:
+                del self._waiters[task]
+                # Nobody needs the result any more; stop the upstream work (later callers start
+                # a new call instead of joining the cancelled one)
+                if not task.done():
+                    if self._tasks.get(key) is task:
+                        del self._tasks[key]
+                    task.cancel()
+
+    def _done(self, key: Hashable, task: asyncio.Task[Any]) -> None:
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        # Mark the exception as retrieved in case every caller was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> dict[str, int]:
+        return {"calls": self.calls, "coalesced": self.coalesced, "in_flight": self.in_flight}
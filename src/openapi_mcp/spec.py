@@ -0,0 +1,122 @@
+import hashlib
+import json
+from pathlib import Path
+from typing import IO, Any, Literal
+
+import yaml
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+# Use libyaml when PyYAML was built with it; the pure Python loader is ~10x slower
+YamlSafeLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+YamlSafeDumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+SpecFormat = Literal["json", "yaml"]
+
+
+class _NoAliasDumper(YamlSafeDumper):
+    # Expanded references are shared objects; write them out in full instead of as YAML aliases
+    def ignore_aliases(self, data):  # noqa: ARG002
+        return True
+
+
+def detect_spec_format(data: str | bytes) -> SpecFormat:
+    """
+    Detect whether a spec is JSON or YAML from its content.
+
+    A document starting with `{` (after any byte order mark and whitespace) is JSON. Everything
+    else is treated as YAML (which is a superset of JSON).
+    """
+    head = data[:1024]
+    if isinstance(head, bytes):
+        head = head.decode("utf-8", errors="ignore")
+    head = head.lstrip("\ufeff \t\r\n")
+    return "json" if head.startswith("{") else "yaml"
+
+
+def loads_spec(data: str | bytes) -> Any:
+    """
+    Parse an OpenAPI / Swagger document from JSON or YAML content.
+
+    JSON is parsed with `orjson` when it is installed; YAML with libyaml when it is available.
+
+    Arguments
+    ---------
+    data
+        The content of the spec.
+
+    Returns
+    -------
+    :
+        The parsed document.
+    """
+    if detect_spec_format(data) == "json":
+        if isinstance(data, bytes) and data.startswith(b"\xef\xbb\xbf"):
+            data = data[3:]
+        elif isinstance(data, str):
+            data = data.lstrip("\ufeff")
+        if orjson is not None:
+            return orjson.loads(data)
+        return json.loads(data)
+    return yaml.load(data, Loader=YamlSafeLoader)
+
+
+def load_spec(path: str | Path) -> Any:
+    """
+    Read and parse an OpenAPI / Swagger file.
+
+    The format is detected from the content, not the file extension.
+
+    Arguments
+    ---------
+    path
+        The path to a JSON or YAML spec file.
+
+    Returns
+    -------
+    :
+        The parsed document.
+    """
+    with open(Path(path).expanduser(), "rb") as file:
+        return loads_spec(file.read())
+
+
+def load_hashed_spec(path: str | Path) -> tuple[Any, str]:
+    """
+    Read and parse an OpenAPI / Swagger file, and hash the contents that were parsed.
+
+    The file is read once, so the hash always matches the document even if the file is being
+    rewritten (unlike hashing and parsing it in two reads).
+
+    Returns
+    -------
+    :
+        The parsed document and the SHA-256 of the file contents (see `hash_spec_file`).
+    """
+    with open(Path(path).expanduser(), "rb") as file:
+        data = file.read()
+    return loads_spec(data), hashlib.sha256(data).hexdigest()
+
+
+def dump_spec(document: Any, file: IO[str], *, format: SpecFormat = "yaml") -> None:  # noqa: A002
+    """
+    Write an OpenAPI / Swagger document.
+
+    Shared objects (e.g. expanded references) are written out in full.
+
+    Arguments
+    ---------
+    document
+        The document to write.
+    file
+        The text file to write to.
+    format
+        Whether to write YAML or JSON.
+    """
+    if format == "json":
+        json.dump(document, file, indent=2, ensure_ascii=False)
+    else:
+        yaml.dump(document, file, Dumper=_NoAliasDumper, default_flow_style=False, sort_keys=False)
@@ -0,0 +1,186 @@
+import hashlib
+import os
+import pickle
+import tempfile
+import warnings
+from collections.abc import Mapping
+from pathlib import Path
+
+import mcp.types as types
+from typing_extensions import TypedDict
+
+from . import __version__
+from .index import OperationIndex
+from .swagger import OperationDef, SwaggerDocument
+
+# Bump when the layout of `SpecCache` changes
+SPEC_CACHE_FORMAT = 3
+SPEC_CACHE_SUFFIX = ".mcpcache"
+
+
+class SpecCache(TypedDict):
+    version: str
+    """Package version and cache format the cache was written with."""
+    spec_hash: str
+    """SHA-256 of the spec file contents the cache was built from."""
+    selection: str
+    """Fingerprint of the operation selection the cache was built with (empty for none)."""
+    document: SwaggerDocument
+    """The swagger document. Fully expanded when written by `expand_and_save_yaml`."""
+    operations: dict[str, OperationDef]
+    """Materialized (expanded and cleaned) operations."""
+    tools: list[types.Tool]
+    """The tools for `operations`."""
+
+
+def _cache_version() -> str:
+    return f"{__version__}+{SPEC_CACHE_FORMAT}"
+
+
+def spec_cache_path(spec_path: str | Path) -> Path:
+    """The cache file for a spec file (e.g. `swagger.yaml.mcpcache`, next to the spec)."""
+    spec_path = Path(spec_path).expanduser()
+    return spec_path.with_name(spec_path.name + SPEC_CACHE_SUFFIX)
+
+
+def hash_spec_file(spec_path: str | Path) -> str:
+    """SHA-256 of the spec file's contents."""
+    with open(Path(spec_path).expanduser(), "rb") as file:
+        return hashlib.file_digest(file, "sha256").hexdigest()
+
+
+def read_spec_cache(spec_path: str | Path, *, selection: str = "") -> SpecCache | None:
+    """
+    Read the cache for a spec file.
+
+    Arguments
+    ---------
+    spec_path
+        The path to the swagger file.
+    selection
+        The fingerprint of the operation selection in use (`OperationSelector.fingerprint`).
+
+    Returns
+    -------
+    :
+        The cache, or `None` if there is no cache or it was built from a different version of the
+        spec file or of this package, or with a different selection.
+    """
+    cache_path = spec_cache_path(spec_path)
+    if not cache_path.exists():
+        return None
+
+    try:
+        with open(cache_path, "rb") as file:
+            cache: SpecCache = pickle.load(file)
+    except Exception as e:
+        warnings.warn(f"Ignoring unreadable spec cache `{cache_path}`: {e}", stacklevel=2)
+        return None
+
+    if not isinstance(cache, dict) or cache.get("version") != _cache_version():
+        return None
+    if cache.get("selection") != selection:
+        return None
+    if cache.get("spec_hash") != hash_spec_file(spec_path):
+        return None
+    return cache
+
+
+def write_spec_cache(
+    spec_path: str | Path,
+    document: SwaggerDocument,
+    operations: Mapping[str, OperationDef],
+    tools: list[types.Tool],
+    *,
+    spec_hash: str,
+    selection: str = "",
+) -> Path | None:
+    """
+    Write the cache for a spec file.
+
+    The cache is written atomically next to the spec file. Failing to write it only warns.
+
+    Arguments
+    ---------
+    spec_path
+        The path to the swagger file the cache is for.
+    document
+        The swagger document to store.
+    operations
+        The materialized operations to store.
+    tools
+        The tools for `operations`.
+    spec_hash
+        The SHA-256 of the spec file contents `document` was parsed from (see
+        `load_hashed_spec`). Hashing the file again here could pair the document with a newer
+        version of the file.
+    selection
+        The fingerprint of the operation selection `document` was restricted with.
+
+    Returns
+    -------
+    :
+        The path of the cache file, or `None` if it could not be written.
+    """
+    cache: SpecCache = {
+        "version": _cache_version(),
+        "spec_hash": spec_hash,
+        "selection": selection,
+        "document": document,
+        "operations": dict(operations),
+        "tools": tools,
+    }
+    cache_path = spec_cache_path(spec_path)
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=cache_path.parent, prefix=cache_path.name)
+        try:
+            with os.fdopen(fd, "wb") as file:
+                pickle.dump(cache, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, cache_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    except OSError as e:
+        warnings.warn(f"Could not write spec cache `{cache_path}`: {e}", stacklevel=2)
+        return None
+    return cache_path
+
+
+def save_spec_cache(
+    spec_path: str | Path,
+    operations: OperationIndex,
+    *,
+    spec_hash: str,
+    selection: str = "",
+) -> Path | None:
+    """
+    Write the cache for a spec file from an index, with only the operations it has materialized.
+
+    Nothing is expanded to write the cache: the next index created from it starts with the
+    operations (and tools) used so far, and materializes the others lazily as usual.
+
+    Arguments
+    ---------
+    spec_path
+        The path to the swagger file the cache is for.
+    operations
+        The index of the spec.
+    spec_hash
+        The SHA-256 of the spec file contents the index's document was parsed from.
+    selection
+        The fingerprint of the operation selection the index was created with.
+
+    Returns
+    -------
+    :
+        The path of the cache file, or `None` if it could not be written.
+    """
+    materialized, tools = operations.materialized()
+    return write_spec_cache(
+        spec_path,
+        operations.document,
+        materialized,
+        tools,
+        spec_hash=spec_hash,
+        selection=selection,
+    )
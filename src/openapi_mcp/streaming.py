@@ -0,0 +1,136 @@
+import logging
+from collections.abc import Awaitable, Callable
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Called with the number of bytes downloaded so far and the total (if known)
+ProgressCallback = Callable[[int, int | None], Awaitable[None]]
+
+# Minimum number of bytes between two progress callbacks
+PROGRESS_INTERVAL = 64 * 1024
+
+
+def truncation_notice(max_bytes: int) -> str:
+    return (
+        f"\n\n[Response truncated: showing the first {max_bytes:,} bytes. "
+        "Narrow the request (e.g. with filters) to see the rest.]"
+    )
+
+
+class ProgressFanOut:
+    """
+    Report the progress of one download to every caller sharing it.
+
+    Callers join (and leave) while the download runs; they are reported the progress made after
+    they joined. A callback that fails (e.g. because its session closed) is dropped instead of
+    failing the download shared with the other callers.
+    """
+
+    __slots__ = ("callbacks", "callers")
+
+    def __init__(self):
+        self.callbacks: list[ProgressCallback] = []
+        self.callers = 0
+        """The number of callers sharing the download, with or without a callback."""
+
+    async def __call__(self, downloaded: int, total: int | None) -> None:
+        for callback in list(self.callbacks):
+            try:
+                await callback(downloaded, total)
+            except Exception:
+                logger.debug("Dropping a failed progress callback", exc_info=True)
+                if callback in self.callbacks:
+                    self.callbacks.remove(callback)
+
+
+def _truncate_utf8(data: bytes) -> bytes:
+    """Drop the UTF-8 character cut off at the end of `data`, if any."""
+    # The lead byte of the last character is at most 3 bytes before the end
+    for back in range(1, min(4, len(data)) + 1):
+        byte = data[-back]
+        if byte & 0xC0 == 0x80:
+            # Continuation byte
+            continue
+        length = 4 if byte >= 0xF0 else 3 if byte >= 0xE0 else 2 if byte >= 0xC0 else 1
+        return data[:-back] if length > back else data
+    return data
+
+
+async def send_streaming(
+    client: httpx.AsyncClient,
+    request: httpx.Request,
+    *,
+    max_bytes: int | None = None,
+    on_progress: ProgressCallback | None = None,
+) -> httpx.Response:
+    """
+    Send a request and read its body incrementally.
+
+    The body is read chunk by chunk instead of being buffered by httpx, so reading stops (and the
+    connection is released) as soon as `max_bytes` have been received. A truncated body is cut on a
+    UTF-8 character boundary, ends with a notice saying so and has the `truncated` extension set.
+
+    Arguments
+    ---------
+    client
+        The client to send the request with.
+    request
+        The request to send.
+    max_bytes
+        The maximum number of (decoded) body bytes to keep. `None` keeps the whole body.
+    on_progress
+        Called as the body arrives with the number of bytes downloaded so far and the total number
+        of bytes, if the upstream sent a `Content-Length`.
+
+    Returns
+    -------
+    :
+        A response with the (possibly truncated) body already read.
+    """
+    response = await client.send(request, stream=True)
+    try:
+        content_length = response.headers.get("content-length")
+        total = int(content_length) if content_length and content_length.isdigit() else None
+
+        chunks: list[bytes] = []
+        received = 0
+        reported = 0
+        truncated = False
+        async for chunk in response.aiter_bytes():
+            if max_bytes is not None and received + len(chunk) > max_bytes:
+                chunks.append(chunk[: max_bytes - received])
+                received = max_bytes
+                truncated = True
+                break
+            chunks.append(chunk)
+            received += len(chunk)
+            # Progress is reported in bytes on the wire to match `Content-Length`
+            downloaded = response.num_bytes_downloaded
+            if on_progress is not None and downloaded - reported >= PROGRESS_INTERVAL:
+                reported = downloaded
+                await on_progress(downloaded, total)
+        if on_progress is not None and response.num_bytes_downloaded != reported:
+            await on_progress(response.num_bytes_downloaded, total)
+    finally:
+        await response.aclose()
+
+    content = b"".join(chunks)
+    if truncated:
+        content = _truncate_utf8(content)
+        content += truncation_notice(len(content)).encode("utf-8")
+
+    # The body is already decoded and may be truncated; drop the headers describing the original
+    headers = [
+        (key, value)
+        for key, value in response.headers.multi_items()
+        if key.lower() not in ("content-encoding", "content-length", "transfer-encoding")
+    ]
+    return httpx.Response(
+        response.status_code,
+        headers=headers,
+        content=content,
+        request=request,
+        extensions={"truncated": truncated},
+    )
@@ -1,10 +1,16 @@
 import re
-from copy import deepcopy
+import sys
+from collections.abc import Callable
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-import yaml
 from typing_extensions import Any, NotRequired, TypedDict, TypeVar
 
+from .spec import dump_spec, load_hashed_spec
+
+if TYPE_CHECKING:
+    from .selection import OperationSelector
+
 T = TypeVar("T")
 
 
@@ -30,6 +36,175 @@ def find_value(root, path):
     return parent
 
 
+class RefCycle(TypedDict):
+    ref: str
+    """The `$ref` whose expansion was cut short because it refers back to itself."""
+    location: str
+    """JSON pointer (within the referenced definitions) of the `$ref` that closed the cycle."""
+    chain: list[str]
+    """The chain of `$ref`s that form the cycle, starting and ending with `ref`."""
+
+
+# Marker for "this expansion did not cut any cycle"
+_NO_CYCLE = sys.maxsize
+
+
+class RefResolver:
+    """
+    Memoized, cycle-safe, copy-on-write `$ref` expansion.
+
+    Every `$ref` target is expanded at most once and the expanded object is shared by every use
+    site. Recursive references are expanded up to `max_cycle_depth` times and then replaced by a
+    stub schema; each place where that happens is recorded in `cycles`.
+
+    Objects are only copied where something inside them changes; unchanged subtrees are returned
+    as is and shared with the document.
+
+    Parameters
+    ----------
+    document
+        The master swagger document that `$ref`s are resolved against.
+    max_cycle_depth
+        How many times a `$ref` may be nested inside its own expansion before it is cut.
+    clean
+        Also clean the whitespace of strings (see `clean_whitespace()`) while expanding, so that
+        memoized expansions are cleaned once and stay shared.
+    """
+
+    def __init__(self, document, *, max_cycle_depth: int = 1, clean: bool = False):
+        self.document = document
+        self.max_cycle_depth = max_cycle_depth
+        self.clean = clean
+        self.cycles: list[RefCycle] = []
+        self._resolved: dict[str, Any] = {}
+        # `$ref`s currently being expanded and the JSON pointer parts of the current node
+        self._stack: list[str] = []
+        self._path: list[str] = []
+
+    def expand(self, obj) -> Any:
+        """
+        Expands `$ref`s in the given object.
+
+        Parameters
+        ----------
+        obj
+            is either a normal swagger object, a ref object, or a swagger object with a schema.
+
+        Returns
+        -------
+        :
+            An object semantically equivalent to `obj` but with references expanded. It shares
+            unchanged subtrees with `obj` and expanded references with other use sites, so it
+            must not be mutated.
+        """
+        value, _lowest = self._expand(obj)
+        return value
+
+    def clean_value(self, obj: T) -> T:
+        """Clean the whitespace of an object that is not expanded, if the resolver cleans."""
+        return clean_whitespace(obj) if self.clean else obj
+
+    def _expand(self, obj) -> tuple[Any, int]:
+        # Returns the expanded object and the lowest `_stack` index of any cycle that was cut
+        # while expanding it. Results that depend on an outer (still expanding) `$ref` can not be
+        # memoized as their depth of expansion depends on where they are used.
+        lowest = _NO_CYCLE
+        if isinstance(obj, list):
+            ret_list = None
+            for i, item in enumerate(obj):
+                self._path.append(str(i))
+                value, item_lowest = self._expand(item)
+                self._path.pop()
+                if value is not item:
+                    if ret_list is None:
+                        ret_list = list(obj)
+                    ret_list[i] = value
+                lowest = min(lowest, item_lowest)
+            return (obj if ret_list is None else ret_list), lowest
+        elif isinstance(obj, dict):
+            if "$ref" in obj:
+                return self._expand_ref(obj["$ref"])
+            ret_dict = None
+            for key, item in obj.items():
+                self._path.append(key)
+                value, item_lowest = self._expand(item)
+                self._path.pop()
+                if value is not item:
+                    if ret_dict is None:
+                        ret_dict = dict(obj)
+                    ret_dict[key] = value
+                lowest = min(lowest, item_lowest)
+            return (obj if ret_dict is None else ret_dict), lowest
+        elif self.clean and isinstance(obj, str):
+            return _clean_string(obj), lowest
+        else:
+            return obj, lowest
+
+    def _expand_ref(self, ref: str) -> tuple[Any, int]:
+        if ref in self._resolved:
+            return self._resolved[ref], _NO_CYCLE
+
+        if self._stack.count(ref) >= self.max_cycle_depth:
+            first = self._stack.index(ref)
+            self.cycles.append(
+                {
+                    "ref": ref,
+                    "location": "#/" + "/".join(self._path),
+                    "chain": [*self._stack[first:], ref],
+                }
+            )
+            return self._cycle_stub(ref), first
+
+        ref_path = ref_to_path(ref)
+        ref_value = find_value(self.document, ref_path)
+        if ref_value is None:
+            raise RuntimeError(f"Reference {ref} not found in the document.")
+
+        index = len(self._stack)
+        outer_path = self._path
+        self._stack.append(ref)
+        self._path = list(ref_path)
+        try:
+            value, lowest = self._expand(ref_value)
+        finally:
+            self._stack.pop()
+            self._path = outer_path
+
+        if lowest < index:
+            # Cut short by a cycle through an outer `$ref`; only valid at this depth
+            return value, lowest
+        self._resolved[ref] = value
+        return value, _NO_CYCLE
+
+    def _cycle_stub(self, ref: str) -> dict[str, Any]:
+        target = find_value(self.document, ref_to_path(ref))
+        stub = {"description": f"Recursive reference to `{ref}` (not expanded)."}
+        if isinstance(target, dict) and "type" in target:
+            stub = {"type": target["type"], **stub}
+        return stub
+
+
+def ref_to_path(ref: str) -> list[str]:
+    """Split a local `$ref` (e.g. `#/definitions/User`) into its JSON pointer parts."""
+    return [part.replace("~1", "/").replace("~0", "~") for part in ref.strip("#/").split("/")]
+
+
+def find_refs(obj) -> set[str]:
+    """The `$ref`s in an object (without following them)."""
+    refs = set()
+    pending = [obj]
+    while pending:
+        item = pending.pop()
+        if isinstance(item, dict):
+            ref = item.get("$ref")
+            if isinstance(ref, str):
+                refs.add(ref)
+            pending.extend(item.values())
+        elif isinstance(item, list):
+            pending.extend(item)
+    return refs
+
+
 def expand_refs(
     document, obj
 ) -> Any:  # Use `Any` for return type to hack around typing requirement
@@ -37,6 +212,7 @@ def expand_refs(
     Expands `ref`s in the given object.
 
     Returns an object semantically equivalent to the original but with references expanded.
+    Use a shared `RefResolver` when expanding many objects from the same document.
 
     Parameters
     ----------
@@ -45,19 +221,7 @@ def expand_refs(
     obj
         is either a normal swagger object, a ref object, or a swagger object with a schema.
     """
-    if isinstance(obj, list):
-        return [expand_refs(document, item) for item in obj]
-    elif isinstance(obj, dict):
-        if "$ref" in obj:
-            ref_path = obj["$ref"].strip("#/").split("/")
-            ref_value = find_value(document, ref_path)
-            if ref_value is None:
-                raise RuntimeError(f"Reference {obj['$ref']} not found in the document.")
-            return expand_refs(document, ref_value)
-        else:
-            return {key: expand_refs(document, value) for key, value in obj.items()}
-    else:
-        return obj
+    return RefResolver(document).expand(obj)
 
 
 # SwaggerParameter = TypedDict("SwaggerParameter", {
@@ -99,69 +263,145 @@ class SwaggerDocument(TypedDict):
     definitions: NotRequired[dict[str, Any]]
 
 
-def expand_all_references(document: SwaggerDocument) -> SwaggerDocument:
+# List of error response keys to ignore
+ERROR_RESPONSES = [
+    "BadRequest",
+    "Unauthorized",
+    "PaymentRequired",
+    "Forbidden",
+    "NotFound",
+    "Conflict",
+    "APIError",
+    "InternalServerError",
+]
+
+
+def _replace_values(obj: dict, replace: Callable[[Any, Any], Any]) -> dict:
+    # Copy-on-write: `obj` itself if `replace` returned every value unchanged
+    ret = None
+    for key, value in obj.items():
+        new_value = replace(key, value)
+        if new_value is not value:
+            if ret is None:
+                ret = dict(obj)
+            ret[key] = new_value
+    return obj if ret is None else ret
+
+
+def expand_operation_references(
+    operation: dict[str, Any], resolver: RefResolver
+) -> dict[str, Any]:
+    """
+    Expands the references of a single path operation.
+
+    Only `parameters` and the schemas of non-error `responses` are expanded (the rest of the
+    operation is only cleaned, if the resolver cleans). The given operation is not modified.
+
+    Arguments
+    ---------
+    operation
+        The swagger operation (e.g. `document["paths"]["/v1/user"]["get"]`).
+    resolver
+        The resolver used to expand references.
+
+    Returns
+    -------
+    :
+        The operation with its references expanded: a shallow copy, or the operation itself if
+        nothing changed.
+    """
+
+    def expand_response(code, response):
+        if not isinstance(response, dict) or "schema" not in response or code in ERROR_RESPONSES:
+            return resolver.clean_value(response)
+        return _replace_values(
+            response,
+            lambda key, value: resolver.expand(value)
+            if key == "schema"
+            else resolver.clean_value(value),
+        )
+
+    def expand(key, value):
+        if key == "parameters":
+            return resolver.expand(value)
+        if key == "responses":
+            return _replace_values(value, expand_response)
+        return resolver.clean_value(value)
+
+    return _replace_values(operation, expand)
+
+
+def expand_all_references(
+    document: SwaggerDocument,
+    *,
+    resolver: RefResolver | None = None,
+) -> SwaggerDocument:
     """
     Expands all JSON references.
 
     Expands all references ($ref) in the merged swagger document by replacing them with
-    their full definitions.
+    their full definitions. Each reference is expanded once and shared by all of its use sites.
+    Recursive references are expanded to a bounded depth; see `RefResolver.cycles`.
 
-    This returns a new document with all references expanded.
+    This returns a new document with all references expanded; `document` is not modified. Only
+    the objects containing references (or, with a cleaning resolver, whitespace to clean) are
+    copied, the rest is shared with `document`.
 
     Arguments
     ---------
     document
         The dictionary representing the Swagger document to process
+    resolver
+        The resolver to use. Pass one in to inspect the reported `cycles` afterwards, or to clean
+        whitespace in the same pass (`RefResolver(document, clean=True)`).
 
     Returns
     -------
     :
         The processed Swagger document with all references expanded.
     """
-    ret_document = deepcopy(document)
-    # List of error response keys to ignore
-    error_responses = [
-        "BadRequest",
-        "Unauthorized",
-        "PaymentRequired",
-        "Forbidden",
-        "NotFound",
-        "Conflict",
-        "APIError",
-        "InternalServerError",
-    ]
-
-    # We need to expand refs in paths
-    if "paths" in ret_document:
-        for _path, operations in ret_document["paths"].items():
-            for _method, operation in operations.items():
-                if not isinstance(operation, dict):
-                    continue
-                # Expand refs in parameters
-                if "parameters" in operation:
-                    operation["parameters"] = expand_refs(ret_document, operation["parameters"])
-
-                # Expand refs in responses
-                if "responses" in operation:
-                    for code, response in operation["responses"].items():
-                        if "schema" in response and code not in error_responses:
-                            response["schema"] = expand_refs(ret_document, response["schema"])
-
-    # Expand refs in top-level parameters
-    if "parameters" in ret_document:
-        ret_document["parameters"] = expand_refs(ret_document, ret_document["parameters"])
-
-    # Expand refs in top-level responses, ignoring error responses
-    if "responses" in ret_document:
-        for response_key, response_value in ret_document["responses"].items():
-            if response_key not in error_responses:
-                ret_document["responses"][response_key] = expand_refs(ret_document, response_value)
-
-    # Expand refs in definitions
-    if "definitions" in ret_document:
-        ret_document["definitions"] = expand_refs(ret_document, ret_document["definitions"])
-
-    return ret_document
+    if resolver is None:
+        resolver = RefResolver(document)
+    else:
+        resolver.document = document
+
+    def expand_path_item(_route, path_item):
+        return _replace_values(
+            path_item,
+            lambda _method, operation: expand_operation_references(operation, resolver)
+            if isinstance(operation, dict)
+            else resolver.clean_value(operation),
+        )
+
+    def expand(key, value):
+        # We need to expand refs in paths
+        if key == "paths":
+            return _replace_values(value, expand_path_item)
+        # Expand refs in top-level parameters and definitions
+        if key in ("parameters", "definitions"):
+            return resolver.expand(value)
+        # Expand refs in top-level responses, ignoring error responses
+        if key == "responses":
+            return _replace_values(
+                value,
+                lambda response_key, response: resolver.clean_value(response)
+                if response_key in ERROR_RESPONSES
+                else resolver.expand(response),
+            )
+        return resolver.clean_value(value)
+
+    return _replace_values(document, expand)  # pyright: ignore[reportArgumentType, reportReturnType]
+
+
+# Whitespace that `clean_whitespace` changes: leading or trailing, repeated, or not a space
+_UNCLEAN_WHITESPACE_RE = re.compile(r"^\s|\s$|\s\s|[^\S ]")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def _clean_string(text: str) -> str:
+    if _UNCLEAN_WHITESPACE_RE.search(text) is None:
+        return text
+    return _WHITESPACE_RE.sub(" ", text).strip()
 
 
 def clean_whitespace(obj: T) -> T:
@@ -171,6 +411,9 @@ def clean_whitespace(obj: T) -> T:
     Recursively go through all values in the object, strip whitespace, and replace all sequences of
     new line with a single space.
 
+    Objects are only copied where a string changes, and objects shared by several parents (such as
+    expanded references) are cleaned once and stay shared.
+
     Args:
         obj: The object to process.
 
@@ -179,43 +422,84 @@ def clean_whitespace(obj: T) -> T:
     :
         The cleaned object.
     """
+    return _clean_whitespace(obj, {})
+
+
+def _clean_whitespace(obj: Any, memo: dict[int, Any]) -> Any:
     if isinstance(obj, str):
-        return re.sub(r"\s+", " ", obj).strip()  # pyright: ignore[reportReturnType]
-    elif isinstance(obj, list):
-        return [clean_whitespace(item) for item in obj]  # pyright: ignore[reportReturnType]
-    elif isinstance(obj, dict):
-        return {key: clean_whitespace(value) for key, value in obj.items()}  # pyright: ignore[reportReturnType]
-    else:
+        return _clean_string(obj)
+    if not isinstance(obj, (dict, list)):
         return obj
+    cleaned = memo.get(id(obj))
+    if cleaned is not None:
+        return cleaned
+    if isinstance(obj, list):
+        cleaned = obj
+        for i, item in enumerate(obj):
+            value = _clean_whitespace(item, memo)
+            if value is not item:
+                if cleaned is obj:
+                    cleaned = list(obj)
+                cleaned[i] = value
+    else:
+        cleaned = _replace_values(obj, lambda _key, value: _clean_whitespace(value, memo))
+    memo[id(obj)] = cleaned
+    return cleaned
 
 
 def expand_swagger(doc: SwaggerDocument) -> SwaggerDocument:
-    # Expand all references
-    expand_all_references(doc)
-
-    # Clean whitespace
-    cleaned_document = clean_whitespace(doc)
+    """
+    Expand all references and clean whitespace in a single copy-on-write pass.
 
-    return cleaned_document
+    Equivalent to `clean_whitespace(expand_all_references(doc))`, without building the expanded
+    document first.
+    """
+    return expand_all_references(doc, resolver=RefResolver(doc, clean=True))
 
 
-def expand_and_save_yaml(input_yaml_path: str | Path, output_yaml_path: str | Path) -> None:
+def expand_and_save_yaml(
+    input_yaml_path: str | Path,
+    output_yaml_path: str | Path,
+    *,
+    cache: bool = False,
+    selector: "OperationSelector | None" = None,
+) -> None:
     """
     Reads a YAML file, expands all references ($ref), cleans whitespace, and saves the expanded document to a new YAML file.
 
     Args:
         input_yaml_path: The path to the input YAML file.
         output_yaml_path: The path to the output YAML file where the expanded document will be saved.
+        cache: Whether to also write the spec cache for `input_yaml_path` (the expanded document,
+            every operation and every tool) so servers skip parsing and expanding it on startup.
+        selector: Only expand and save the operations it selects (and what they reference). Pass
+            the server's selector for it to use the cache.
     """
-    # Read the YAML file
-    with open(Path(input_yaml_path).expanduser(), "r", encoding="utf-8") as file:
-        document = yaml.safe_load(file)
+    # Read the YAML (or JSON) file
+    document, spec_hash = load_hashed_spec(input_yaml_path)
+    if selector is not None:
+        document = selector.select(document)
 
     document = expand_swagger(document)
 
     # Save the expanded and cleaned document back to a new YAML file
     with open(Path(output_yaml_path).expanduser(), "w", encoding="utf-8") as file:
-        yaml.dump(document, file, default_flow_style=False, sort_keys=False)
+        dump_spec(document, file)
+
+    if cache:
+        # Imported here as `map` and `spec_cache` depend on this module
+        from .map import map_operations_to_tools
+        from .spec_cache import write_spec_cache
+
+        operations = transform_swagger_to_operation_dict(document)
+        write_spec_cache(
+            input_yaml_path,
+            document,
+            operations,
+            map_operations_to_tools(operations),
+            spec_hash=spec_hash,
+            selection=selector.fingerprint if selector is not None else "",
+        )
 
 
 class OperationDef(TypedDict):
@@ -264,4 +548,4 @@ def transform_swagger_to_operation_dict(swagger_dict: SwaggerDocument) -> dict[s
 
 
 if __name__ == "__main__":
-    expand_and_save_yaml("swagger.yaml", "swagger-deref.yaml")
+    expand_and_save_yaml("swagger.yaml", "swagger-deref.yaml", cache=True)
@@ -0,0 +1,106 @@
+import time
+from collections.abc import Mapping
+from typing import Any
+
+import httpx
+
+from .swagger import OperationDef
+
+
+class OperationTimeout:
+    """
+    The upstream timeouts of an operation, in seconds.
+
+    Arguments
+    ---------
+    connect
+        The time allowed to connect to the upstream (or get a pooled connection).
+    read
+        The time allowed between two chunks of the response (and to send the request).
+    total
+        The time allowed for the whole call, including retries and reading the response. `None`
+        for no limit.
+    """
+
+    __slots__ = ("connect", "read", "total")
+
+    def __init__(self, *, connect: float, read: float, total: float | None):
+        self.connect = connect
+        self.read = read
+        self.total = total
+
+    def httpx_timeout(self, deadline: float | None = None) -> httpx.Timeout:
+        """The timeout of a single attempt, shortened so that it ends by `deadline`."""
+        connect, read = self.connect, self.read
+        if deadline is not None:
+            remaining = max(0.0, deadline - time.monotonic())
+            connect, read = min(connect, remaining), min(read, remaining)
+        return httpx.Timeout(read, connect=connect, pool=connect)
+
+
+class TimeoutPolicy:
+    """
+    Upstream timeouts per operation.
+
+    The defaults can be overridden by an operation's `x-timeout` spec extension, either a number
+    (the total timeout) or a mapping with `connect`, `read` and/or `total` keys. `operation_totals`
+    takes precedence over both for the total timeout.
+
+    Arguments
+    ---------
+    connect
+        The default connect timeout.
+    read
+        The default read timeout.
+    total
+        The default total timeout. `None` for no limit.
+    operation_totals
+        Total timeouts of specific operations, keyed by operation name.
+    """
+
+    def __init__(
+        self,
+        *,
+        connect: float = 5.0,
+        read: float = 30.0,
+        total: float | None = 60.0,
+        operation_totals: Mapping[str, float] | None = None,
+    ):
+        self.default = OperationTimeout(connect=connect, read=read, total=total)
+        self.operation_totals = dict(operation_totals or {})
+        self._timeouts: dict[str, OperationTimeout] = {}
+
+    def for_operation(self, operation: OperationDef) -> OperationTimeout:
+        name = operation["name"]
+        timeout = self._timeouts.get(name)
+        if timeout is None:
+            timeout = self._resolve(operation)
+            self._timeouts[name] = timeout
+        return timeout
+
+    def clear(self) -> None:
+        """Forget the timeouts resolved so far (e.g. after the operations are reloaded)."""
+        self._timeouts.clear()
+
+    def _resolve(self, operation: OperationDef) -> OperationTimeout:
+        connect, read, total = self.default.connect, self.default.read, self.default.total
+        extension: Any = operation["definition"].get("x-timeout")
+        if isinstance(extension, (int, float)) and not isinstance(extension, bool):
+            total = float(extension)
+        elif isinstance(extension, Mapping):
+            connect = float(extension.get("connect", connect))
+            read = float(extension.get("read", read))
+            total = float(extension["total"]) if "total" in extension else total
+        total = self.operation_totals.get(operation["name"], total)
+        return OperationTimeout(connect=connect, read=read, total=total or None)
+
+
+def deadline_after(seconds: float | None) -> float | None:
+    """The `time.monotonic()` deadline `seconds` from now. `None` for no deadline."""
+    return time.monotonic() + seconds if seconds else None
+
+
+def earliest(*deadlines: float | None) -> float | None:
+    """The earliest of some deadlines, ignoring the missing ones."""
+    present = [deadline for deadline in deadlines if deadline is not None]
+    return min(present) if present else None
@@ -0,0 +1,174 @@
+import hashlib
+import weakref
+from collections.abc import Callable, Iterable, Sequence
+from typing import Any
+
+import mcp.types as types
+from pydantic import PrivateAttr
+from pydantic_core import to_json
+
+# The arguments the MCP session dumps every result with before sending it
+_DUMP_ARGUMENTS = {"by_alias": True, "mode": "json", "exclude_none": True}
+
+
+class _PrecomputedResult(types.ServerResult):
+    # A `ServerResult` whose JSON-mode dump is computed once instead of for every response. The MCP
+    # session dumps results with `_DUMP_ARGUMENTS` before sending them (tested in
+    # `test_tool_list.py`); any other dump is computed as usual
+    _payload: dict[str, Any] = PrivateAttr(default_factory=dict)
+
+    def model_dump(self, **kwargs) -> dict[str, Any]:  # pyright: ignore[reportIncompatibleMethodOverride]
+        if kwargs == _DUMP_ARGUMENTS:
+            return dict(self._payload)
+        return super().model_dump(**kwargs)
+
+
+class ToolList:
+    """
+    A precomputed `tools/list` result.
+
+    The tools are dumped once. The result's `_meta` carries a `version`, a hash of the serialized
+    tools, which only changes when the tools do.
+
+    Arguments
+    ---------
+    tools
+        The tools to list.
+    """
+
+    __slots__ = ("tools", "version", "result")
+
+    def __init__(self, tools: Iterable[types.Tool]):
+        self.tools = list(tools)
+        payload = types.ListToolsResult(tools=self.tools).model_dump(**_DUMP_ARGUMENTS)
+        self.version = hashlib.sha256(to_json(payload)).hexdigest()[:16]
+        payload["_meta"] = {"version": self.version}
+
+        self.result = _PrecomputedResult(
+            types.ListToolsResult(tools=self.tools, _meta=payload["_meta"])
+        )
+        """The result to reply to `tools/list` requests with."""
+        self.result._payload = payload
+
+    def __len__(self) -> int:
+        return len(self.tools)
+
+
+class ToolListCache:
+    """
+    Holds the `ToolList` of the current set of operations.
+
+    The tool list is rebuilt only when it is requested for a different source (e.g. after the
+    operations were reloaded).
+    """
+
+    def __init__(self):
+        self._source: object = None
+        self._tool_list: ToolList | None = None
+        self.builds = 0
+        """The number of times the tool list was built."""
+
+    def get(self, source: object, build: Callable[[], Iterable[types.Tool]]) -> ToolList:
+        """
+        Get the tool list of a source, building it if the source changed.
+
+        Arguments
+        ---------
+        source
+            What the tools are built from, e.g. the `OperationIndex` of the exposed operations.
+            Compared by identity.
+        build
+            Builds the tools of `source`.
+        """
+        tool_list = self._tool_list
+        if tool_list is None or source is not self._source:
+            tool_list = ToolList(build())
+            self.put(source, tool_list)
+        return tool_list
+
+    def put(self, source: object, tool_list: ToolList) -> None:
+        """Replace the tool list with one built ahead of time (e.g. in a background thread)."""
+        self._tool_list = tool_list
+        self._source = source
+        self.builds += 1
+
+    @property
+    def version(self) -> str | None:
+        """The version of the current tool list, `None` if it has not been built yet."""
+        return self._tool_list.version if self._tool_list is not None else None
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "builds": self.builds,
+            "tools": len(self._tool_list) if self._tool_list is not None else 0,
+        }
+
+
+class SessionToolLists:
+    """
+    Holds a `ToolList` per session, for servers that expose different tools to each session.
+
+    Each session is exposed a set of operation names (none at first). Its tool list is rebuilt
+    when the names or the source change. Sessions are held weakly.
+    """
+
+    def __init__(self):
+        self._lists: weakref.WeakKeyDictionary[Any, tuple[object, tuple[str, ...], ToolList]] = (
+            weakref.WeakKeyDictionary()
+        )
+        self.builds = 0
+        """The number of times a tool list was built."""
+
+    def get(
+        self,
+        session: Any,
+        source: object,
+        build: Callable[[Sequence[str]], Iterable[types.Tool]],
+    ) -> ToolList:
+        """
+        Get the tool list of a session, building it if the source changed.
+
+        Arguments
+        ---------
+        session
+            The session.
+        source
+            What the tools are built from. Compared by identity.
+        build
+            Builds the tools for the names exposed to the session.
+        """
+        entry = self._lists.get(session)
+        names = entry[1] if entry is not None else ()
+        if entry is None or entry[0] is not source:
+            return self._build(session, source, names, build)
+        return entry[2]
+
+    def expose(
+        self,
+        session: Any,
+        source: object,
+        names: Sequence[str],
+        build: Callable[[Sequence[str]], Iterable[types.Tool]],
+    ) -> bool:
+        """
+        Change the names exposed to a session.
+
+        Returns
+        -------
+        :
+            Whether the session's tools changed.
+        """
+        entry = self._lists.get(session)
+        if entry is not None and entry[0] is source and entry[1] == tuple(names):
+            return False
+        previous = entry[2].version if entry is not None else None
+        return self._build(session, source, tuple(names), build).version != previous
+
+    def _build(self, session, source, names, build) -> ToolList:
+        tool_list = ToolList(build(names))
+        self._lists[session] = (source, names, tool_list)
+        self.builds += 1
+        return tool_list
+
+    def stats(self) -> dict[str, int]:
+        return {"builds": self.builds, "sessions": len(self._lists)}
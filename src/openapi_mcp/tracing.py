@@ -0,0 +1,236 @@
+import contextlib
+import contextvars
+import json
+import os
+import re
+import threading
+import time
+from collections.abc import Iterator, Mapping
+from pathlib import Path
+from typing import IO, Any, Literal
+
+# Tracing across the chat client, the MCP server and the upstream API. Spans follow the
+# OpenTelemetry data model and trace context is propagated with the W3C `traceparent` header (in
+# the `_meta` of MCP requests and the headers of upstream requests). Tracing is disabled, and
+# `start_span` is a no-op, until an exporter is configured.
+
+SpanKind = Literal["internal", "server", "client"]
+
+TRACEPARENT = "traceparent"
+_TRACEPARENT_RE = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+
+class Span:
+    """
+    A timed operation within a trace.
+
+    Arguments
+    ---------
+    name
+        What the span measures, e.g. `mcp.call_tool getCurrentUser`.
+    trace_id
+        The 32 hex digit id of the trace the span belongs to.
+    parent_id
+        The 16 hex digit id of the parent span, `None` for the root span of a trace.
+    kind
+        Whether the span handles a request (`server`), makes one (`client`) or neither.
+    """
+
+    __slots__ = (
+        "name",
+        "trace_id",
+        "span_id",
+        "parent_id",
+        "kind",
+        "attributes",
+        "start_ns",
+        "end_ns",
+        "status",
+        "status_message",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        trace_id: str,
+        parent_id: str | None = None,
+        kind: SpanKind = "internal",
+        attributes: Mapping[str, Any] | None = None,
+    ):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.kind = kind
+        self.attributes = dict(attributes or {})
+        self.start_ns = time.time_ns()
+        self.end_ns: int | None = None
+        self.status: Literal["unset", "ok", "error"] = "unset"
+        self.status_message = ""
+
+    @property
+    def traceparent(self) -> str:
+        """The W3C `traceparent` value identifying this span as the parent of remote spans."""
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def record_error(self, error: BaseException) -> None:
+        self.status = "error"
+        self.status_message = f"{type(error).__name__}: {error}"
+
+    def to_dict(self) -> dict[str, Any]:
+        """The span in the shape of an OTLP JSON span."""
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_id or "",
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": self.start_ns,
+            "endTimeUnixNano": self.end_ns,
+            "durationMs": ((self.end_ns or self.start_ns) - self.start_ns) / 1e6,
+            "attributes": self.attributes,
+            "status": {"code": self.status, "message": self.status_message},
+        }
+
+
+class JsonFileExporter:
+    """
+    Write finished spans to a file, one JSON object per line.
+
+    Arguments
+    ---------
+    path
+        The file to append spans to. Created if it does not exist.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path).expanduser()
+        self._file: IO[str] | None = None
+        # Spans can finish in the chat app's background thread as well as in the event loop
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(span.to_dict(), default=str) + "\n"
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write(line)
+            self._file.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class Tracer:
+    """
+    Creates spans and hands them to an exporter when they end.
+
+    Arguments
+    ---------
+    exporter
+        Receives the finished spans. `None` disables tracing.
+    """
+
+    def __init__(self, exporter: JsonFileExporter | None = None):
+        self.exporter = exporter
+        self._current: contextvars.ContextVar[Span | None] = contextvars.ContextVar(
+            "openapi_mcp_span", default=None
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    def current_span(self) -> Span | None:
+        return self._current.get()
+
+    @contextlib.contextmanager
+    def start_span(
+        self,
+        name: str,
+        *,
+        kind: SpanKind = "internal",
+        attributes: Mapping[str, Any] | None = None,
+        traceparent: str | None = None,
+    ) -> Iterator[Span | None]:
+        """
+        Time the body of a `with` block as a span.
+
+        The span is a child of the span in `traceparent` (received from a remote caller) or of
+        the current span. Exceptions raised in the block mark the span as failed.
+
+        Returns
+        -------
+        :
+            The span, or `None` when tracing is disabled.
+        """
+        if self.exporter is None:
+            yield None
+            return
+
+        remote = parse_traceparent(traceparent)
+        if remote is not None:
+            trace_id, parent_id = remote
+        elif (parent := self._current.get()) is not None:
+            trace_id, parent_id = parent.trace_id, parent.span_id
+        else:
+            trace_id, parent_id = os.urandom(16).hex(), None
+
+        span = Span(name, trace_id=trace_id, parent_id=parent_id, kind=kind, attributes=attributes)
+        token = self._current.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.record_error(e)
+            raise
+        finally:
+            self._current.reset(token)
+            span.end_ns = time.time_ns()
+            if span.status == "unset":
+                span.status = "ok"
+            self.exporter.export(span)
+
+    def inject(self, carrier: Any) -> None:
+        """Add the current trace context to outgoing headers or MCP request `_meta`."""
+        span = self._current.get()
+        if span is not None:
+            carrier[TRACEPARENT] = span.traceparent
+
+
+def parse_traceparent(value: Any) -> tuple[str, str] | None:
+    """Parse a W3C `traceparent` value into `(trace id, parent span id)`."""
+    if not isinstance(value, str):
+        return None
+    match = _TRACEPARENT_RE.match(value.strip().lower())
+    if match is None or match.group(1) == "0" * 32 or match.group(2) == "0" * 16:
+        return None
+    return match.group(1), match.group(2)
+
+
+tracer = Tracer()
+
+
+def configure_tracing(path: str | Path | None) -> Tracer:
+    """
+    Enable tracing of this process to a JSON lines file.
+
+    Arguments
+    ---------
+    path
+        The file spans are appended to. `None` or `""` leaves tracing disabled.
+
+    Returns
+    -------
+    :
+        The process-wide tracer.
+    """
+    if path:
+        tracer.exporter = JsonFileExporter(path)
+    return tracer
@@ -0,0 +1,63 @@
+import json
+
+import pytest
+
+from openapi_mcp.batch import BATCH_TOOL_NAME, run_batch
+
+pytestmark = pytest.mark.anyio
+
+
+async def call_operation(name: str, arguments: dict | None) -> str:
+    if name == "fail":
+        raise ValueError("upstream failed")
+    return json.dumps({"name": name, "arguments": arguments})
+
+
+async def run(calls) -> list[dict]:
+    return json.loads(
+        await run_batch(
+            calls, call_operation, operation_names=["getUser", "fail", BATCH_TOOL_NAME]
+        )
+    )
+
+
+async def test_results_are_in_the_order_of_the_calls():
+    results = await run(
+        [
+            {"operation": "getUser", "arguments": {"guid": "1"}},
+            {"operation": "fail"},
+            {"operation": "getUser"},
+        ]
+    )
+
+    assert results == [
+        {"operation": "getUser", "result": {"name": "getUser", "arguments": {"guid": "1"}}},
+        {"operation": "fail", "error": "ValueError: upstream failed"},
+        {"operation": "getUser", "result": {"name": "getUser", "arguments": None}},
+    ]
+
+
+@pytest.mark.parametrize(
+    "call",
+    [
+        {"operation": "deleteUser"},
+        {"operation": BATCH_TOOL_NAME},
+        {"operation": ["getUser"]},
+        {"operation": {"name": "getUser"}},
+        {"arguments": {}},
+        "getUser",
+        {"operation": "getUser", "arguments": "oops"},
+        {"operation": "getUser", "arguments": ["guid"]},
+    ],
+)
+async def test_invalid_calls_fail_on_their_own(call):
+    results = await run([call, {"operation": "getUser"}])
+
+    assert "error" in results[0]
+    assert "result" in results[1]
+
+
+@pytest.mark.parametrize("calls", [[], "getUser", [{"operation": "getUser"}] * 51])
+async def test_invalid_batches_raise(calls):
+    with pytest.raises(ValueError):
+        await run(calls)
@@ -0,0 +1,204 @@
+import copy
+
+import mcp.types as types
+import pytest
+
+from openapi_mcp.compact import (
+    ToolCompactor,
+    ToolSize,
+    dedupe_schema,
+    format_report,
+    tool_tokens,
+)
+from openapi_mcp.index import OperationIndex
+
+LONG_DESCRIPTION = "Creates a content item. " + "It can then be deployed and shared. " * 40
+
+
+def make_document() -> dict:
+    address = {
+        "type": "object",
+        "description": "A postal address. Used for billing and shipping.",
+        "properties": {
+            name: {"type": "string", "description": f"The {name} of the address."}
+            for name in ("street", "city", "postcode", "country")
+        },
+    }
+    return {
+        "swagger": "2.0",
+        "paths": {
+            "/v1/content": {
+                "post": {
+                    "operationId": "createContent",
+                    "description": LONG_DESCRIPTION,
+                    "parameters": [
+                        {
+                            "name": "body",
+                            "in": "body",
+                            "description": "The content item.",
+                            "schema": {"$ref": "#/definitions/Content"},
+                        }
+                    ],
+                    "responses": {},
+                }
+            },
+            "/v1/tasks": {
+                "get": {"operationId": "getTasks", "description": "List tasks.", "responses": {}}
+            },
+        },
+        "definitions": {
+            "Address": address,
+            "Person": {
+                "type": "object",
+                "title": "Person",
+                "description": "A person. " + "Their details are kept private. " * 5,
+                "properties": {
+                    "name": {"type": "string"},
+                    "home": {"$ref": "#/definitions/Address"},
+                    "work": {"$ref": "#/definitions/Address"},
+                },
+            },
+            "Content": {
+                "type": "object",
+                "properties": {
+                    "title": {"type": "string", "description": "The title."},
+                    "owner": {"$ref": "#/definitions/Person"},
+                    "editor": {"$ref": "#/definitions/Person"},
+                    "reviewers": {"type": "array", "items": {"$ref": "#/definitions/Person"}},
+                },
+            },
+        },
+    }
+
+
+@pytest.fixture
+def tools() -> dict[str, types.Tool]:
+    return {tool.name: tool for tool in OperationIndex(make_document()).tools()}
+
+
+def inline(schema, defs=None):
+    """Replace the `$ref`s to `$defs` with the schemas they refer to."""
+    if isinstance(schema, list):
+        return [inline(item, defs) for item in schema]
+    if not isinstance(schema, dict):
+        return schema
+    if defs is None:
+        defs = schema.get("$defs", {})
+        schema = {key: value for key, value in schema.items() if key != "$defs"}
+    ref = schema.get("$ref")
+    if isinstance(ref, str) and ref.startswith("#/$defs/"):
+        return inline(defs[ref.removeprefix("#/$defs/")], defs)
+    return {key: inline(value, defs) for key, value in schema.items()}
+
+
+def test_dedupe_replaces_repeated_schemas_with_references(tools):
+    schema = tools["createContent"].inputSchema
+    original = copy.deepcopy(schema)
+
+    deduped = dedupe_schema(schema)
+
+    assert sorted(deduped["$defs"]) == ["Person", "Schema"]
+    body = deduped["properties"]["body"]["properties"]
+    assert body["owner"] == body["editor"] == body["reviewers"]["items"]
+    assert body["owner"] == {"$ref": "#/$defs/Person"}
+    person = deduped["$defs"]["Person"]["properties"]
+    assert person["home"] == person["work"] == {"$ref": "#/$defs/Schema"}
+    # Equivalent: it describes the same arguments
+    assert inline(deduped) == original
+    assert schema == original
+    assert tool_tokens(tools["createContent"].model_copy(update={"inputSchema": deduped})) < (
+        tool_tokens(tools["createContent"])
+    )
+
+
+def test_dedupe_keeps_schemas_without_large_repeats(tools):
+    schema = tools["getTasks"].inputSchema
+    assert dedupe_schema(schema) is schema
+
+    small = {"type": "object", "properties": {"a": {"type": "string"}, "b": {"type": "string"}}}
+    assert dedupe_schema(small) is small
+
+
+def test_tools_within_the_budget_are_not_compacted(tools):
+    compactor = ToolCompactor(100_000)
+    tool = tools["createContent"]
+
+    assert compactor.compact(tool) is tool
+    assert compactor.sizes() == [ToolSize(tool.name, tool_tokens(tool), tool_tokens(tool), ())]
+
+
+def test_description_budget(tools):
+    tool = tools["createContent"]
+    deduped = tool_tokens(tool.model_copy(update={"inputSchema": dedupe_schema(tool.inputSchema)}))
+    compactor = ToolCompactor(deduped - 1, description_length=100)
+
+    compacted = compactor.compact(tool)
+
+    (size,) = compactor.sizes()
+    assert size.steps == ("dedupe", "descriptions")
+    assert size.after == tool_tokens(compacted) <= compactor.budget
+    # Cut at the last sentence end within `description_length`
+    assert compacted.description == LONG_DESCRIPTION[:95]
+    assert compacted.description.endswith("shared.")
+    person = compacted.inputSchema["$defs"]["Person"]
+    assert person["description"] == "A person."
+    assert compacted.inputSchema["$defs"]["Schema"]["description"] == "A postal address."
+    # Only descriptions changed
+    assert inline(compacted.inputSchema)["properties"]["body"]["properties"].keys() == {
+        "title",
+        "owner",
+        "editor",
+        "reviewers",
+    }
+
+
+def test_nesting_is_collapsed_when_descriptions_are_not_enough(tools):
+    compactor = ToolCompactor(1, max_depth=2)
+
+    compacted = compactor.compact(tools["createContent"])
+
+    (size,) = compactor.sizes()
+    assert size.steps == ("dedupe", "descriptions", "depth=2", "depth=1")
+    assert compacted.inputSchema["properties"]["body"] == {
+        "type": "object",
+        "description": "The content item. (Nested fields omitted.)",
+    }
+    assert compactor.stats() == {
+        "tools": 1,
+        "compacted": 1,
+        "over_budget": 1,
+        "tokens_before": size.before,
+        "tokens_after": size.after,
+    }
+
+
+def test_compacted_tools_are_cached_by_name(tools):
+    compactor = ToolCompactor(1)
+    tool = tools["createContent"]
+
+    compacted = compactor.compact(tool)
+    assert compactor.compact(tool) is compacted
+
+    changed = tool.model_copy(update={"description": "Creates a content item."})
+    assert compactor.compact(changed) is not compacted
+    assert len(compactor.sizes()) == 1
+
+
+def test_format_report():
+    report = format_report(
+        [
+            ToolSize("createContent", 12_345, 1_980, ("dedupe", "descriptions")),
+            ToolSize("getTasks", 40, 40, ()),
+        ]
+    )
+
+    assert report.splitlines() == [
+        "tool             before     after  steps",
+        "createContent    12,345     1,980  dedupe, descriptions",
+        "getTasks             40        40  ",
+        "total            12,385     2,020",
+    ]
+    assert format_report([]).splitlines() == [
+        "tool     before     after  steps",
+        "total         0         0",
+    ]
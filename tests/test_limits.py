@@ -0,0 +1,120 @@
+import asyncio
+
+import pytest
+
+from openapi_mcp.limits import ConcurrencyLimiter, ConcurrencyLimitError, UpstreamLimits
+
+pytestmark = pytest.mark.anyio
+
+BASE_URL = "http://connect.test/__api__"
+
+
+async def hold(limiter: ConcurrencyLimiter, release: asyncio.Event, running: list[int]):
+    async with limiter:
+        running.append(limiter.active)
+        await release.wait()
+
+
+async def test_limit_is_enforced_and_queued_calls_run_in_turn():
+    limiter = ConcurrencyLimiter(2, max_queue=2)
+    release = asyncio.Event()
+    running: list[int] = []
+
+    tasks = [asyncio.create_task(hold(limiter, release, running)) for _ in range(4)]
+    await asyncio.sleep(0.01)
+    assert limiter.stats() == {"active": 2, "waiting": 2, "rejected": 0, "timed_out": 0}
+
+    release.set()
+    await asyncio.gather(*tasks)
+    assert max(running) == 2
+    assert len(running) == 4
+    assert limiter.stats() == {"active": 0, "waiting": 0, "rejected": 0, "timed_out": 0}
+
+
+async def test_calls_over_the_queue_are_rejected():
+    limiter = ConcurrencyLimiter(1, max_queue=1, name="getContents")
+    release = asyncio.Event()
+    tasks = [asyncio.create_task(hold(limiter, release, [])) for _ in range(2)]
+    await asyncio.sleep(0.01)
+
+    with pytest.raises(ConcurrencyLimitError, match="getContents .1 running, 1 queued"):
+        await limiter.acquire()
+    assert limiter.rejected == 1
+
+    release.set()
+    await asyncio.gather(*tasks)
+
+
+async def test_queued_calls_time_out():
+    limiter = ConcurrencyLimiter(1, max_queue=1, queue_timeout=0.01)
+    release = asyncio.Event()
+    task = asyncio.create_task(hold(limiter, release, []))
+    await asyncio.sleep(0)
+
+    with pytest.raises(ConcurrencyLimitError, match="Timed out after 0.01s"):
+        await limiter.acquire()
+    assert limiter.stats() == {"active": 1, "waiting": 0, "rejected": 0, "timed_out": 1}
+
+    release.set()
+    await task
+    # The slot the timed out call waited for is still free
+    async with limiter:
+        assert limiter.active == 1
+
+
+async def test_cancelled_calls_release_their_slots():
+    limits = UpstreamLimits(max_concurrency=1, max_queue=1, operation_concurrency={"getUsers": 1})
+    started = asyncio.Event()
+
+    async def call():
+        async with limits.slot(BASE_URL, "getUsers"):
+            started.set()
+            await asyncio.sleep(10)
+
+    running = asyncio.create_task(call())
+    await started.wait()
+    queued = asyncio.create_task(call())
+    await asyncio.sleep(0.01)
+    assert limits.stats()["getUsers"]["waiting"] == 1
+
+    queued.cancel()
+    running.cancel()
+    await asyncio.gather(running, queued, return_exceptions=True)
+
+    assert all(
+        stats == {"active": 0, "waiting": 0, "rejected": 0, "timed_out": 0}
+        for stats in limits.stats().values()
+    )
+    async with asyncio.timeout(1):
+        async with limits.slot(BASE_URL, "getUsers"):
+            pass
+
+
+async def test_operation_and_upstream_limits_are_both_held():
+    limits = UpstreamLimits(max_concurrency=2, operation_concurrency={"getUsers": 1})
+    release = asyncio.Event()
+
+    async def call(operation_name: str):
+        async with limits.slot(BASE_URL, operation_name):
+            await release.wait()
+
+    task = asyncio.create_task(call("getUsers"))
+    await asyncio.sleep(0)
+    with pytest.raises(ConcurrencyLimitError):
+        await call("getUsers")
+    other = asyncio.create_task(call("getContents"))
+    await asyncio.sleep(0)
+    with pytest.raises(ConcurrencyLimitError, match=BASE_URL):
+        await call("getContents")
+
+    assert limits.stats()[BASE_URL]["active"] == 2
+    release.set()
+    await asyncio.gather(task, other)
+    assert limits.stats()[BASE_URL]["active"] == 0
+    assert limits.stats()["getUsers"]["rejected"] == 1
+
+
+def test_no_upstream_limit_by_default():
+    assert UpstreamLimits().stats() == {}
+    with pytest.raises(ValueError):
+        ConcurrencyLimiter(0)
@@ -0,0 +1,77 @@
+import json
+import logging
+
+import httpx
+import pytest
+
+from openapi_mcp import log
+from openapi_mcp import map as map_module
+from openapi_mcp.log import LOGGER_NAME, configure_logging
+from openapi_mcp.pool import ClientPool
+
+pytestmark = pytest.mark.anyio
+
+GET_USER = {
+    "name": "getUser",
+    "tags": [],
+    "method": "get",
+    "route": "/v1/users/{guid}",
+    "definition": {
+        "description": "Get a user.",
+        "parameters": [{"name": "guid", "in": "path", "type": "string", "required": True}],
+        "responses": {},
+    },
+}
+
+
+class MockClientPool(ClientPool):
+    def get_client(self, base_url: str, *, api_key: str = "") -> httpx.AsyncClient:
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(200, json={"guid": request.url.path.rsplit("/", 1)[-1]})
+
+        return httpx.AsyncClient(
+            base_url=base_url.rstrip("/") + "/",
+            headers={"Authorization": f"Key {api_key}"},
+            transport=httpx.MockTransport(handler),
+        )
+
+
+@pytest.fixture
+def logger():
+    logger = logging.getLogger(LOGGER_NAME)
+    handlers, level, propagate = list(logger.handlers), logger.level, logger.propagate
+    yield logger
+    log._flush_logs()
+    logger.handlers[:] = handlers
+    logger.setLevel(level)
+    logger.propagate = propagate
+
+
+def test_modules_log_under_the_configured_logger():
+    assert map_module.logger.name.startswith(LOGGER_NAME + ".")
+    assert LOGGER_NAME == map_module.__package__
+
+
+async def test_handle_operation_records_reach_the_handler(logger, capsys):
+    configure_logging("DEBUG", json_lines=True)
+    assert logger.handlers
+
+    await map_module.handle_operation(
+        {"getUser": GET_USER},
+        "getUser",
+        {"guid": "abc", "api_key": "secret"},
+        CONNECT_SERVER="http://connect.test/",
+        CONNECT_API_KEY="key",
+        client_pool=MockClientPool(),
+    )
+    # Writes the queued records
+    log._flush_logs()
+
+    records = [json.loads(line) for line in capsys.readouterr().err.splitlines()]
+    assert [(record["logger"], record["level"]) for record in records] == [
+        (map_module.__name__, "info"),
+        (map_module.__name__, "debug"),
+    ]
+    assert records[0]["event"] == "tool_call"
+    assert "secret" not in records[0]["msg"]
+    assert records[1]["msg"] == "Received result for getUser (14 chars, status 200)"
@@ -0,0 +1,165 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from openapi_mcp import map as map_module
+from openapi_mcp.map import make_request
+from openapi_mcp.pool import ClientPool
+from openapi_mcp.singleflight import SingleFlight
+from openapi_mcp.timeouts import TimeoutPolicy, deadline_after
+
+pytestmark = pytest.mark.anyio
+
+BASE_URL = "http://connect.test/__api__"
+
+GET_USERS = {
+    "name": "getUsers",
+    "tags": [],
+    "method": "get",
+    "route": "/v1/users",
+    "definition": {
+        "parameters": [
+            {"name": "X-Tenant", "in": "header", "type": "string"},
+            {"name": "page", "in": "query", "type": "integer"},
+        ],
+        "responses": {},
+    },
+}
+
+
+class MockClientPool(ClientPool):
+    def __init__(self, handler):
+        super().__init__()
+        self.handler = handler
+
+    def get_client(self, base_url: str, *, api_key: str = "") -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            base_url=base_url.rstrip("/") + "/",
+            headers={"Authorization": f"Key {api_key}"} if api_key else None,
+            transport=httpx.MockTransport(self.handler),
+        )
+
+
+@pytest.fixture
+def upstream():
+    requests: list[httpx.Request] = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        await asyncio.sleep(0.05)
+        body = json.dumps({"tenant": request.headers.get("x-tenant")}, separators=(",", ":"))
+
+        async def stream():
+            # Streamed, so the bytes downloaded are counted
+            yield body.encode()
+
+        return httpx.Response(200, headers={"Content-Length": str(len(body))}, content=stream())
+
+    return requests, MockClientPool(handler)
+
+
+async def test_identical_requests_are_coalesced(upstream):
+    requests, pool = upstream
+    single_flight = SingleFlight()
+
+    results = await asyncio.gather(
+        *(
+            make_request(
+                BASE_URL,
+                GET_USERS,
+                {"X-Tenant": "a"},
+                CONNECT_API_KEY="key",
+                client_pool=pool,
+                single_flight=single_flight,
+            )
+            for _ in range(3)
+        )
+    )
+
+    assert len(requests) == 1
+    assert [result.text for result in results] == ['{"tenant":"a"}'] * 3
+
+
+async def test_requests_differing_in_header_parameters_are_not_coalesced(upstream):
+    requests, pool = upstream
+    single_flight = SingleFlight()
+
+    a, b = await asyncio.gather(
+        *(
+            make_request(
+                BASE_URL,
+                GET_USERS,
+                {"X-Tenant": tenant},
+                CONNECT_API_KEY="key",
+                client_pool=pool,
+                single_flight=single_flight,
+            )
+            for tenant in ("a", "b")
+        )
+    )
+
+    assert len(requests) == 2
+    assert a.text == '{"tenant":"a"}'
+    assert b.text == '{"tenant":"b"}'
+
+
+async def test_coalesced_request_outlives_the_deadline_of_the_first_caller(upstream):
+    requests, pool = upstream
+    single_flight = SingleFlight()
+
+    def call(timeout: float):
+        return make_request(
+            BASE_URL,
+            GET_USERS,
+            {"X-Tenant": "a"},
+            CONNECT_API_KEY="key",
+            client_pool=pool,
+            single_flight=single_flight,
+            timeouts=TimeoutPolicy(),
+            deadline=deadline_after(timeout),
+        )
+
+    first, second = await asyncio.gather(call(0.01), call(5), return_exceptions=True)
+
+    assert isinstance(first, TimeoutError)
+    assert not isinstance(second, BaseException)
+    assert second.text == '{"tenant":"a"}'
+    assert len(requests) == 1
+
+
+async def test_coalesced_callers_all_receive_progress(upstream):
+    requests, pool = upstream
+    single_flight = SingleFlight()
+    progress: dict[str, list[tuple[int, int | None]]] = {"a": [], "b": [], "c": []}
+
+    def reporter(name: str):
+        async def on_progress(downloaded: int, total: int | None):
+            if name == "c":
+                raise ConnectionError("The session of caller c is closed.")
+            progress[name].append((downloaded, total))
+
+        return on_progress
+
+    results = await asyncio.gather(
+        *(
+            make_request(
+                BASE_URL,
+                GET_USERS,
+                {"X-Tenant": "a"},
+                CONNECT_API_KEY="key",
+                client_pool=pool,
+                single_flight=single_flight,
+                on_progress=reporter(name),
+            )
+            for name in progress
+        )
+    )
+
+    assert len(requests) == 1
+    # A failing callback does not fail the shared request
+    assert [result.text for result in results] == ['{"tenant":"a"}'] * 3
+    size = len('{"tenant":"a"}')
+    assert progress == {"a": [(size, size)], "b": [(size, size)], "c": []}
+    assert map_module._shared_progress == {}
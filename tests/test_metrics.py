@@ -0,0 +1,70 @@
+import pytest
+
+from openapi_mcp.metrics import Metric, MetricsRegistry, default_registry
+
+
+def test_metric_needs_samples():
+    with pytest.raises(TypeError, match="samples"):
+        Metric("untyped", "No samples.")  # pyright: ignore[reportAbstractUsage]
+
+
+def test_render_counters_and_gauges_with_escaping():
+    registry = MetricsRegistry()
+    calls = registry.counter("tool_calls", 'Tool calls.\nBy "tool" \\ status.', ["tool", "status"])
+    sessions = registry.gauge("sessions_active", "Open sessions.")
+    calls.inc(("getUsers", "ok"))
+    calls.inc(("getUsers", "ok"), 2)
+    calls.inc(('say "hi"\\\n', "error"))
+    sessions.inc()
+    sessions.inc()
+    sessions.dec(amount=0.5)
+
+    assert registry.render() == (
+        '# HELP tool_calls_total Tool calls.\\nBy "tool" \\\\ status.\n'
+        "# TYPE tool_calls_total counter\n"
+        'tool_calls_total{tool="getUsers",status="ok"} 3\n'
+        'tool_calls_total{tool="say \\"hi\\"\\\\\\n",status="error"} 1\n'
+        "# HELP sessions_active Open sessions.\n"
+        "# TYPE sessions_active gauge\n"
+        "sessions_active 1.5\n"
+    )
+
+
+def test_render_histogram_buckets_sum_and_count():
+    registry = MetricsRegistry()
+    duration = registry.histogram(
+        "duration_seconds", "Durations.", ["tool"], buckets=(1, 0.1, 0.5)
+    )
+    for value in (0.05, 0.1, 0.3, 2):
+        duration.observe(value, ("getUsers",))
+
+    assert registry.render().splitlines() == [
+        "# HELP duration_seconds Durations.",
+        "# TYPE duration_seconds histogram",
+        'duration_seconds_bucket{tool="getUsers",le="0.1"} 2',
+        'duration_seconds_bucket{tool="getUsers",le="0.5"} 3',
+        'duration_seconds_bucket{tool="getUsers",le="1"} 3',
+        'duration_seconds_bucket{tool="getUsers",le="+Inf"} 4',
+        'duration_seconds_sum{tool="getUsers"} 2.45',
+        'duration_seconds_count{tool="getUsers"} 4',
+    ]
+    assert duration.count(("getUsers",)) == 4
+
+
+def test_names_are_unique():
+    registry = MetricsRegistry()
+    registry.counter("calls", "Calls.")
+    with pytest.raises(ValueError, match="calls_total"):
+        registry.counter("calls_total", "Calls.")
+
+
+def test_default_registry_renders_the_server_metrics():
+    text = default_registry.render()
+
+    assert text.endswith("\n")
+    for name in ("mcp_sse_sessions_total", "mcp_sse_sessions_active"):
+        assert f"# TYPE {name} " in text
+    # Every sample line is `name[{labels}] value`
+    for line in text.splitlines():
+        if not line.startswith("#"):
+            float(line.rsplit(" ", 1)[1].replace("+Inf", "inf"))
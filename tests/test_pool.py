@@ -0,0 +1,44 @@
+import asyncio
+
+import pytest
+
+from openapi_mcp.pool import ClientPool
+
+pytestmark = pytest.mark.anyio
+
+BASE_URL = "http://connect.test/__api__"
+
+
+async def test_one_client_per_base_url_and_api_key():
+    async with ClientPool() as pool:
+        client = pool.get_client(BASE_URL, api_key="key")
+        assert pool.get_client(BASE_URL, api_key="key") is client
+        assert client.headers["Authorization"] == "Key key"
+        assert pool.get_client(BASE_URL, api_key="other") is not client
+        assert pool.get_client("http://other.test", api_key="key") is not client
+        assert "Authorization" not in pool.get_client(BASE_URL).headers
+
+
+async def test_aclose_closes_every_client():
+    pool = ClientPool()
+    clients = [pool.get_client(BASE_URL, api_key="key"), pool.get_client(BASE_URL)]
+
+    await pool.aclose()
+
+    assert all(client.is_closed for client in clients)
+    # A closed pool creates new clients on demand
+    client = pool.get_client(BASE_URL, api_key="key")
+    assert not client.is_closed
+    assert client not in clients
+    await pool.aclose()
+
+
+def test_clients_are_not_shared_across_event_loops():
+    pool = ClientPool()
+
+    async def get_client():
+        return pool.get_client(BASE_URL)
+
+    asyncio.run(get_client())
+    with pytest.raises(RuntimeError, match="one event loop"):
+        asyncio.run(get_client())
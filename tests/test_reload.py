@@ -0,0 +1,220 @@
+import copy
+import hashlib
+import json
+
+import pytest
+
+from openapi_mcp.index import OperationIndex
+from openapi_mcp.reload import SpecReloader, path_item_digests
+
+
+def make_document() -> dict:
+    return {
+        "swagger": "2.0",
+        "paths": {
+            "/v1/users": {
+                "get": {
+                    "operationId": "getUsers",
+                    "description": "List users.",
+                    "responses": {"200": {"schema": {"$ref": "#/definitions/User"}}},
+                },
+            },
+            "/v1/content": {
+                "get": {
+                    "operationId": "getContents",
+                    "description": "List content.",
+                    "responses": {"200": {"schema": {"$ref": "#/definitions/Content"}}},
+                },
+            },
+            "/v1/tree": {
+                "get": {
+                    "operationId": "getTree",
+                    "description": "Get the tree.",
+                    "responses": {"200": {"schema": {"$ref": "#/definitions/Node"}}},
+                },
+            },
+        },
+        "definitions": {
+            "User": {"type": "object", "properties": {"guid": {"type": "string"}}},
+            "Content": {
+                "type": "object",
+                "properties": {"owner": {"$ref": "#/definitions/User"}},
+            },
+            # Recursive through itself and through another definition
+            "Node": {
+                "type": "object",
+                "properties": {
+                    "children": {"type": "array", "items": {"$ref": "#/definitions/Node"}},
+                    "parent": {"$ref": "#/definitions/Parent"},
+                },
+            },
+            "Parent": {"type": "object", "properties": {"node": {"$ref": "#/definitions/Node"}}},
+        },
+    }
+
+
+def changed_routes(old: dict, new: dict) -> set[str]:
+    old_digests = path_item_digests(old)
+    return {
+        route for route, digest in path_item_digests(new).items() if old_digests[route] != digest
+    }
+
+
+def test_digests_are_deterministic():
+    assert path_item_digests(make_document()) == path_item_digests(make_document())
+
+
+def test_digests_do_not_depend_on_the_order_of_the_paths():
+    document = make_document()
+    reordered = {**document, "paths": dict(reversed(document["paths"].items()))}
+
+    assert path_item_digests(reordered) == path_item_digests(document)
+
+
+def test_changing_a_definition_changes_the_path_items_that_use_it():
+    document = make_document()
+    changed = copy.deepcopy(document)
+    changed["definitions"]["User"]["properties"]["email"] = {"type": "string"}
+
+    # `/v1/content` uses `User` through `Content`
+    assert changed_routes(document, changed) == {"/v1/users", "/v1/content"}
+
+
+def test_changing_a_definition_in_a_cycle_changes_the_path_items_that_use_it():
+    document = make_document()
+    changed = copy.deepcopy(document)
+    changed["definitions"]["Parent"]["description"] = "The parent of a node."
+
+    assert changed_routes(document, changed) == {"/v1/tree"}
+
+
+def test_cyclic_digests_do_not_leak_into_other_path_items():
+    # `Parent` is first reached inside the `Node` cycle; its digest there must not be reused
+    # for a path item that references `Parent` directly
+    document = make_document()
+    document["paths"]["/v1/parents"] = {
+        "get": {
+            "operationId": "getParent",
+            "responses": {"200": {"schema": {"$ref": "#/definitions/Parent"}}},
+        },
+    }
+    changed = copy.deepcopy(document)
+    changed["definitions"]["Node"]["description"] = "A node."
+
+    assert changed_routes(document, changed) == {"/v1/tree", "/v1/parents"}
+
+
+def test_adopt_reuses_the_operations_of_unchanged_routes():
+    document = make_document()
+    old = OperationIndex(document)
+    old_tools = old.tools()
+
+    changed = copy.deepcopy(document)
+    changed["definitions"]["Content"]["description"] = "Some content."
+    new = OperationIndex(changed)
+    unchanged = set(path_item_digests(document)) - changed_routes(document, changed)
+
+    assert new.adopt(old, unchanged) == 2
+    assert new["getUsers"] is old["getUsers"]
+    assert new.tool("getTree") is old_tools[2]
+    assert not new.is_materialized("getContents")
+    assert new["getContents"]["definition"]["responses"]["200"]["schema"]["description"] == (
+        "Some content."
+    )
+
+
+def test_adopt_skips_operations_that_moved():
+    document = make_document()
+    old = OperationIndex(document)
+    old.tools()
+
+    moved = copy.deepcopy(document)
+    moved["paths"]["/v1/users"]["post"] = moved["paths"]["/v1/users"].pop("get")
+    new = OperationIndex(moved)
+
+    assert new.adopt(old, set(document["paths"])) == 2
+    assert not new.is_materialized("getUsers")
+    assert new["getUsers"]["method"] == "post"
+
+
+def test_adopt_skips_operations_that_were_not_built():
+    document = make_document()
+    old = OperationIndex(document)
+    new = OperationIndex(copy.deepcopy(document))
+
+    assert new.adopt(old, set(document["paths"])) == 0
+
+
+@pytest.fixture
+def spec_file(tmp_path):
+    path = tmp_path / "swagger.json"
+    path.write_text(json.dumps(make_document()))
+    return path
+
+
+def test_reloader_loads_changed_files(spec_file):
+    operations = OperationIndex(make_document())
+    operations.tools()
+    reloader = SpecReloader(spec_file, operations)
+    assert reloader.check() is None
+
+    document = make_document()
+    document["definitions"]["User"]["description"] = "A user."
+    spec_file.write_text(json.dumps(document))
+    index = reloader.check()
+
+    assert index is not None
+    assert index["getTree"] is operations["getTree"]
+    assert not index.is_materialized("getUsers")
+    reloader.accept(index)
+    assert reloader.operations is index
+    assert reloader.spec_hash == hashlib.sha256(spec_file.read_bytes()).hexdigest()
+    assert reloader.check() is None
+
+
+def test_reloader_ignores_rewrites_with_the_same_contents(spec_file):
+    reloader = SpecReloader(spec_file, OperationIndex(make_document()))
+    spec_file.write_text(json.dumps(make_document(), indent=2))
+    spec_file.write_text(json.dumps(make_document()))
+
+    assert reloader.check() is None
+
+
+def test_reloader_retries_files_that_failed_to_load(spec_file):
+    reloader = SpecReloader(spec_file, OperationIndex(make_document()))
+    spec_file.write_text('{"swagger": "2.0", "paths": {')
+    with pytest.raises(ValueError):
+        reloader.check()
+
+    document = make_document()
+    del document["paths"]["/v1/tree"]
+    spec_file.write_text(json.dumps(document))
+    index = reloader.check()
+
+    assert index is not None
+    assert list(index) == ["getUsers", "getContents"]
+
+
+def test_accept_only_takes_the_last_checked_index(spec_file):
+    reloader = SpecReloader(spec_file, OperationIndex(make_document()))
+
+    with pytest.raises(ValueError):
+        reloader.accept(OperationIndex(make_document()))
+
+
+def test_rejected_indexes_are_loaded_again(spec_file):
+    reloader = SpecReloader(spec_file, OperationIndex(make_document()))
+    spec_hash = reloader.spec_hash
+    document = make_document()
+    del document["paths"]["/v1/tree"]
+    spec_file.write_text(json.dumps(document))
+
+    # The caller fails before accepting the index: the reloader keeps the current version
+    assert reloader.check() is not None
+    assert reloader.spec_hash == spec_hash
+
+    index = reloader.check()
+    assert index is not None
+    reloader.accept(index)
+    assert reloader.spec_hash != spec_hash
+    assert reloader.check() is None
@@ -0,0 +1,185 @@
+import types
+
+import httpx
+import pytest
+
+from openapi_mcp import response_cache
+from openapi_mcp.response_cache import ResponseCache, request_key, send_cached
+
+# Every test runs on the fake clock
+pytestmark = [pytest.mark.anyio, pytest.mark.usefixtures("clock")]
+
+BASE_URL = "http://connect.test/__api__"
+
+
+class FakeTime:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeTime()
+    monkeypatch.setattr(response_cache, "time", types.SimpleNamespace(monotonic=clock.monotonic))
+    return clock
+
+
+class Upstream:
+    """Answers requests with the next of `responses` (status, headers, body), recording them."""
+
+    def __init__(self, *responses: tuple[int, dict[str, str], str]):
+        self.responses = list(responses)
+        self.requests: list[httpx.Request] = []
+
+    async def send(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        status, headers, body = self.responses.pop(0)
+        return httpx.Response(status, headers=headers, text=body, request=request)
+
+
+def get(path: str = "/v1/content/1", headers: dict[str, str] | None = None) -> httpx.Request:
+    return httpx.Request("GET", BASE_URL + path, headers=headers)
+
+
+async def fetch(cache: ResponseCache, upstream: Upstream, request: httpx.Request, **kwargs):
+    return await send_cached(
+        upstream.send, request, cache, operation_name="getContent", api_key="key", **kwargs
+    )
+
+
+async def test_fresh_responses_are_served_from_the_cache(clock):
+    cache = ResponseCache(default_ttl=60)
+    upstream = Upstream((200, {}, "first"))
+
+    assert (await fetch(cache, upstream, get())).text == "first"
+    clock.now += 59
+    assert await fetch(cache, upstream, get()) == (200, "first")
+
+    assert len(upstream.requests) == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+async def test_stale_responses_are_revalidated_with_their_etag(clock):
+    cache = ResponseCache(default_ttl=60)
+    upstream = Upstream((200, {"ETag": '"v1"'}, "first"), (304, {}, ""), (200, {}, "second"))
+
+    await fetch(cache, upstream, get())
+    clock.now += 61
+    assert await fetch(cache, upstream, get()) == (200, "first")
+    assert upstream.requests[1].headers["If-None-Match"] == '"v1"'
+    assert cache.revalidations == 1
+
+    # The 304 made the entry fresh again
+    clock.now += 30
+    assert (await fetch(cache, upstream, get())).text == "first"
+    assert len(upstream.requests) == 2
+
+    clock.now += 31
+    assert (await fetch(cache, upstream, get())).text == "second"
+
+
+async def test_cache_control_is_honoured(clock):
+    cache = ResponseCache(default_ttl=60)
+    upstream = Upstream(
+        (200, {"Cache-Control": "no-store"}, "a"),
+        (200, {"Cache-Control": "max-age=5"}, "c"),
+        (200, {}, "d"),
+    )
+
+    await fetch(cache, upstream, get("/v1/a"))
+    assert len(cache) == 0
+
+    await fetch(cache, upstream, get("/v1/c"))
+    assert (await fetch(cache, upstream, get("/v1/c"))).text == "c"
+    clock.now += 6
+    assert (await fetch(cache, upstream, get("/v1/c"))).text == "d"
+
+
+async def test_errors_are_not_cached():
+    cache = ResponseCache()
+    upstream = Upstream((404, {}, '{"error":"not found"}'), (200, {}, "found"))
+
+    assert await fetch(cache, upstream, get()) == (404, '{"error":"not found"}')
+    assert await fetch(cache, upstream, get()) == (200, "found")
+
+
+async def test_successful_changes_invalidate_the_resource_and_its_collection():
+    cache = ResponseCache()
+    paths = ["/v1/content", "/v1/content/1", "/v1/content/1/tags", "/v1/content/2"]
+    upstream = Upstream(*((200, {}, path) for path in paths))
+    for path in paths:
+        await fetch(cache, upstream, get(path))
+
+    upstream.responses.append((500, {}, "failed"))
+    await fetch(cache, upstream, httpx.Request("PATCH", BASE_URL + "/v1/content/1"))
+    assert len(cache) == 4
+
+    upstream.responses.append((200, {}, "updated"))
+    await fetch(cache, upstream, httpx.Request("PATCH", BASE_URL + "/v1/content/1"))
+    assert len(cache) == 1
+    assert (await fetch(cache, upstream, get("/v1/content/2"))).text == "/v1/content/2"
+
+
+async def test_least_recently_used_responses_are_evicted():
+    cache = ResponseCache(max_entries=2)
+    upstream = Upstream(*((200, {}, str(i)) for i in range(4)))
+
+    await fetch(cache, upstream, get("/v1/a"))
+    await fetch(cache, upstream, get("/v1/b"))
+    await fetch(cache, upstream, get("/v1/a"))
+    await fetch(cache, upstream, get("/v1/c"))
+
+    assert len(cache) == 2
+    assert (await fetch(cache, upstream, get("/v1/a"))).text == "0"
+    assert (await fetch(cache, upstream, get("/v1/b"))).text == "3"
+
+
+async def test_header_parameters_are_part_of_the_key():
+    cache = ResponseCache()
+    upstream = Upstream((200, {}, "tenant a"), (200, {}, "tenant b"))
+
+    a = await fetch(cache, upstream, get(headers={"X-Tenant": "a"}), header_names=["X-Tenant"])
+    b = await fetch(cache, upstream, get(headers={"X-Tenant": "b"}), header_names=["X-Tenant"])
+
+    assert (a.text, b.text) == ("tenant a", "tenant b")
+    assert len(upstream.requests) == 2
+
+
+def test_request_key():
+    request = get(headers={"X-Tenant": "a", "traceparent": "00-1-2-01", "If-None-Match": '"v1"'})
+    same = get(headers={"X-Tenant": "a"})
+
+    assert request_key("getContent", request, "key", ["X-Tenant"]) == request_key(
+        "getContent", same, "key", ["X-Tenant"]
+    )
+    assert request_key("getContent", request, "key", ["X-Tenant"]) != request_key(
+        "getContent", get(headers={"X-Tenant": "b"}), "key", ["X-Tenant"]
+    )
+    assert request_key("getContent", request, "key") != request_key("getContent", request, "other")
+    # API keys are not kept in the key
+    assert "key" not in request_key("getContent", request, "key")
+
+
+async def test_truncated_responses_are_not_cached():
+    cache = ResponseCache(default_ttl=60)
+    requests: list[httpx.Request] = []
+
+    async def send(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(
+            200,
+            headers={"ETag": '"v1"'},
+            text="partial",
+            request=request,
+            extensions={"truncated": True},
+        )
+
+    for _ in range(2):
+        result = await send_cached(send, get(), cache, operation_name="getContent", api_key="key")
+        assert result == (200, "partial")
+
+    assert len(requests) == 2
+    assert len(cache) == 0
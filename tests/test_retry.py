@@ -0,0 +1,235 @@
+import types
+
+import httpx
+import pytest
+
+from openapi_mcp import retry
+from openapi_mcp.retry import (
+    CircuitBreaker,
+    CircuitOpenError,
+    RetryPolicy,
+    parse_retry_after,
+    send_with_retries,
+)
+
+# Every test runs on the fake clock, so retries do not actually wait
+pytestmark = [pytest.mark.anyio, pytest.mark.usefixtures("clock")]
+
+BASE_URL = "http://connect.test/__api__"
+
+
+class FakeClock:
+    """Replaces `time.monotonic()` and `asyncio.sleep()` in `openapi_mcp.retry`."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps: list[float] = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+    async def sleep(self, delay: float) -> None:
+        self.sleeps.append(delay)
+        self.now += delay
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(retry, "time", types.SimpleNamespace(monotonic=clock.monotonic))
+    monkeypatch.setattr(retry, "asyncio", types.SimpleNamespace(sleep=clock.sleep))
+    return clock
+
+
+def responder(*responses: httpx.Response | Exception):
+    """An upstream answering with `responses` in order, recording the attempts."""
+    remaining = list(responses)
+    attempts: list[httpx.Request] = []
+
+    async def send(request: httpx.Request) -> httpx.Response:
+        attempts.append(request)
+        response = remaining.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    return send, attempts
+
+
+def make_request(method: str = "GET") -> httpx.Request:
+    return httpx.Request(method, f"{BASE_URL}/v1/content")
+
+
+async def test_retries_transient_failures_until_success():
+    send, attempts = responder(
+        httpx.Response(503), httpx.ConnectError("refused"), httpx.Response(200)
+    )
+    policy = RetryPolicy(max_attempts=3)
+
+    response = await send_with_retries(
+        send, make_request(), policy, base_url=BASE_URL, operation_name="getContents"
+    )
+
+    assert response.status_code == 200
+    assert len(attempts) == 3
+    assert policy.retries == 2
+
+
+async def test_returns_the_last_response_when_attempts_run_out():
+    send, attempts = responder(*(httpx.Response(502) for _ in range(3)))
+
+    response = await send_with_retries(
+        send,
+        make_request(),
+        RetryPolicy(max_attempts=3, failure_threshold=0),
+        base_url=BASE_URL,
+        operation_name="getContents",
+    )
+
+    assert response.status_code == 502
+    assert len(attempts) == 3
+
+
+async def test_non_idempotent_requests_are_only_retried_when_not_sent():
+    send, attempts = responder(httpx.Response(503))
+    response = await send_with_retries(
+        send, make_request("POST"), RetryPolicy(), base_url=BASE_URL, operation_name="createUser"
+    )
+    assert response.status_code == 503
+    assert len(attempts) == 1
+
+    send, attempts = responder(httpx.ConnectError("refused"), httpx.Response(201))
+    response = await send_with_retries(
+        send, make_request("POST"), RetryPolicy(), base_url=BASE_URL, operation_name="createUser"
+    )
+    assert response.status_code == 201
+    assert len(attempts) == 2
+
+    send, attempts = responder(httpx.Response(503), httpx.Response(201))
+    response = await send_with_retries(
+        send,
+        make_request("POST"),
+        RetryPolicy(retry_operations=["createUser"]),
+        base_url=BASE_URL,
+        operation_name="createUser",
+    )
+    assert response.status_code == 201
+
+
+async def test_honours_retry_after(clock):
+    send, _ = responder(httpx.Response(429, headers={"Retry-After": "2"}), httpx.Response(200))
+
+    response = await send_with_retries(
+        send, make_request(), RetryPolicy(), base_url=BASE_URL, operation_name="getContents"
+    )
+
+    assert response.status_code == 200
+    assert clock.sleeps == [2.0]
+
+
+async def test_does_not_retry_past_the_budget(clock):
+    send, attempts = responder(
+        httpx.Response(503, headers={"Retry-After": "20"}), httpx.Response(200)
+    )
+
+    response = await send_with_retries(
+        send,
+        make_request(),
+        RetryPolicy(budget=15),
+        base_url=BASE_URL,
+        operation_name="getContents",
+    )
+
+    assert response.status_code == 503
+    assert len(attempts) == 1
+    assert clock.sleeps == []
+
+
+async def test_does_not_retry_past_the_deadline(clock):
+    send, attempts = responder(httpx.Response(503, headers={"Retry-After": "2"}))
+
+    response = await send_with_retries(
+        send,
+        make_request(),
+        RetryPolicy(),
+        base_url=BASE_URL,
+        operation_name="getContents",
+        deadline=clock.now + 1,
+    )
+
+    assert response.status_code == 503
+    assert len(attempts) == 1
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("5") == 5.0
+    assert parse_retry_after("Thu, 01 Jan 1970 00:00:00 GMT") == 0.0
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+
+
+def test_circuit_breaker_state_changes(clock):
+    breaker = CircuitBreaker(BASE_URL, failure_threshold=2, reset_timeout=30)
+
+    breaker.record_failure()
+    assert not breaker.is_open
+    breaker.before_request()
+    breaker.record_failure()
+    assert breaker.is_open
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request()
+
+    # After the reset timeout one trial request is let through; the others keep failing fast
+    clock.now += 30
+    breaker.before_request()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request()
+
+    # A failed trial keeps the circuit open for another reset timeout
+    breaker.record_failure()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request()
+    clock.now += 30
+    breaker.before_request()
+
+    # A successful trial closes it
+    breaker.record_success()
+    assert not breaker.is_open
+    assert breaker.failures == 0
+    breaker.before_request()
+
+
+async def test_open_circuit_fails_fast():
+    policy = RetryPolicy(max_attempts=1, failure_threshold=2)
+    for _ in range(2):
+        send, _ = responder(httpx.Response(503))
+        await send_with_retries(
+            send, make_request(), policy, base_url=BASE_URL, operation_name="getContents"
+        )
+
+    send, attempts = responder(httpx.Response(200))
+    with pytest.raises(CircuitOpenError):
+        await send_with_retries(
+            send, make_request(), policy, base_url=BASE_URL, operation_name="getContents"
+        )
+    assert attempts == []
+    assert policy.stats()["open_circuits"] == 1
+
+    # Other upstreams have their own circuit
+    response = await send_with_retries(
+        send, make_request(), policy, base_url="http://other.test", operation_name="getContents"
+    )
+    assert response.status_code == 200
+
+
+async def test_rate_limiting_does_not_open_the_circuit():
+    policy = RetryPolicy(max_attempts=1, failure_threshold=1)
+    send, _ = responder(httpx.Response(429))
+
+    await send_with_retries(
+        send, make_request(), policy, base_url=BASE_URL, operation_name="getContents"
+    )
+
+    breaker = policy.circuit_breaker(BASE_URL)
+    assert breaker is not None
+    assert not breaker.is_open
@@ -0,0 +1,219 @@
+import asyncio
+import importlib
+import json
+import logging
+import sys
+import types
+
+import httpx
+import mcp.types as mcp_types
+import pytest
+from mcp.shared.memory import create_connected_server_and_client_session
+
+from openapi_mcp import log
+from openapi_mcp.index import OperationIndex
+from openapi_mcp.pool import ClientPool
+from openapi_mcp.search import SEARCH_TOOL_NAME, ToolSearchIndex, tokenize
+
+pytestmark = pytest.mark.anyio
+
+
+def make_document() -> dict:
+    def operation(operation_id: str, summary: str, tags: list[str], *parameters: str) -> dict:
+        return {
+            "operationId": operation_id,
+            "summary": summary,
+            "description": summary,
+            "tags": tags,
+            "parameters": [
+                {
+                    "name": name.removeprefix("path:"),
+                    "in": "path" if name.startswith("path:") else "query",
+                    "type": "string",
+                    "description": name,
+                }
+                for name in parameters
+            ],
+            "responses": {},
+        }
+
+    return {
+        "swagger": "2.0",
+        "paths": {
+            "/v1/users": {
+                "get": operation("getUsers", "List or search users.", ["Users"], "prefix"),
+            },
+            "/v1/users/{guid}": {
+                "get": operation("getUser", "Get a user.", ["Users"]),
+                "patch": operation(
+                    "updateUser", "Update a user's name or email.", ["Users"], "path:guid"
+                ),
+            },
+            "/v1/content": {
+                "get": operation("getContents", "List content items.", ["Content"], "owner_guid"),
+            },
+            "/v1/content/{guid}/bundles": {
+                "post": operation(
+                    "createBundle", "Upload a bundle of the content's files.", ["Content"]
+                ),
+            },
+            "/v1/tasks/{id}": {
+                "get": operation("getTask", "Get the status of a deployment task.", ["Tasks"]),
+            },
+        },
+    }
+
+
+def test_tokenize():
+    assert tokenize("listUsers") == tokenize("list of users") == ["list", "user"]
+    assert tokenize("owner_guid HTTPRequest") == ["owner", "guid", "http", "request"]
+
+
+@pytest.mark.parametrize(
+    ("query", "best"),
+    [
+        ("update user email", "updateUser"),
+        ("search users", "getUsers"),
+        ("upload bundle", "createBundle"),
+        ("content owned by a user", "getContents"),
+        ("deployment status", "getTask"),
+    ],
+)
+def test_bm25_ranking(query, best):
+    index = ToolSearchIndex(OperationIndex(make_document()))
+
+    results = index.search(query, 3)
+
+    assert results[0].name == best
+    assert [result.score for result in results] == sorted(
+        (result.score for result in results), reverse=True
+    )
+
+
+def test_search_limits_and_misses():
+    operations = OperationIndex(make_document())
+    index = ToolSearchIndex(operations)
+
+    assert {result.name for result in index.search("user", 3)} == {
+        "getUser",
+        "getUsers",
+        "updateUser",
+    }
+    assert len(index.search("user", 2)) == 2
+    assert index.search("kubernetes") == []
+    assert index.stats()["searches"] == 3
+    # Indexed from the unexpanded document
+    assert not any(operations.is_materialized(name) for name in operations)
+
+
+def test_describe():
+    index = ToolSearchIndex(OperationIndex(make_document()))
+
+    (described,) = index.describe(index.search("upload bundle", 1))
+
+    assert described["name"] == "createBundle"
+    assert described["summary"] == "Upload a bundle of the content's files."
+    assert described["score"] > 0
+
+
+class MockClientPool(ClientPool):
+    def __init__(self):
+        super().__init__()
+        self.requests: list[httpx.Request] = []
+
+    def get_client(self, base_url: str, *, api_key: str = "") -> httpx.AsyncClient:
+        def handler(request: httpx.Request) -> httpx.Response:
+            self.requests.append(request)
+            return httpx.Response(200, json={"guid": "abc", "email": "user@example.com"})
+
+        return httpx.AsyncClient(
+            base_url=base_url.rstrip("/") + "/",
+            headers={"Authorization": f"Key {api_key}"} if api_key else None,
+            transport=httpx.MockTransport(handler),
+        )
+
+
+@pytest.fixture
+def connect_api(monkeypatch, tmp_path):
+    """`connect_api` in the dynamic `TOOL_SEARCH` mode, serving `make_document()`."""
+    spec = tmp_path / "swagger.json"
+    spec.write_text(json.dumps(make_document()))
+    monkeypatch.setenv("SWAGGER_FILE", str(spec))
+    monkeypatch.setenv("SWAGGER_CACHE", "false")
+    monkeypatch.setenv("INCLUDE_OPERATIONS", "")
+    monkeypatch.setenv("TOOL_SEARCH", "dynamic")
+    logger = logging.getLogger(log.LOGGER_NAME)
+    handlers, level, propagate = list(logger.handlers), logger.level, logger.propagate
+
+    sys.modules.pop("openapi_mcp.connect_api", None)
+    module = importlib.import_module("openapi_mcp.connect_api")
+    monkeypatch.setattr(module, "client_pool", MockClientPool())
+    yield module
+
+    sys.modules.pop("openapi_mcp.connect_api", None)
+    log._flush_logs()
+    logger.handlers[:] = handlers
+    logger.setLevel(level)
+    logger.propagate = propagate
+
+
+async def test_dynamic_search_exposes_the_operations_found(connect_api):
+    notifications: list[object] = []
+
+    async def drain(client):
+        async for message in client.incoming_messages:
+            notifications.append(message)
+
+    async with create_connected_server_and_client_session(connect_api.server) as client:
+        drainer = asyncio.create_task(drain(client))
+        try:
+            listed = await client.list_tools()
+            assert [tool.name for tool in listed.tools] == [SEARCH_TOOL_NAME]
+
+            found = await client.call_tool(
+                SEARCH_TOOL_NAME, {"query": "update user email", "limit": 2}
+            )
+            names = [result["name"] for result in json.loads(found.content[0].text)]
+            assert names[0] == "updateUser"
+            assert len(names) == 2
+
+            listed = await client.list_tools()
+            assert [tool.name for tool in listed.tools] == [SEARCH_TOOL_NAME, *names, "batch_call"]
+
+            result = await client.call_tool("updateUser", {"guid": "abc", "email": "a@b.c"})
+            assert not result.isError
+            assert json.loads(result.content[0].text)["guid"] == "abc"
+            (request,) = connect_api.client_pool.requests
+            assert (request.method, request.url.path) == ("PATCH", "/__api__/v1/users/abc")
+        finally:
+            drainer.cancel()
+
+    assert any(
+        isinstance(message, mcp_types.ServerNotification)
+        and isinstance(message.root, mcp_types.ToolListChangedNotification)
+        for message in notifications
+    )
+
+
+async def test_chatlas_search_registers_the_operations_found():
+    pytest.importorskip("chatlas")
+    from openapi_mcp.chatlas import SwaggerSearchTool
+
+    operations = OperationIndex(make_document())
+    chat = types.SimpleNamespace(_tools={})
+    search = SwaggerSearchTool(
+        operations=operations,
+        chat=chat,  # pyright: ignore[reportArgumentType]
+        base_url="http://connect.test/__api__",
+        client_pool=ClientPool(),
+        max_results=2,
+    )
+
+    await search.func(query="update user email")
+    expected = ToolSearchIndex(operations).search("update user email", 2)
+    assert list(chat._tools) == [result.name for result in expected]
+    assert chat._tools["updateUser"].name == "updateUser"
+
+    # The next search replaces the operations found
+    await search.func(query="upload bundle", limit=1)
+    assert list(chat._tools) == ["createBundle"]
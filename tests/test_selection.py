@@ -0,0 +1,169 @@
+import json
+
+import pytest
+
+from openapi_mcp.selection import OperationSelector, SelectionRule
+
+
+def make_document() -> dict:
+    return {
+        "swagger": "2.0",
+        "paths": {
+            "/v1/users": {
+                "parameters": [{"$ref": "#/parameters/Page"}],
+                "get": {
+                    "operationId": "getUsers",
+                    "tags": ["Users"],
+                    "responses": {"200": {"schema": {"$ref": "#/definitions/UserList"}}},
+                },
+                "post": {
+                    "operationId": "createUser",
+                    "tags": ["Users"],
+                    "responses": {"200": {"schema": {"$ref": "#/definitions/User"}}},
+                },
+            },
+            "/v1/content/{guid}": {
+                "get": {
+                    "operationId": "getContent",
+                    "tags": ["Content"],
+                    "responses": {"200": {"$ref": "#/responses/Content"}},
+                },
+                "delete": {
+                    "operationId": "deleteContent",
+                    "tags": ["Content"],
+                    "responses": {"204": {"description": "Deleted."}},
+                },
+            },
+            "/v1/tasks": {
+                "get": {
+                    "operationId": "getTasks",
+                    "tags": ["Tasks"],
+                    "responses": {"200": {"schema": {"$ref": "#/definitions/Task"}}},
+                }
+            },
+        },
+        "parameters": {"Page": {"name": "page", "in": "query", "type": "integer"}},
+        "responses": {"Content": {"schema": {"$ref": "#/definitions/Content"}}},
+        "definitions": {
+            "UserList": {"type": "array", "items": {"$ref": "#/definitions/User"}},
+            "User": {"type": "object", "properties": {"role": {"$ref": "#/definitions/Role"}}},
+            "Role": {"type": "string"},
+            "Content": {"type": "object", "properties": {"owner": {"$ref": "#/definitions/User"}}},
+            "Task": {"type": "object"},
+        },
+    }
+
+
+def selected(selector: OperationSelector) -> dict[str, list[str]]:
+    document = selector.select(make_document())
+    return {route: sorted(path_item) for route, path_item in document["paths"].items()}
+
+
+def test_every_operation_is_selected_without_rules():
+    document = make_document()
+    assert OperationSelector().select(document) == document
+
+
+@pytest.mark.parametrize(
+    ("rule", "names"),
+    [
+        (SelectionRule(operations=["get*"]), {"getUsers", "getContent", "getTasks"}),
+        (SelectionRule(operations=["*Content"]), {"getContent", "deleteContent"}),
+        (SelectionRule(tags=["Use*"]), {"getUsers", "createUser"}),
+        (SelectionRule(paths=["/v1/content*"]), {"getContent", "deleteContent"}),
+        (SelectionRule(paths=["/v1/*"], methods=["POST"]), {"createUser"}),
+        (SelectionRule(tags=["Content"], methods=["get"]), {"getContent"}),
+    ],
+)
+def test_rules_match_ids_tags_routes_and_methods(rule, names):
+    document = OperationSelector([rule]).select(make_document())
+    assert {
+        operation["operationId"]
+        for path_item in document["paths"].values()
+        for key, operation in path_item.items()
+        if key != "parameters"
+    } == names
+
+
+def test_exclude_rules_win():
+    selector = OperationSelector.from_terms("tag:Users,tag:Content", "method:delete,createUser")
+    assert selected(selector) == {
+        "/v1/users": ["get", "parameters"],
+        "/v1/content/{guid}": ["get"],
+    }
+
+
+def test_terms_are_parsed_into_rules():
+    selector = OperationSelector.from_terms(
+        "getUsers,tag:Users,path:/v1/content*+method:get,operation:get*"
+    )
+    assert [rule.criteria for rule in selector.include] == [
+        {"operations": ["getUsers"]},
+        {"tags": ["Users"]},
+        {"paths": ["/v1/content*"], "methods": ["get"]},
+        {"operations": ["get*"]},
+    ]
+    assert OperationSelector.from_terms(" , ").include == []
+
+
+def test_invalid_rules():
+    with pytest.raises(ValueError, match="at least one criterion"):
+        SelectionRule()
+    with pytest.raises(ValueError, match="fetch"):
+        SelectionRule(methods=["fetch"])
+    with pytest.raises(ValueError, match="Unknown operation selection keys"):
+        OperationSelector.from_config({"only": []})
+    with pytest.raises(ValueError, match="Invalid `include` rule"):
+        OperationSelector.from_config({"include": [{"name": "getUsers"}]})
+
+
+@pytest.mark.parametrize("suffix", [".yaml", ".json"])
+def test_from_file(tmp_path, suffix):
+    path = tmp_path / f"operations{suffix}"
+    config = {
+        "include": [{"tags": "Users"}, {"paths": ["/v1/tasks"]}],
+        "exclude": [{"methods": "post"}],
+    }
+    if suffix == ".json":
+        path.write_text(json.dumps(config))
+    else:
+        path.write_text(
+            "include:\n  - tags: Users\n  - paths: [/v1/tasks]\nexclude:\n  - methods: post\n"
+        )
+
+    selector = OperationSelector.from_file(path)
+
+    assert selected(selector) == {"/v1/users": ["get", "parameters"], "/v1/tasks": ["get"]}
+    assert selector.fingerprint == OperationSelector.from_config(config).fingerprint
+
+
+def test_pruning_keeps_targets_reachable_through_ref_chains():
+    document = OperationSelector.from_terms("getContent").select(make_document())
+
+    # getContent -> responses/Content -> definitions/Content -> User -> Role
+    assert list(document["paths"]) == ["/v1/content/{guid}"]
+    assert document["responses"] == make_document()["responses"]
+    assert sorted(document["definitions"]) == ["Content", "Role", "User"]
+    assert document["parameters"] == {}
+
+
+def test_pruning_keeps_targets_of_path_item_parameters():
+    document = OperationSelector.from_terms("getUsers").select(make_document())
+
+    assert sorted(document["definitions"]) == ["Role", "User", "UserList"]
+    assert list(document["parameters"]) == ["Page"]
+    assert document["responses"] == {}
+
+
+def test_select_does_not_modify_the_document():
+    document = make_document()
+    OperationSelector.from_terms("getTasks").select(document)
+    assert document == make_document()
+
+
+def test_fingerprint_depends_on_the_rules_only():
+    assert (
+        OperationSelector.from_terms("tag:Users").fingerprint
+        == OperationSelector.from_config({"include": [{"tags": ["Users"]}]}).fingerprint
+    )
+    assert OperationSelector.from_terms("tag:Users").fingerprint != OperationSelector().fingerprint
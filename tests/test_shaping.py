@@ -0,0 +1,80 @@
+import json
+
+import pytest
+
+from openapi_mcp.shaping import ResponseShape
+
+GET_CURRENT_USER = {
+    "name": "getCurrentUser",
+    "tags": [],
+    "method": "get",
+    "route": "/v1/user",
+    "definition": {
+        "responses": {
+            "200": {
+                "schema": {
+                    "type": "object",
+                    "properties": {"guid": {"type": "string"}, "username": {"type": "string"}},
+                },
+            },
+        },
+    },
+}
+
+GET_CONTENTS = {
+    "name": "getContents",
+    "tags": [],
+    "method": "get",
+    "route": "/v1/content",
+    "definition": {
+        "responses": {
+            "200": {
+                "schema": {
+                    "type": "array",
+                    "items": {"type": "object", "properties": {"guid": {"type": "string"}}},
+                },
+            },
+        },
+    },
+}
+
+ERROR = '{"code":3,"error":"The requested object does not exist.","payload":null}'
+
+
+def test_undeclared_fields_are_kept_by_default():
+    shape = ResponseShape.from_arguments(GET_CURRENT_USER, {})
+
+    shaped = shape.apply('{"guid": "1", "username": "ann", "internal": true}')
+
+    assert json.loads(shaped) == {"guid": "1", "username": "ann", "internal": True}
+
+
+def test_successful_responses_are_filtered_by_the_schema():
+    shape = ResponseShape.from_arguments(GET_CURRENT_USER, {}, schema_filter=True)
+
+    shaped = shape.apply('{"guid": "1", "username": "ann", "internal": true}')
+
+    assert json.loads(shaped) == {"guid": "1", "username": "ann"}
+
+
+@pytest.mark.parametrize("status_code", [400, 404, 500])
+@pytest.mark.parametrize(
+    ("operation", "arguments"),
+    [
+        (GET_CURRENT_USER, {}),
+        (GET_CURRENT_USER, {"fields": "username"}),
+        (GET_CONTENTS, {"limit": 1, "offset": 1}),
+    ],
+)
+def test_error_responses_are_returned_as_is(operation, arguments, status_code):
+    shape = ResponseShape.from_arguments(operation, arguments)
+
+    assert shape.apply(ERROR, status_code) == ERROR
+
+
+def test_pagination():
+    shape = ResponseShape.from_arguments(GET_CONTENTS, {"limit": 1, "offset": 1})
+
+    shaped = shape.apply('[{"guid": "1"}, {"guid": "2"}, {"guid": "3"}]')
+
+    assert json.loads(shaped) == {"total": 3, "offset": 1, "items": [{"guid": "2"}]}
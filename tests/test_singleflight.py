@@ -0,0 +1,105 @@
+import asyncio
+
+import pytest
+
+from openapi_mcp.singleflight import SingleFlight
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_concurrent_calls_share_one_call():
+    single_flight = SingleFlight()
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "result"
+
+    results = await asyncio.gather(*(single_flight.do("key", fetch) for _ in range(5)))
+
+    assert results == ["result"] * 5
+    assert calls == 1
+    assert single_flight.stats() == {"calls": 1, "coalesced": 4, "in_flight": 0}
+
+
+async def test_different_keys_are_not_shared():
+    single_flight = SingleFlight()
+
+    async def fetch(value):
+        await asyncio.sleep(0.01)
+        return value
+
+    results = await asyncio.gather(
+        single_flight.do("a", lambda: fetch("a")), single_flight.do("b", lambda: fetch("b"))
+    )
+
+    assert results == ["a", "b"]
+    assert single_flight.calls == 2
+
+
+async def test_exception_is_shared():
+    single_flight = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("upstream failed")
+
+    results = await asyncio.gather(
+        single_flight.do("key", fail), single_flight.do("key", fail), return_exceptions=True
+    )
+
+    assert [type(result) for result in results] == [ValueError, ValueError]
+    assert single_flight.in_flight == 0
+
+
+async def test_call_survives_one_caller_being_cancelled():
+    single_flight = SingleFlight()
+    started = asyncio.Event()
+
+    async def fetch():
+        started.set()
+        await asyncio.sleep(0.05)
+        return "result"
+
+    first = asyncio.create_task(single_flight.do("key", fetch))
+    await started.wait()
+    second = asyncio.create_task(single_flight.do("key", fetch))
+    await asyncio.sleep(0)
+    first.cancel()
+
+    assert await second == "result"
+    assert first.cancelled()
+    assert single_flight.calls == 1
+
+
+async def test_call_is_cancelled_when_every_caller_leaves():
+    single_flight = SingleFlight()
+    started = asyncio.Event()
+    cancelled = asyncio.Event()
+
+    async def fetch():
+        started.set()
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+        return "result"
+
+    callers = [asyncio.create_task(single_flight.do("key", fetch)) for _ in range(2)]
+    await started.wait()
+    for caller in callers:
+        caller.cancel()
+    await asyncio.gather(*callers, return_exceptions=True)
+    await asyncio.wait_for(cancelled.wait(), 1)
+
+    assert single_flight.in_flight == 0
+
+    # A later caller starts a new call instead of joining the cancelled one
+    async def fetch_again():
+        return "again"
+
+    assert await single_flight.do("key", fetch_again) == "again"
+    assert single_flight.calls == 2
@@ -0,0 +1,96 @@
+import hashlib
+import json
+
+from openapi_mcp.index import OperationIndex
+from openapi_mcp.selection import OperationSelector
+from openapi_mcp.spec import load_hashed_spec
+from openapi_mcp.spec_cache import read_spec_cache, save_spec_cache, write_spec_cache
+
+DOCUMENT = {"swagger": "2.0", "paths": {}}
+
+USERS_DOCUMENT = {
+    "swagger": "2.0",
+    "paths": {
+        "/v1/users": {
+            "get": {
+                "operationId": "getUsers",
+                "description": "List users.",
+                "responses": {"200": {"schema": {"$ref": "#/definitions/User"}}},
+            }
+        },
+        "/v1/content": {
+            "get": {"operationId": "getContents", "description": "List content.", "responses": {}}
+        },
+    },
+    "definitions": {"User": {"type": "object", "properties": {"guid": {"type": "string"}}}},
+}
+
+
+def test_load_hashed_spec(tmp_path):
+    path = tmp_path / "swagger.json"
+    path.write_text(json.dumps(DOCUMENT))
+
+    document, spec_hash = load_hashed_spec(path)
+
+    assert document == DOCUMENT
+    assert spec_hash == hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def test_cache_is_used_while_the_file_is_unchanged(tmp_path):
+    path = tmp_path / "swagger.json"
+    path.write_text(json.dumps(DOCUMENT))
+    document, spec_hash = load_hashed_spec(path)
+
+    write_spec_cache(path, document, {}, [], spec_hash=spec_hash, selection="all")
+
+    cache = read_spec_cache(path, selection="all")
+    assert cache is not None
+    assert cache["document"] == DOCUMENT
+    assert read_spec_cache(path, selection="other") is None
+
+    path.write_text(json.dumps({**DOCUMENT, "info": {"title": "Changed"}}))
+    assert read_spec_cache(path, selection="all") is None
+
+
+def test_cache_of_a_document_parsed_before_the_file_changed_is_not_used(tmp_path):
+    path = tmp_path / "swagger.json"
+    path.write_text(json.dumps(DOCUMENT))
+    document, spec_hash = load_hashed_spec(path)
+
+    # The file changes between parsing it and writing the cache
+    path.write_text(json.dumps({**DOCUMENT, "info": {"title": "Changed"}}))
+    write_spec_cache(path, document, {}, [], spec_hash=spec_hash)
+
+    assert read_spec_cache(path) is None
+
+
+def test_cache_miss_write_hit_through_the_index(tmp_path):
+    path = tmp_path / "swagger.json"
+    path.write_text(json.dumps(USERS_DOCUMENT))
+    selector = OperationSelector.from_terms("getUsers,getContents")
+
+    # Miss: the index materializes operations lazily
+    assert read_spec_cache(path, selection=selector.fingerprint) is None
+    document, spec_hash = load_hashed_spec(path)
+    index = OperationIndex(document, selector=selector)
+    index.tool("getUsers")
+    assert not index.is_materialized("getContents")
+
+    # Write: only what was materialized is cached, nothing else is expanded to write it
+    save_spec_cache(path, index, spec_hash=spec_hash, selection=selector.fingerprint)
+    assert not index.is_materialized("getContents")
+
+    # Hit: the next index starts with the cached operations and builds the others on demand
+    cache = read_spec_cache(path, selection=selector.fingerprint)
+    assert cache is not None
+    assert list(cache["operations"]) == ["getUsers"]
+    cached = OperationIndex(
+        cache["document"], operations=cache["operations"], tools=cache["tools"]
+    )
+    assert cached.is_materialized("getUsers")
+    assert not cached.is_materialized("getContents")
+    assert cached.tool("getUsers") == index.tool("getUsers")
+    assert cached["getUsers"]["definition"]["responses"]["200"]["schema"]["properties"] == {
+        "guid": {"type": "string"}
+    }
+    assert cached["getContents"] == index["getContents"]
@@ -0,0 +1,81 @@
+import httpx
+import pytest
+
+from openapi_mcp import streaming
+from openapi_mcp.streaming import send_streaming, truncation_notice
+
+pytestmark = pytest.mark.anyio
+
+URL = "http://connect.test/__api__/v1/content"
+
+
+def make_client(body: bytes, chunk_size: int = 1000, *, content_length: bool = True):
+    async def stream():
+        for start in range(0, len(body), chunk_size):
+            yield body[start : start + chunk_size]
+
+    def handler(_request: httpx.Request) -> httpx.Response:
+        headers = {"Content-Length": str(len(body))} if content_length else {}
+        return httpx.Response(200, headers=headers, content=stream())
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+async def send(client: httpx.AsyncClient, **kwargs) -> httpx.Response:
+    async with client:
+        return await send_streaming(client, client.build_request("GET", URL), **kwargs)
+
+
+async def test_whole_body_is_kept_without_a_cap():
+    response = await send(make_client(b"x" * 5000))
+
+    assert response.content == b"x" * 5000
+    assert not response.extensions["truncated"]
+
+
+async def test_body_is_cut_at_the_byte_cap_with_a_notice():
+    response = await send(make_client(b"x" * 5000), max_bytes=1500)
+
+    assert response.text == "x" * 1500 + truncation_notice(1500)
+    assert "1,500 bytes" in response.text
+    assert response.extensions["truncated"]
+
+
+async def test_body_at_the_cap_is_not_truncated():
+    response = await send(make_client(b"x" * 1500), max_bytes=1500)
+
+    assert response.content == b"x" * 1500
+    assert not response.extensions["truncated"]
+
+
+@pytest.mark.parametrize("max_bytes", [1, 2, 3, 4])
+async def test_truncation_does_not_split_a_character(max_bytes):
+    body = "é€😀".encode()  # 2, 3 and 4 bytes
+    response = await send(make_client(b"a" + body), max_bytes=max_bytes)
+
+    kept = {1: "a", 2: "a", 3: "aé", 4: "aé"}[max_bytes]
+    assert response.text == kept + truncation_notice(len(kept.encode()))
+
+
+async def test_progress_is_reported_every_interval_and_at_the_end(monkeypatch):
+    monkeypatch.setattr(streaming, "PROGRESS_INTERVAL", 2500)
+    progress: list[tuple[int, int | None]] = []
+
+    async def on_progress(downloaded: int, total: int | None):
+        progress.append((downloaded, total))
+
+    await send(make_client(b"x" * 6500), on_progress=on_progress)
+
+    assert progress == [(3000, 6500), (6000, 6500), (6500, 6500)]
+
+
+async def test_progress_without_content_length(monkeypatch):
+    monkeypatch.setattr(streaming, "PROGRESS_INTERVAL", 2500)
+    progress: list[tuple[int, int | None]] = []
+
+    async def on_progress(downloaded: int, total: int | None):
+        progress.append((downloaded, total))
+
+    await send(make_client(b"x" * 3000, content_length=False), on_progress=on_progress)
+
+    assert progress == [(3000, None)]
@@ -0,0 +1,119 @@
+import copy
+
+import pytest
+
+from openapi_mcp.swagger import RefResolver, find_refs, ref_to_path
+
+DOCUMENT = {
+    "definitions": {
+        "User": {"type": "object", "properties": {"guid": {"type": "string"}}},
+        "Content": {
+            "type": "object",
+            "properties": {
+                "owner": {"$ref": "#/definitions/User"},
+                "collaborators": {"type": "array", "items": {"$ref": "#/definitions/User"}},
+            },
+        },
+        "Node": {
+            "type": "object",
+            "properties": {
+                "children": {"type": "array", "items": {"$ref": "#/definitions/Node"}},
+                "parent": {"$ref": "#/definitions/Parent"},
+            },
+        },
+        "Parent": {"type": "object", "properties": {"node": {"$ref": "#/definitions/Node"}}},
+    },
+}
+
+
+def test_references_are_expanded_once_and_shared():
+    resolver = RefResolver(DOCUMENT)
+
+    content = resolver.expand({"$ref": "#/definitions/Content"})
+
+    user = content["properties"]["owner"]
+    assert user == DOCUMENT["definitions"]["User"]
+    assert content["properties"]["collaborators"]["items"] is user
+    assert resolver.expand({"$ref": "#/definitions/User"}) is user
+
+
+def test_unchanged_objects_are_shared_and_the_document_is_not_modified():
+    document = copy.deepcopy(DOCUMENT)
+    resolver = RefResolver(document)
+
+    content = resolver.expand(document["definitions"]["Content"])
+
+    assert content is not document["definitions"]["Content"]
+    assert document == DOCUMENT
+    # `User` has no references, so it is the document's object
+    assert content["properties"]["owner"] is document["definitions"]["User"]
+    assert resolver.expand(document["definitions"]["User"]) is document["definitions"]["User"]
+
+
+def test_recursive_references_are_cut():
+    resolver = RefResolver(DOCUMENT)
+
+    node = resolver.expand({"$ref": "#/definitions/Node"})
+
+    assert node["properties"]["children"]["items"] == {
+        "type": "object",
+        "description": "Recursive reference to `#/definitions/Node` (not expanded).",
+    }
+    assert node["properties"]["parent"]["properties"]["node"]["type"] == "object"
+    assert {cycle["location"] for cycle in resolver.cycles} == {
+        "#/definitions/Node/properties/children/items",
+        "#/definitions/Parent/properties/node",
+    }
+    assert [
+        cycle["chain"]
+        for cycle in resolver.cycles
+        if cycle["location"] == "#/definitions/Parent/properties/node"
+    ] == [["#/definitions/Node", "#/definitions/Parent", "#/definitions/Node"]]
+
+
+def test_max_cycle_depth():
+    resolver = RefResolver(DOCUMENT, max_cycle_depth=2)
+
+    node = resolver.expand({"$ref": "#/definitions/Node"})
+
+    child = node["properties"]["children"]["items"]
+    assert "properties" in child
+    assert "properties" not in child["properties"]["children"]["items"]
+
+
+def test_expansions_cut_by_an_outer_cycle_are_not_memoized():
+    resolver = RefResolver(DOCUMENT)
+
+    # Inside `Node`, `Parent` is cut where it references `Node` again
+    node = resolver.expand({"$ref": "#/definitions/Node"})
+    parent_in_node = node["properties"]["parent"]
+    assert "properties" not in parent_in_node["properties"]["node"]
+
+    # On its own, `Parent` expands `Node` once (which cuts its own `parent`)
+    parent = resolver.expand({"$ref": "#/definitions/Parent"})
+    assert parent is not parent_in_node
+    assert "properties" in parent["properties"]["node"]
+    assert resolver.expand({"$ref": "#/definitions/Parent"}) is parent
+
+
+def test_missing_references_raise():
+    with pytest.raises(RuntimeError, match="#/definitions/Missing"):
+        RefResolver(DOCUMENT).expand({"$ref": "#/definitions/Missing"})
+
+
+def test_clean_expands_and_cleans_whitespace_once():
+    document = {
+        "definitions": {"User": {"type": "object", "description": "  A\n   user.  "}},
+    }
+    resolver = RefResolver(document, clean=True)
+
+    first = resolver.expand({"$ref": "#/definitions/User"})
+
+    assert first["description"] == "A user."
+    assert resolver.expand({"$ref": "#/definitions/User"}) is first
+    assert document["definitions"]["User"]["description"] == "  A\n   user.  "
+
+
+def test_ref_to_path_and_find_refs():
+    assert ref_to_path("#/paths/~1v1~1users/get") == ["paths", "/v1/users", "get"]
+    assert find_refs(DOCUMENT["definitions"]["Content"]) == {"#/definitions/User"}
@@ -0,0 +1,45 @@
+import mcp.types as types
+import pytest
+from mcp.server import Server
+from mcp.shared.memory import create_connected_server_and_client_session
+
+from openapi_mcp.tool_list import ToolList
+
+pytestmark = pytest.mark.anyio
+
+
+def make_tool(name: str, description: str = "") -> types.Tool:
+    return types.Tool(
+        name=name,
+        description=description or f"Call {name}.",
+        inputSchema={"type": "object", "properties": {"guid": {"type": "string"}}},
+    )
+
+
+def test_version_changes_only_when_the_tools_do():
+    tools = [make_tool("getUsers"), make_tool("getContents")]
+    version = ToolList(tools).version
+
+    assert ToolList([make_tool("getUsers"), make_tool("getContents")]).version == version
+    assert ToolList(tools[:1]).version != version
+    assert ToolList([make_tool("getUsers", "Changed."), tools[1]]).version != version
+    assert ToolList(tools).result.root.meta == {"version": version}
+
+
+async def test_tools_list_is_answered_with_the_precomputed_dump():
+    tool_list = ToolList([make_tool("getUsers"), make_tool("getContents")])
+    # Only the precomputed dump has this marker: the result itself does not
+    tool_list.result._payload["_meta"] = {"version": tool_list.version, "precomputed": True}
+
+    server = Server("test")
+
+    async def handle_list_tools(_request: types.ListToolsRequest) -> types.ServerResult:
+        return tool_list.result
+
+    server.request_handlers[types.ListToolsRequest] = handle_list_tools
+
+    async with create_connected_server_and_client_session(server) as client:
+        result = await client.list_tools()
+
+    assert result.meta == {"version": tool_list.version, "precomputed": True}
+    assert result.tools == tool_list.tools
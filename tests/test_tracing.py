@@ -0,0 +1,109 @@
+import json
+
+import pytest
+
+from openapi_mcp.tracing import TRACEPARENT, JsonFileExporter, Tracer, parse_traceparent
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+SPAN_ID = "00f067aa0ba902b7"
+
+
+@pytest.mark.parametrize(
+    "value",
+    [f"00-{TRACE_ID}-{SPAN_ID}-01", f" 00-{TRACE_ID.upper()}-{SPAN_ID}-00 "],
+)
+def test_parse_traceparent(value):
+    assert parse_traceparent(value) == (TRACE_ID, SPAN_ID)
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        None,
+        42,
+        "",
+        f"01-{TRACE_ID}-{SPAN_ID}-01",
+        f"00-{TRACE_ID[:-1]}-{SPAN_ID}-01",
+        f"00-{'0' * 32}-{SPAN_ID}-01",
+        f"00-{TRACE_ID}-{'0' * 16}-01",
+    ],
+)
+def test_parse_invalid_traceparent(value):
+    assert parse_traceparent(value) is None
+
+
+class ListExporter(JsonFileExporter):
+    def __init__(self):
+        self.spans = []
+
+    def export(self, span):
+        self.spans.append(span)
+
+
+def test_disabled_tracer_creates_no_spans():
+    tracer = Tracer()
+    carrier = {}
+
+    with tracer.start_span("chat") as span:
+        tracer.inject(carrier)
+
+    assert span is None
+    assert carrier == {}
+
+
+def test_spans_are_children_of_the_current_span():
+    exporter = ListExporter()
+    tracer = Tracer(exporter)
+
+    with tracer.start_span("chat") as chat:
+        with tracer.start_span("mcp.call_tool getUsers", kind="client") as call:
+            carrier = {}
+            tracer.inject(carrier)
+    assert tracer.current_span() is None
+
+    assert [span.name for span in exporter.spans] == ["mcp.call_tool getUsers", "chat"]
+    assert chat.parent_id is None
+    assert (call.trace_id, call.parent_id) == (chat.trace_id, chat.span_id)
+    assert carrier == {TRACEPARENT: call.traceparent}
+    assert parse_traceparent(carrier[TRACEPARENT]) == (call.trace_id, call.span_id)
+    assert all(span.status == "ok" and span.end_ns >= span.start_ns for span in exporter.spans)
+
+
+def test_remote_parent_and_errors():
+    exporter = ListExporter()
+    tracer = Tracer(exporter)
+
+    with (
+        pytest.raises(ValueError),
+        tracer.start_span(
+            "tools/call getUsers", kind="server", traceparent=f"00-{TRACE_ID}-{SPAN_ID}-01"
+        ),
+    ):
+        raise ValueError("Bad")
+
+    (span,) = exporter.spans
+    assert (span.trace_id, span.parent_id) == (TRACE_ID, SPAN_ID)
+    assert (span.status, span.status_message) == ("error", "ValueError: Bad")
+
+
+def test_json_file_exporter_appends_one_span_per_line(tmp_path):
+    path = tmp_path / "trace.jsonl"
+    exporter = JsonFileExporter(path)
+    tracer = Tracer(exporter)
+
+    with tracer.start_span("chat", attributes={"model": "claude"}):
+        with tracer.start_span("mcp.call_tool getUsers", kind="client"):
+            pass
+    exporter.close()
+    with tracer.start_span("chat"):
+        pass
+    exporter.close()
+
+    spans = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [span["name"] for span in spans] == ["mcp.call_tool getUsers", "chat", "chat"]
+    assert spans[0]["parentSpanId"] == spans[1]["spanId"]
+    assert spans[0]["traceId"] == spans[1]["traceId"] != spans[2]["traceId"]
+    assert spans[1]["parentSpanId"] == ""
+    assert spans[1]["attributes"] == {"model": "claude"}
+    assert spans[0]["kind"] == "client"
+    assert spans[0]["status"] == {"code": "ok", "message": ""}